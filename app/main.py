@@ -1,18 +1,87 @@
+import asyncio
+import itertools
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, Literal
-
-from core.config import get_logger
+from typing import Any, Optional, Literal
+
+from app.middleware import CompressionMiddleware
+from app.responses import FastJSONResponse, markdown_response
+from app.serve import PREFORK_ENV
+from core.config import (
+    CRAWL_MAX_DEPTH,
+    CRAWL_MAX_PAGES,
+    WEBSITE_BATCH_MAX_URLS,
+    WEBSITE_FETCH_TIMEOUT_SECONDS,
+    YOUTUBE_BATCH_CONCURRENCY,
+    YOUTUBE_BATCH_MAX_VIDEOS,
+    YOUTUBE_WINDOW_SECONDS,
+    get_logger,
+)
+from core.jobs import JobQueue, job_handler
 from core.llm import LargeLanguageModel
+from core.quota import QuotaExceededError, quota_utilization
+from core.resilience import provider_health
+from core.router import LLMRouter, ProviderCandidate
+from mcp_server.models import MDPageInfo, YTVideoInfo
 from prompts.github import github_processor_optimized
-from tools.website_context.request_md import return_markdown as fetch_markdown
+from prompts.website import get_page_answer as website_page_answer
+from prompts.youtube import (
+    answer_from_transcript as youtube_answer_from_transcript,
+    fetch_timed_transcript_async,
+    format_windows,
+    get_chain as youtube_chain,
+    stream_answer_from_transcript as youtube_stream_answer,
+)
+from tools.github_crawler.context_store import (
+    ingest_repository,
+    get_ingested_context,
+    get_code_index,
+)
+from tools.website_context.crawler import crawl_site, normalize_url
+from tools.website_context.batch_md import BatchResult, fetch_markdown_batch, iter_markdown_batch
+from tools.website_context.fetcher import (
+    FetchMode,
+    check_public_url_sync,
+    close_pool,
+    fetch_markdown_async,
+    fetch_page_info,
+)
+from tools.website_context.page_info import page_info
 from tools.website_context.html_md import return_html_md as html_to_md
+from tools.youtube_utils import service as youtube_service
+from tools.youtube_utils.batch import iter_videos, list_videos
+from tools.youtube_utils.extract_id import extract_video_id
+from tools.youtube_utils.get_info import get_video_info_async
+from tools.youtube_utils.get_subs import fetch_subtitles_async
+from tools.youtube_utils.service import (
+    ExtractionTimeoutError,
+    SubtitlesUnavailableError,
+    VideoUnavailableError,
+)
+from tools.youtube_utils.transcript_generator import processed_timed_transcript
 
 
 logger = get_logger(__name__)
 
+# job results are only POSTed to public http(s) hosts, like page fetches
+job_queue = JobQueue(check_webhook=check_public_url_sync)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # under agentic-api-serve the launcher recovers interrupted jobs once for all workers
+    await job_queue.start(recover=os.getenv(PREFORK_ENV) != "1")
+    yield
+    await job_queue.stop()
+    await close_pool()
+    youtube_service.shutdown()
+
 
 app = FastAPI(
+    lifespan=lifespan,
     title="Agentic Browser API",
     version="0.1.0",
     description="""
@@ -23,6 +92,7 @@ app = FastAPI(
     * **Multi-LLM Support**: Google, OpenAI, Anthropic, Ollama, DeepSeek, OpenRouter
     * **GitHub Analysis**: Analyze repositories and answer questions about codebases
     * **Web Processing**: Convert websites and HTML to markdown
+    * **YouTube**: Video info, transcripts and Q&A, single videos or whole playlists
     * **MCP Integration**: Model Context Protocol server support
     
     ## Authentication
@@ -43,6 +113,7 @@ app = FastAPI(
         "url": "https://opensource.org/licenses/MIT",
     },
 )
+app.add_middleware(CompressionMiddleware)
 
 
 class ChatRequest(BaseModel):
@@ -55,6 +126,8 @@ class ChatRequest(BaseModel):
     api_key: Optional[str] = Field(None, description="API key for the provider (overrides environment variable)")
     base_url: Optional[str] = Field(None, description="Custom base URL for the provider (mainly for Ollama)", example="http://localhost:11434")
     temperature: float = Field(0.4, description="Controls randomness in responses (0.0-2.0)", ge=0.0, le=2.0, example=0.7)
+    fallbacks: Optional[list[ProviderCandidate]] = Field(None, description="Providers to fail over to, in order, when the primary errors or times out", example=[{"provider": "openai", "model_name": "gpt-5-mini"}])
+    hedge: bool = Field(False, description="Also send a backup request to the next fallback when the primary is slower than its recent p95 latency")
 
 
 class ChatResponse(BaseModel):
@@ -67,6 +140,7 @@ class GithubAnswerRequest(BaseModel):
     tree: str = Field("", description="Repository file tree structure", example="src/\n  auth/\n    auth.js\n    middleware.js\n  utils/\n    helpers.js")
     summary: str = Field("", description="Brief repository description", example="A Node.js authentication service with JWT tokens")
     chat_history: Optional[str] = Field("", description="Previous conversation context for continuity")
+    context_id: Optional[str] = Field(None, description="Handle returned by /v1/github/ingest; supplies text, tree and summary server-side", example="3f2a9c1b7d4e8f60")
     # Optional LLM config to override defaults when building the chain
     llm_provider: Optional[str] = Field(None, description="LLM provider override")
     llm_model: Optional[str] = Field(None, description="LLM model override")
@@ -79,16 +153,134 @@ class GithubAnswerResponse(BaseModel):
     answer: str = Field(..., description="AI-generated analysis and answer about the repository", example="The authentication in this codebase uses JWT tokens. The auth.js file contains the main authentication logic...")
 
 
+class GithubIngestRequest(BaseModel):
+    repo_url: str = Field(..., description="URL of the GitHub repository to ingest", example="https://github.com/tashifkhan/agentic-browser")
+    refresh: bool = Field(False, description="Re-ingest even if the repository is already cached")
+    engine: Literal["gitingest", "native", "incremental"] = Field("gitingest", description="Ingestion engine: gitingest, the native per-file pipeline, or incremental re-ingestion from a local mirror")
+    include_patterns: Optional[list[str]] = Field(None, description="Gitignore-style globs of files to include", example=["src/**/*.py"])
+    exclude_patterns: Optional[list[str]] = Field(None, description="Gitignore-style globs of files to exclude", example=["tests/", "*.md"])
+    max_file_size: Optional[int] = Field(None, description="Skip files larger than this many bytes", gt=0)
+
+
+class GithubIngestResponse(BaseModel):
+    context_id: str = Field(..., description="Handle to pass as `context_id` to /v1/github/answer", example="3f2a9c1b7d4e8f60")
+    summary: str = Field(..., description="Repository summary produced during ingestion")
+    tree: str = Field(..., description="Repository file tree structure")
+    file_count: int = Field(..., description="Number of files ingested")
+    content_length: int = Field(..., description="Size in bytes of the ingested file content")
+
+
+class YoutubeAnswerRequest(BaseModel):
+    url: str = Field(..., description="YouTube video URL", example="https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+    question: str = Field(..., description="Question about the video", example="Summarize this video")
+    chat_history: Optional[str] = Field("", description="Previous conversation context for continuity")
+    langs: Optional[list[str]] = Field(None, description="Transcript languages in order of preference; \"orig\" is the video's own language (default: YOUTUBE_SUBTITLE_LANGS)", example=["en", "orig"])
+    stream: bool = Field(False, description="Stream the answer as markdown while it is written (/v1/youtube/answer only)")
+
+
+class YoutubeAnswerResponse(BaseModel):
+    answer: str = Field(..., description="AI-generated answer about the video")
+
+
+class YoutubeVideoRequest(BaseModel):
+    url: str = Field(..., description="YouTube video URL (watch, youtu.be, shorts or embed link)", example="https://www.youtube.com/watch?v=dQw4w9WgXcQ")
+    langs: Optional[list[str]] = Field(None, description="Transcript languages in order of preference; \"orig\" is the video's own language (default: YOUTUBE_SUBTITLE_LANGS)", example=["en", "orig"])
+
+
+class YoutubeTranscriptRequest(YoutubeVideoRequest):
+    timestamps: bool = Field(False, description="Return [m:ss-m:ss] timestamped passages instead of plain text")
+
+
+class YoutubeTranscriptResponse(BaseModel):
+    video_id: Optional[str] = Field(None, description="YouTube video ID")
+    lang: str = Field(..., description="Language of the transcript", example="en")
+    automatic: bool = Field(..., description="Whether the transcript comes from automatic captions rather than uploaded subtitles")
+    transcript: str = Field(..., description="Cleaned transcript")
+
+
+class YoutubePlaylistRequest(BaseModel):
+    url: str = Field(..., description="Playlist, channel or video URL", example="https://www.youtube.com/playlist?list=PL590L5WQmH8fJ54F369BLDSqIwcs-TCfs")
+    max_videos: int = Field(YOUTUBE_BATCH_MAX_VIDEOS, ge=1, le=500, description="Most videos to take from the list, in list order")
+    concurrency: int = Field(YOUTUBE_BATCH_CONCURRENCY, ge=1, le=16, description="Videos fetched at the same time")
+    langs: Optional[list[str]] = Field(None, description="Transcript languages in order of preference (default: YOUTUBE_SUBTITLE_LANGS)")
+
+
+class JobSubmitRequest(BaseModel):
+    kind: Literal["github.ingest", "github.answer", "youtube.answer", "website.answer"] = Field(..., description="Work to run; `payload` is the body of the matching endpoint", example="github.answer")
+    payload: dict = Field(..., description="Request body for the job kind", example={"question": "How does authentication work?", "context_id": "3f2a9c1b7d4e8f60"})
+    priority: Literal["high", "normal", "low"] = Field("normal", description="Priority lane; higher lanes are always served first")
+    webhook_url: Optional[str] = Field(None, description="URL that receives the finished job as a JSON POST", example="https://example.com/hooks/agentic")
+
+
+class JobResponse(BaseModel):
+    id: str = Field(..., description="Job handle for /v1/jobs/{id}")
+    kind: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    priority: str
+    result: Any = Field(None, description="Response body of the matching endpoint once the job succeeded")
+    error: Optional[str] = Field(None, description="Failure reason once the job failed")
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+
+MarkdownFormat = Literal["json", "markdown"]
+
+# raw text/markdown bodies are documented next to the JSON schema
+MARKDOWN_RESPONSES = {200: {"content": {"text/markdown": {"schema": {"type": "string"}}}}}
+
+
 class WebsiteMarkdownRequest(BaseModel):
     url: str = Field(..., description="Valid HTTP/HTTPS URL to convert to markdown", example="https://example.com/article")
+    mode: Optional[FetchMode] = Field(None, description="'jina', 'local' or 'auto' (local, then Jina); defaults to WEBSITE_FETCH_MODE")
+    full_body: bool = Field(False, description="For locally converted pages, keep the whole <body> instead of only the main content")
+    response_format: MarkdownFormat = Field("json", description="'markdown' returns the raw text/markdown body instead of JSON")
 
 
 class WebsiteMarkdownResponse(BaseModel):
     markdown: str = Field(..., description="Website content converted to markdown format", example="# Article Title\n\nThis is the article content in markdown format...")
 
 
+class WebsiteBatchRequest(BaseModel):
+    urls: list[str] = Field(..., min_length=1, max_length=WEBSITE_BATCH_MAX_URLS, description="HTTP/HTTPS URLs to convert", example=["https://example.com", "https://example.org"])
+    timeout: float = Field(WEBSITE_FETCH_TIMEOUT_SECONDS, gt=0, le=300, description="Seconds allowed per URL")
+    mode: Optional[FetchMode] = Field(None, description="'jina', 'local' or 'auto' (local, then Jina); defaults to WEBSITE_FETCH_MODE")
+    stream: bool = Field(True, description="Stream one NDJSON line per URL as each finishes")
+
+
+class WebsiteBatchResponse(BaseModel):
+    results: list[BatchResult] = Field(..., description="One result per URL, in request order")
+    succeeded: int
+    failed: int
+
+
+class WebsiteCrawlRequest(BaseModel):
+    url: str = Field(..., description="Page to start crawling from", example="https://docs.example.com/")
+    max_depth: int = Field(CRAWL_MAX_DEPTH, ge=0, le=10, description="Link hops to follow from the start page")
+    max_pages: int = Field(CRAWL_MAX_PAGES, ge=1, le=1000, description="Maximum pages to fetch")
+    path_prefix: Optional[str] = Field(None, description="Only follow links whose path starts with this, e.g. /docs/")
+    drop_repeats: bool = Field(True, description="Leave out blocks already sent with an earlier page")
+
+
+class WebsitePageInfoRequest(BaseModel):
+    url: Optional[str] = Field(None, description="Page URL; fetched directly unless `html` is given, and used to resolve relative links", example="https://example.com/article")
+    html: Optional[str] = Field(None, description="Page HTML, e.g. from the browser extension")
+    full_body: bool = Field(False, description="Use the whole <body> instead of only the main content")
+
+
+class WebsiteAnswerRequest(WebsitePageInfoRequest):
+    question: str = Field(..., description="Question about the page", example="What are the installation steps?")
+    chat_history: Optional[str] = Field("", description="Previous conversation context for continuity")
+
+
+class WebsiteAnswerResponse(BaseModel):
+    answer: str = Field(..., description="AI-generated answer about the page")
+
+
 class HtmlToMdRequest(BaseModel):
     html: str = Field(..., description="HTML content to convert to markdown", example="<h1>Title</h1><p>Content with <strong>bold</strong> text.</p>")
+    full_body: bool = Field(False, description="Convert the whole <body> instead of only the main content")
+    response_format: MarkdownFormat = Field("json", description="'markdown' returns the raw text/markdown body instead of JSON")
 
 
 class HtmlToMdResponse(BaseModel):
@@ -101,8 +293,26 @@ def health():
     Check if the API service is running and healthy.
     
     Returns a simple status response to verify the service is operational.
+    `providers` lists the circuit breaker and concurrency limit of every LLM
+    provider used so far; `status` is `degraded` while any circuit is open.
+    `quotas` shows the utilization of the client-side rate limits.
     """
-    return {"status": "ok"}
+    providers = provider_health()
+    degraded = any(p["circuit"]["state"] != "closed" for p in providers.values())
+    return {
+        "status": "degraded" if degraded else "ok",
+        "providers": providers,
+        "quotas": quota_utilization(),
+    }
+
+
+def _quota_exceeded(error: QuotaExceededError) -> HTTPException:
+    """429 telling the client when the provider quota has room again."""
+    return HTTPException(
+        status_code=429,
+        detail=str(error),
+        headers={"Retry-After": str(max(1, round(error.retry_after)))},
+    )
 
 
 @app.post("/v1/chat/generate", response_model=ChatResponse, tags=["Chat"], summary="Generate AI Chat Response")
@@ -118,6 +328,10 @@ def chat_generate(req: ChatRequest):
     - `deepseek`: DeepSeek models
     - `openrouter`: OpenRouter proxy
     
+    **Failover:** list `fallbacks` to retry on other providers when the primary
+    errors or times out; `hedge` additionally races the next fallback against a
+    primary that is slower than its recent p95 latency.
+    
     **Example Request:**
     ```json
     {
@@ -129,15 +343,30 @@ def chat_generate(req: ChatRequest):
     ```
     """
     try:
-        llm = LargeLanguageModel(
-            model_name=req.model,
-            api_key=req.api_key or "",
-            provider=req.provider,
-            base_url=req.base_url,
-            temperature=req.temperature,
-        )
+        if req.fallbacks:
+            primary = ProviderCandidate(
+                provider=req.provider,
+                model_name=req.model,
+                api_key=req.api_key,
+                base_url=req.base_url,
+            )
+            llm = LLMRouter(
+                [primary, *req.fallbacks],
+                hedge=req.hedge,
+                temperature=req.temperature,
+            )
+        else:
+            llm = LargeLanguageModel(
+                model_name=req.model,
+                api_key=req.api_key or "",
+                provider=req.provider,
+                base_url=req.base_url,
+                temperature=req.temperature,
+            )
         content = llm.generate_text(req.prompt, system_message=req.system_message)
         return ChatResponse(content=content)
+    except QuotaExceededError as e:
+        raise _quota_exceeded(e)
     except Exception as e:
         logger.exception("/v1/chat/generate failed")
         raise HTTPException(status_code=400, detail=str(e))
@@ -159,6 +388,9 @@ def github_answer(req: GithubAnswerRequest):
     - `tree`: Repository file tree structure  
     - `summary`: Brief repository description
     - `chat_history`: Previous conversation context
+    - `context_id`: Handle from `/v1/github/ingest`, used for any of `text`, `tree` and `summary` left empty.
+      Definitions of functions/classes named in the question are looked up in a
+      symbol index and sent instead of the whole repository when they match.
     
     **Example Request:**
     ```json
@@ -171,34 +403,281 @@ def github_answer(req: GithubAnswerRequest):
     ```
     """
     try:
-        llm_options = {}
-        if req.llm_provider:
-            llm_options["provider"] = req.llm_provider
-        if req.llm_model:
-            llm_options["model_name"] = req.llm_model
-        if req.llm_api_key:
-            llm_options["api_key"] = req.llm_api_key
-        if req.llm_base_url:
-            llm_options["base_url"] = req.llm_base_url
-        if req.llm_temperature is not None:
-            llm_options["temperature"] = req.llm_temperature
-
-        answer = github_processor_optimized(
-            question=req.question,
-            text=req.text,
-            tree=req.tree,
-            summary=req.summary,
-            chat_history=req.chat_history or "",
-            llm_options=llm_options or None,
-        )
-        return GithubAnswerResponse(answer=answer)
+        return answer_github_question(req)
+    except HTTPException:
+        raise
+    except QuotaExceededError as e:
+        raise _quota_exceeded(e)
     except Exception as e:
         logger.exception("/v1/github/answer failed")
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.post("/v1/website/markdown", response_model=WebsiteMarkdownResponse, tags=["Web Processing"], summary="Convert Website to Markdown")
-def website_markdown(req: WebsiteMarkdownRequest):
+@job_handler("github.answer", GithubAnswerRequest)
+def answer_github_question(req: GithubAnswerRequest) -> GithubAnswerResponse:
+    repository = code_index = None
+    if req.context_id:
+        repository = get_ingested_context(req.context_id)
+        if repository is None:
+            raise HTTPException(status_code=404, detail=f"Unknown context_id: {req.context_id}")
+        code_index = get_code_index(req.context_id)
+
+    llm_options = {}
+    if req.llm_provider:
+        llm_options["provider"] = req.llm_provider
+    if req.llm_model:
+        llm_options["model_name"] = req.llm_model
+    if req.llm_api_key:
+        llm_options["api_key"] = req.llm_api_key
+    if req.llm_base_url:
+        llm_options["base_url"] = req.llm_base_url
+    if req.llm_temperature is not None:
+        llm_options["temperature"] = req.llm_temperature
+
+    answer = github_processor_optimized(
+        question=req.question,
+        text=req.text,
+        tree=req.tree,
+        summary=req.summary,
+        chat_history=req.chat_history or "",
+        llm_options=llm_options or None,
+        code_index=code_index,
+        repository=repository,
+    )
+    return GithubAnswerResponse(answer=answer)
+
+
+@app.post("/v1/github/ingest", response_model=GithubIngestResponse, tags=["GitHub"], summary="Ingest GitHub Repository")
+async def github_ingest(req: GithubIngestRequest):
+    """
+    Ingest a GitHub repository server-side and return a context handle.
+    
+    The repository is converted once and kept on the server, so clients pass the
+    returned `context_id` to `/v1/github/answer` instead of uploading the repository
+    content themselves. Concurrent ingests of the same repository share one task.
+    
+    **Engines:**
+    - `gitingest`: default, one pass over a fresh clone
+    - `native`: parallel per-file reader honoring `.gitignore`, include/exclude
+      globs, a size cap and binary detection
+    - `incremental`: keeps a bare clone; a refresh only fetches new objects and
+      re-reads files changed since the last ingested commit
+    
+    **Example Request:**
+    ```json
+    {
+        "repo_url": "https://github.com/tashifkhan/agentic-browser"
+    }
+    ```
+    """
+    try:
+        return await ingest_github_repository(req)
+    except Exception as e:
+        logger.exception("/v1/github/ingest failed")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@job_handler("github.ingest", GithubIngestRequest)
+async def ingest_github_repository(req: GithubIngestRequest) -> GithubIngestResponse:
+    context_id, repository = await ingest_repository(
+        req.repo_url,
+        refresh=req.refresh,
+        engine=req.engine,
+        include_patterns=req.include_patterns,
+        exclude_patterns=req.exclude_patterns,
+        max_file_size=req.max_file_size,
+    )
+    return GithubIngestResponse(
+        context_id=context_id,
+        summary=repository.summary,
+        tree=repository.tree,
+        file_count=len(repository),
+        content_length=repository.raw_size,
+    )
+
+
+def _youtube_status(error: Exception) -> int:
+    """404 for videos or subtitles that do not exist, 504 when yt-dlp timed out, otherwise 400."""
+    if isinstance(error, (VideoUnavailableError, SubtitlesUnavailableError)):
+        return 404
+    if isinstance(error, ExtractionTimeoutError):
+        return 504
+    return 400
+
+
+@job_handler("youtube.answer", YoutubeAnswerRequest)
+async def answer_youtube_question(req: YoutubeAnswerRequest) -> YoutubeAnswerResponse:
+    transcript = await fetch_timed_transcript_async(req.url, req.langs)
+    answer = await asyncio.to_thread(
+        youtube_answer_from_transcript,
+        youtube_chain(),
+        req.question,
+        transcript,
+        req.url,
+        req.chat_history or "",
+    )
+    return YoutubeAnswerResponse(answer=answer)
+
+
+@app.post("/v1/youtube/info", response_model=YTVideoInfo, response_class=FastJSONResponse, tags=["YouTube"], summary="Video Info")
+async def youtube_info(req: YoutubeVideoRequest):
+    """
+    Title, description, duration, uploader, counts, tags and the cleaned
+    transcript of a video, from one extraction.
+
+    Results are cached per video, so the watch, youtu.be, shorts and embed
+    links of one video are extracted once. An unavailable video returns 404.
+    """
+    try:
+        return await get_video_info_async(req.url, req.langs)
+    except Exception as e:
+        logger.exception("/v1/youtube/info failed")
+        raise HTTPException(status_code=_youtube_status(e), detail=str(e))
+
+
+@app.post("/v1/youtube/transcript", response_model=YoutubeTranscriptResponse, response_class=FastJSONResponse, tags=["YouTube"], summary="Video Transcript")
+async def youtube_transcript(req: YoutubeTranscriptRequest):
+    """
+    The cleaned transcript of a video in the first available of `langs`;
+    with `timestamps`, as passages of YOUTUBE_WINDOW_SECONDS prefixed with
+    their [m:ss-m:ss] range. Uploaded subtitles in any preferred language
+    win over automatic captions, and one extraction resolves the whole list.
+
+    Subtitles are cached per video, so a later question about the same
+    video reuses them. An unavailable video, or one without usable
+    subtitles, returns 404.
+    """
+    try:
+        subtitles = await fetch_subtitles_async(req.url, req.langs)
+    except Exception as e:
+        logger.exception("/v1/youtube/transcript failed")
+        raise HTTPException(status_code=_youtube_status(e), detail=str(e))
+    transcript = processed_timed_transcript(subtitles.text)
+    if not transcript:
+        raise HTTPException(status_code=404, detail="No transcript available in the requested languages")
+
+    windows = transcript.windows(YOUTUBE_WINDOW_SECONDS)
+    text = format_windows(windows) if req.timestamps else "\n".join(w.text for w in windows)
+    return YoutubeTranscriptResponse(
+        video_id=extract_video_id(req.url),
+        lang=subtitles.lang,
+        automatic=subtitles.automatic,
+        transcript=text,
+    )
+
+
+@app.post(
+    "/v1/youtube/answer",
+    response_model=YoutubeAnswerResponse,
+    responses={200: {"content": {"text/markdown": {}}}},
+    tags=["YouTube"],
+    summary="Answer Questions About a Video",
+)
+async def youtube_answer(req: YoutubeAnswerRequest):
+    """
+    Answer a question about a video from its transcript. Long transcripts
+    only send the passages relevant to the question.
+
+    With `stream` the answer is returned as `text/markdown` while the model
+    writes it; otherwise as `{"answer": ...}`. An unavailable video returns
+    404 without calling the model.
+    """
+    try:
+        if not req.stream:
+            return await answer_youtube_question(req)
+
+        transcript = await fetch_timed_transcript_async(req.url, req.langs)
+        chunks = youtube_stream_answer(req.question, transcript, req.url, req.chat_history or "")
+        # the first chunk surfaces provider errors while a 400 can still be sent
+        first = await asyncio.to_thread(next, chunks, "")
+    except QuotaExceededError as e:
+        raise _quota_exceeded(e)
+    except Exception as e:
+        logger.exception("/v1/youtube/answer failed")
+        raise HTTPException(status_code=_youtube_status(e), detail=str(e))
+
+    return StreamingResponse(itertools.chain([first], chunks), media_type="text/markdown; charset=utf-8")
+
+
+@app.post(
+    "/v1/youtube/playlist",
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+    tags=["YouTube"],
+    summary="Stream a Playlist's Transcripts",
+)
+async def youtube_playlist(req: YoutubePlaylistRequest):
+    """
+    Fetch the info and cleaned transcript of every video in a playlist or
+    channel, e.g. to analyze a whole course.
+
+    The list is expanded once without resolving each video, then videos are
+    fetched `concurrency` at a time. Videos fetched before are served from
+    the per-video cache.
+
+    The response is NDJSON with one line per video as soon as it finishes:
+    `index` (position in the list), `video_id`, `url`, `title`, `info`
+    (YTVideoInfo with `transcript`) or `error`, and `elapsed`.
+    """
+    try:
+        entries = await list_videos(req.url, req.max_videos)
+    except Exception as e:
+        logger.exception("/v1/youtube/playlist failed")
+        raise HTTPException(status_code=_youtube_status(e), detail=str(e))
+
+    async def lines():
+        async for result in iter_videos(entries, req.concurrency, req.langs):
+            yield result.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/v1/jobs", response_model=JobResponse, status_code=202, tags=["Jobs"], summary="Submit Background Job")
+def submit_job(req: JobSubmitRequest):
+    """
+    Run a long analysis in the background and return a job handle at once.
+    
+    `payload` is the request body of the matching endpoint:
+    - `github.ingest`: `/v1/github/ingest`
+    - `github.answer`: `/v1/github/answer`
+    - `youtube.answer`: `/v1/youtube/answer` (`url`, `question`, `chat_history`,
+      `langs`; `stream` is ignored). An unavailable video fails the job with
+      its error instead of answering without a transcript.
+    - `website.answer`: `/v1/website/answer`
+    
+    Poll `/v1/jobs/{id}` until `status` is `succeeded` or `failed`, or pass a
+    `webhook_url` to receive the finished job as a JSON POST. Jobs are stored in
+    SQLite and resume after a restart. `high` priority jobs are picked before
+    `normal` and `low` ones.
+    
+    **Example Request:**
+    ```json
+    {
+        "kind": "github.answer",
+        "payload": {"question": "How does auth work?", "context_id": "3f2a9c1b7d4e8f60"},
+        "priority": "high"
+    }
+    ```
+    """
+    try:
+        job = job_queue.submit(req.kind, req.payload, priority=req.priority, webhook_url=req.webhook_url)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return JobResponse(**job.model_dump())
+
+
+@app.get("/v1/jobs/{job_id}", response_model=JobResponse, tags=["Jobs"], summary="Get Job Status")
+def get_job(job_id: str):
+    """
+    Current state of a background job; `result` holds the endpoint response once it succeeded.
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return JobResponse(**job.model_dump())
+
+
+@app.post("/v1/website/markdown", response_model=WebsiteMarkdownResponse, response_class=FastJSONResponse, responses=MARKDOWN_RESPONSES, tags=["Web Processing"], summary="Convert Website to Markdown")
+async def website_markdown(req: WebsiteMarkdownRequest):
     """
     Convert any website to clean, readable markdown format.
     
@@ -222,16 +701,91 @@ def website_markdown(req: WebsiteMarkdownRequest):
     - HTTP and HTTPS websites
     - Most modern web pages
     - JavaScript-rendered content (limited)
+
+    **Fetch modes:** `jina` reads the page through the Jina AI reader,
+    `local` fetches it directly and converts the HTML here, and `auto` tries
+    local first and falls back to Jina for pages that fail or come back
+    nearly empty (JavaScript-only pages).
     """
     try:
-        md = fetch_markdown(req.url)
-        return WebsiteMarkdownResponse(markdown=md)
+        md = await fetch_markdown_async(req.url, mode=req.mode, full_body=req.full_body)
+        return markdown_response(md, req.response_format)
     except Exception as e:
         logger.exception("/v1/website/markdown failed")
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@app.post("/v1/website/html-to-md", response_model=HtmlToMdResponse, tags=["Web Processing"], summary="Convert HTML to Markdown")
+@app.post(
+    "/v1/website/markdown/batch",
+    response_model=WebsiteBatchResponse,
+    response_class=FastJSONResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+    tags=["Web Processing"],
+    summary="Convert Many Websites to Markdown",
+)
+async def website_markdown_batch(req: WebsiteBatchRequest):
+    """
+    Convert many websites to markdown concurrently, e.g. every open tab.
+
+    URLs are fetched over a shared connection pool with a per-host
+    concurrency limit and `timeout` seconds each. A URL that fails or times
+    out gets an `error` instead of `markdown`; the others are unaffected.
+
+    With `stream` (the default) the response is NDJSON: one result line per
+    URL, written as soon as that URL finishes, so `index` gives its position
+    in the request. Otherwise all results are returned together in order.
+    """
+    if not req.stream:
+        results = await fetch_markdown_batch(req.urls, req.timeout, req.mode)
+        failed = sum(1 for r in results if r.error is not None)
+        return FastJSONResponse({
+            "results": [r.model_dump() for r in results],
+            "succeeded": len(results) - failed,
+            "failed": failed,
+        })
+
+    async def lines():
+        async for result in iter_markdown_batch(req.urls, req.timeout, req.mode):
+            yield result.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post(
+    "/v1/website/crawl",
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+    tags=["Web Processing"],
+    summary="Crawl a Site to Markdown",
+)
+async def website_crawl(req: WebsiteCrawlRequest):
+    """
+    Crawl a site from `url` and stream its pages as markdown, e.g. to answer
+    questions over a documentation site.
+
+    Same-site links are followed breadth-first up to `max_depth` hops and
+    `max_pages` fetches. robots.txt is honoured, requests to a host are spaced
+    out, and pages that duplicate earlier content are skipped.
+
+    The response is NDJSON with one line per page as it is fetched:
+    `url`, `depth`, `title`, `markdown` and `content_hash`.
+    """
+    if normalize_url(req.url if "://" in req.url else "https://" + req.url) is None:
+        raise HTTPException(status_code=400, detail="Only HTTP/HTTPS URLs are supported")
+
+    async def lines():
+        async for page in crawl_site(
+            req.url,
+            max_depth=req.max_depth,
+            max_pages=req.max_pages,
+            path_prefix=req.path_prefix,
+            drop_repeats=req.drop_repeats,
+        ):
+            yield page.model_dump_json() + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/v1/website/html-to-md", response_model=HtmlToMdResponse, response_class=FastJSONResponse, responses=MARKDOWN_RESPONSES, tags=["Web Processing"], summary="Convert HTML to Markdown")
 def website_html_to_md(req: HtmlToMdRequest):
     """
     Convert raw HTML content to clean markdown format.
@@ -257,15 +811,71 @@ def website_html_to_md(req: HtmlToMdRequest):
     - Maintains heading hierarchy
     - Converts lists and tables appropriately
     - Removes unnecessary HTML attributes
+    - Keeps only the main content (drops navigation, footers, cookie
+      banners and sidebars) unless `full_body` is set
     """
     try:
-        md = html_to_md(req.html)
-        return HtmlToMdResponse(markdown=md)
+        md = html_to_md(req.html, full_body=req.full_body)
+        return markdown_response(md, req.response_format)
     except Exception as e:
         logger.exception("/v1/website/html-to-md failed")
         raise HTTPException(status_code=400, detail=str(e))
 
 
+
+async def load_page(req: WebsitePageInfoRequest) -> MDPageInfo:
+    if req.html:
+        return await asyncio.to_thread(page_info, req.html, req.url, req.full_body)
+    if req.url:
+        return await fetch_page_info(req.url, full_body=req.full_body)
+    raise ValueError("Provide `url` or `html`")
+
+
+@app.post("/v1/website/page-info", response_model=MDPageInfo, response_class=FastJSONResponse, tags=["Web Processing"], summary="Structured Page Info")
+async def website_page_info(req: WebsitePageInfoRequest):
+    """
+    Parse a page into an MDPageInfo: title, metadata, headings, paragraphs,
+    links, images, code blocks, tables and the markdown, all from one parse
+    of the HTML.
+
+    Send `html` (as the extension does) or just a `url` to fetch the page
+    directly. Parsed pages are cached, so a follow-up `/v1/website/answer`
+    about the same page reuses the result.
+    """
+    try:
+        page = await load_page(req)
+        return FastJSONResponse(page.model_dump())
+    except Exception as e:
+        logger.exception("/v1/website/page-info failed")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.post("/v1/website/answer", response_model=WebsiteAnswerResponse, tags=["Web Processing"], summary="Answer Questions About a Page")
+async def website_answer(req: WebsiteAnswerRequest):
+    """
+    Answer a question about a web page.
+
+    The page is parsed into an MDPageInfo and only the sections the question
+    needs are sent to the model: e.g. "list the links" gets the links without
+    the page text, while "how do I install it?" gets the code blocks plus the
+    markdown.
+    """
+    try:
+        return await answer_website_question(req)
+    except QuotaExceededError as e:
+        raise _quota_exceeded(e)
+    except Exception as e:
+        logger.exception("/v1/website/answer failed")
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@job_handler("website.answer", WebsiteAnswerRequest)
+async def answer_website_question(req: WebsiteAnswerRequest) -> WebsiteAnswerResponse:
+    page = await load_page(req)
+    answer = await asyncio.to_thread(website_page_answer, req.question, page, req.chat_history or "")
+    return WebsiteAnswerResponse(answer=answer)
+
+
 # Optional root
 @app.get("/", tags=["Info"], summary="API Information")
 def root():
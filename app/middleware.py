@@ -0,0 +1,133 @@
+try:
+    import brotli
+
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import COMPRESSION_MIN_SIZE
+
+# already-compressed media gains nothing from another pass
+_SKIP_TYPES = ("image/", "video/", "audio/", "application/zip", "application/gzip")
+
+
+def _accepted_encodings(header: str) -> set[str]:
+    accepted = set()
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if params.strip().replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        accepted.add(name.strip().lower())
+    return accepted
+
+
+class _Encoder:
+    """Incremental brotli or gzip encoder; `flush` pushes out everything buffered."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=4)
+        else:
+            self._zlib = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool = False, finish: bool = False) -> bytes:
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            if finish:
+                return out + self._brotli.finish()
+            return out + self._brotli.flush() if flush else out
+        out = self._zlib.compress(data)
+        if finish:
+            return out + self._zlib.flush(zlib.Z_FINISH)
+        return out + self._zlib.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+
+class CompressionMiddleware:
+    """
+    Brotli (when installed) or gzip response compression, chosen from Accept-Encoding.
+
+    Whole responses smaller than `minimum_size` are sent as they are. Streamed
+    responses are compressed chunk by chunk and flushed after each one, so
+    clients reading line-delimited results still see every line as soon as
+    it is produced.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accepted = _accepted_encodings(Headers(scope=scope).get("accept-encoding", ""))
+        if HAS_BROTLI and "br" in accepted:
+            encoding = "br"
+        elif "gzip" in accepted:
+            encoding = "gzip"
+        else:
+            await self.app(scope, receive, send)
+            return
+        await _CompressedResponder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+
+class _CompressedResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send | None = None
+        self.start: Message | None = None
+        self.encoder: _Encoder | None = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_with_compression)
+
+    async def send_with_compression(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # hold the headers until the first body chunk shows whether to compress
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            self.passthrough = "content-encoding" in headers or headers.get(
+                "content-type", ""
+            ).startswith(_SKIP_TYPES)
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            if self.passthrough or (not more_body and len(body) < self.minimum_size):
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            self.encoder = _Encoder(self.encoding)
+            if not more_body:
+                body = self.encoder.compress(body, finish=True)
+                headers["Content-Length"] = str(len(body))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            del headers["Content-Length"]
+            await self.send(start)
+
+        if self.passthrough:
+            await self.send(message)
+            return
+        body = self.encoder.compress(body, flush=more_body, finish=not more_body)
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
@@ -0,0 +1,34 @@
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+from typing import Any
+
+from fastapi.responses import JSONResponse, Response
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse encoded with orjson when it is installed.
+
+    Endpoints return it directly with plain dicts, which also skips FastAPI's
+    jsonable_encoder pass over the (possibly megabytes of) content.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if HAS_ORJSON:
+            return orjson.dumps(content)
+        return super().render(content)
+
+
+class MarkdownResponse(Response):
+    media_type = "text/markdown"
+
+
+def markdown_response(markdown: str, response_format: str = "json") -> Response:
+    """`{"markdown": ...}` as JSON, or the raw markdown body for response_format="markdown"."""
+    if response_format == "markdown":
+        return MarkdownResponse(markdown)
+    return FastJSONResponse({"markdown": markdown})
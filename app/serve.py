@@ -0,0 +1,197 @@
+"""
+Production launcher: pre-forked uvicorn workers sharing one listening socket.
+
+The heavy third-party libraries (langchain, provider SDKs, yt-dlp) are
+imported once in the parent, so forked workers share that memory
+copy-on-write. The application itself is imported in each worker after the
+fork, so its clients and connection pools are never shared between
+processes. The parent restarts
+workers that die, re-queueing the jobs they were running first. On
+SIGTERM/SIGINT every worker stops accepting connections and finishes its
+in-flight requests (up to the graceful timeout) before exiting.
+"""
+
+import argparse
+import importlib
+import os
+import signal
+import socket
+import time
+
+import uvicorn
+
+from core.config import (
+    BACKEND_HOST,
+    BACKEND_PORT,
+    SERVE_BACKLOG,
+    SERVE_GRACEFUL_TIMEOUT_SECONDS,
+    SERVE_KEEP_ALIVE_SECONDS,
+    SERVE_WORKERS,
+    get_logger,
+)
+
+logger = get_logger(__name__)
+
+# set in forked workers so the app leaves job recovery to the parent
+PREFORK_ENV = "AGENTIC_PREFORK_WORKER"
+
+# a worker dying sooner than this after starting is restarted with a delay
+_MIN_WORKER_LIFETIME = 1.0
+
+# imported in the parent to be shared; none of them opens connections on import
+_PRELOAD = (
+    "fastapi",
+    "httpx",
+    "bs4",
+    "langchain_core",
+    "langchain_google_genai",
+    "langchain_openai",
+    "langchain_anthropic",
+    "langchain_ollama",
+    "yt_dlp",
+    "gitingest",
+)
+
+
+def _preload() -> None:
+    for name in _PRELOAD:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            pass
+
+
+def _bind(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _spawn(sock: socket.socket, config: uvicorn.Config) -> int:
+    pid = os.fork()
+    if pid:
+        return pid
+
+    # worker: drop the supervisor's handlers; uvicorn installs its own
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    os.environ[PREFORK_ENV] = "1"
+    status = 1
+    try:
+        uvicorn.Server(config).run(sockets=[sock])
+        status = 0
+    except BaseException:
+        logger.exception(f"Worker {os.getpid()} crashed")
+    finally:
+        os._exit(status)
+
+
+def serve(
+    host: str = BACKEND_HOST,
+    port: int = BACKEND_PORT,
+    workers: int = SERVE_WORKERS,
+    backlog: int = SERVE_BACKLOG,
+    keep_alive: int = SERVE_KEEP_ALIVE_SECONDS,
+    graceful_timeout: int = SERVE_GRACEFUL_TIMEOUT_SECONDS,
+) -> None:
+    if not hasattr(os, "fork"):
+        # no fork (Windows): uvicorn's spawn-based workers, without preloading
+        uvicorn.run(
+            "app.main:app",
+            host=host,
+            port=port,
+            workers=workers,
+            backlog=backlog,
+            timeout_keep_alive=keep_alive,
+            timeout_graceful_shutdown=graceful_timeout,
+        )
+        return
+
+    from core.jobs import recover_jobs, requeue_worker_jobs
+
+    _preload()
+    recover_jobs()
+    # loaded by each worker in `Server.run`, after the fork
+    config = uvicorn.Config(
+        "app.main:app",
+        backlog=backlog,
+        timeout_keep_alive=keep_alive,
+        timeout_graceful_shutdown=graceful_timeout,
+    )
+    sock = _bind(host, port, backlog)
+
+    children: dict[int, float] = {}
+    stop_deadline: float | None = None
+
+    def stop(signum, _frame):
+        nonlocal stop_deadline
+        if stop_deadline is not None:
+            return
+        logger.info(f"Received {signal.Signals(signum).name}; draining {len(children)} workers")
+        # uvicorn waits up to graceful_timeout for requests, then closes the loop
+        stop_deadline = time.monotonic() + graceful_timeout + 10
+        for pid in list(children):
+            os.kill(pid, signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    for _ in range(workers):
+        children[_spawn(sock, config)] = time.monotonic()
+    logger.info(f"Serving on {host}:{port} with {workers} workers (pid {os.getpid()})")
+
+    while children:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            break
+        if pid == 0:
+            if stop_deadline is not None and time.monotonic() > stop_deadline:
+                logger.warning(f"Killing {len(children)} workers that did not drain in time")
+                for pid in list(children):
+                    os.kill(pid, signal.SIGKILL)
+                stop_deadline = float("inf")
+            time.sleep(0.2)
+            continue
+
+        started = children.pop(pid, None)
+        if stop_deadline is not None or started is None:
+            continue
+        logger.warning(f"Worker {pid} exited with status {os.waitstatus_to_exitcode(status)}; restarting")
+        try:
+            requeue_worker_jobs(pid)
+        except Exception:
+            logger.exception(f"Could not re-queue the jobs of worker {pid}")
+        if time.monotonic() - started < _MIN_WORKER_LIFETIME:
+            time.sleep(_MIN_WORKER_LIFETIME)
+        children[_spawn(sock, config)] = time.monotonic()
+
+    sock.close()
+    logger.info("All workers stopped")
+
+
+def run():
+    parser = argparse.ArgumentParser(description="Run the API with pre-forked production workers.")
+    parser.add_argument("--host", default=BACKEND_HOST)
+    parser.add_argument("--port", type=int, default=BACKEND_PORT)
+    parser.add_argument("--workers", type=int, default=SERVE_WORKERS)
+    parser.add_argument("--backlog", type=int, default=SERVE_BACKLOG)
+    parser.add_argument("--keep-alive", type=int, default=SERVE_KEEP_ALIVE_SECONDS)
+    parser.add_argument("--graceful-timeout", type=int, default=SERVE_GRACEFUL_TIMEOUT_SECONDS)
+    args = parser.parse_args()
+    serve(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        backlog=args.backlog,
+        keep_alive=args.keep_alive,
+        graceful_timeout=args.graceful_timeout,
+    )
+
+
+if __name__ == "__main__":
+    run()
@@ -13,6 +13,119 @@ BACKEND_PORT = int(os.getenv("BACKEND_PORT", 5454))
 # Google API key
 google_api_key = os.getenv("GOOGLE_API_KEY", "")
 
+# GitHub ingestion
+GITHUB_CONTEXT_CACHE_SIZE = int(os.getenv("GITHUB_CONTEXT_CACHE_SIZE", 32))
+GITHUB_MAX_FILE_SIZE = int(os.getenv("GITHUB_MAX_FILE_SIZE", 10 * 1024 * 1024))
+REPO_CACHE_DIR = os.getenv(
+    "REPO_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "agentic-browser", "repos"),
+)
+GITHUB_PACK_DIR = os.getenv(
+    "GITHUB_PACK_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "agentic-browser", "packs"),
+)
+# packs unused for this long are deleted, then the least recently used ones
+# until they fit in GITHUB_PACK_MAX_BYTES (0 disables either limit)
+GITHUB_PACK_MAX_AGE_SECONDS = int(os.getenv("GITHUB_PACK_MAX_AGE_SECONDS", 7 * 24 * 3600))
+GITHUB_PACK_MAX_BYTES = int(os.getenv("GITHUB_PACK_MAX_BYTES", 2_000_000_000))
+
+# Map-reduce answering for contexts larger than the model window (in characters,
+# roughly 4 per token)
+LLM_CONTEXT_CHARS = int(os.getenv("LLM_CONTEXT_CHARS", 400_000))
+MAP_REDUCE_CHUNK_CHARS = int(os.getenv("MAP_REDUCE_CHUNK_CHARS", 60_000))
+MAP_REDUCE_CONCURRENCY = int(os.getenv("MAP_REDUCE_CONCURRENCY", 4))
+# share of failed map calls above which the answer is refused rather than partial
+MAP_REDUCE_MAX_FAILED_SHARE = float(os.getenv("MAP_REDUCE_MAX_FAILED_SHARE", 0.25))
+
+# YouTube transcripts: window length used for retrieval and the transcript
+# budget per question before only the relevant windows are sent
+YOUTUBE_WINDOW_SECONDS = float(os.getenv("YOUTUBE_WINDOW_SECONDS", 60))
+YOUTUBE_CONTEXT_CHARS = int(os.getenv("YOUTUBE_CONTEXT_CHARS", 24_000))
+
+# yt-dlp extractions: worker threads (each keeping one YoutubeDL instance) and
+# the per-call timeout
+YOUTUBE_POOL_SIZE = int(os.getenv("YOUTUBE_POOL_SIZE", 4))
+YOUTUBE_TIMEOUT_SECONDS = float(os.getenv("YOUTUBE_TIMEOUT_SECONDS", 60))
+
+# Subtitle languages in order of preference; "orig" is the video's own language
+YOUTUBE_SUBTITLE_LANGS = os.getenv("YOUTUBE_SUBTITLE_LANGS", "en,orig")
+
+# Per-video cache of extracted info and transcripts, and playlist/channel
+# batches: videos fetched at once and the most videos taken from one list
+YOUTUBE_CACHE_SIZE = int(os.getenv("YOUTUBE_CACHE_SIZE", 256))
+YOUTUBE_BATCH_CONCURRENCY = int(os.getenv("YOUTUBE_BATCH_CONCURRENCY", 4))
+YOUTUBE_BATCH_MAX_VIDEOS = int(os.getenv("YOUTUBE_BATCH_MAX_VIDEOS", 50))
+
+# How long a video found unavailable, or without subtitles in the requested
+# languages, is answered from cache instead of extracted again (0 disables)
+YOUTUBE_NEGATIVE_TTL_SECONDS = float(os.getenv("YOUTUBE_NEGATIVE_TTL_SECONDS", 600))
+
+# LLM routing: ordered fallback candidates ("provider[:model],..."), per-call
+# timeout, and hedging (a backup request once the primary exceeds its p95
+# latency, or the fixed delay until enough samples exist)
+LLM_FALLBACKS = os.getenv("LLM_FALLBACKS", "")
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", 120))
+LLM_HEDGE = os.getenv("LLM_HEDGE", "false").lower() in ("1", "true", "yes")
+LLM_HEDGE_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DELAY_SECONDS", 15))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", 20))
+
+# Per-provider circuit breaker (consecutive failures before opening, seconds
+# before a probe) and adaptive concurrency limit for LLM calls
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", 5))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", 30))
+LLM_CONCURRENCY_INITIAL = int(os.getenv("LLM_CONCURRENCY_INITIAL", 8))
+LLM_CONCURRENCY_MAX = int(os.getenv("LLM_CONCURRENCY_MAX", 64))
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", 30))
+
+# Client-side quotas per provider and API key: "provider=rpm/tpm,..." (tpm
+# optional). Calls wait up to QUOTA_MAX_WAIT_SECONDS for capacity, else are shed
+LLM_RATE_LIMITS = os.getenv("LLM_RATE_LIMITS", "")
+QUOTA_MAX_WAIT_SECONDS = float(os.getenv("QUOTA_MAX_WAIT_SECONDS", 10))
+QUOTA_OUTPUT_TOKENS = int(os.getenv("QUOTA_OUTPUT_TOKENS", 1024))
+
+# Background jobs: SQLite store, worker count and how long finished jobs are kept
+JOBS_DB_PATH = os.getenv(
+    "JOBS_DB_PATH",
+    os.path.join(os.path.expanduser("~"), ".cache", "agentic-browser", "jobs.sqlite3"),
+)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", 7 * 24 * 3600))
+
+# Production server (agentic-api-serve): worker processes (default: CPU count),
+# listen backlog, idle keep-alive, and how long SIGTERM waits for in-flight
+# requests such as slow LLM calls
+SERVE_WORKERS = int(os.getenv("SERVE_WORKERS", 0)) or os.cpu_count() or 1
+SERVE_BACKLOG = int(os.getenv("SERVE_BACKLOG", 2048))
+SERVE_KEEP_ALIVE_SECONDS = int(os.getenv("SERVE_KEEP_ALIVE_SECONDS", 75))
+SERVE_GRACEFUL_TIMEOUT_SECONDS = int(float(os.getenv("SERVE_GRACEFUL_TIMEOUT_SECONDS", LLM_TIMEOUT_SECONDS)))
+
+# Responses at least this many bytes are gzip/brotli compressed for clients
+# that accept it; streamed responses are always compressed
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+
+# Website fetching: default mode (jina, local, or auto = local then Jina),
+# per-URL timeout, pooled connections shared by all fetches, concurrent
+# fetches per target host, and URLs per batch request
+WEBSITE_FETCH_MODE = os.getenv("WEBSITE_FETCH_MODE", "jina").lower()
+WEBSITE_FETCH_TIMEOUT_SECONDS = float(os.getenv("WEBSITE_FETCH_TIMEOUT_SECONDS", 30))
+WEBSITE_MAX_CONNECTIONS = int(os.getenv("WEBSITE_MAX_CONNECTIONS", 32))
+WEBSITE_PER_HOST_CONCURRENCY = int(os.getenv("WEBSITE_PER_HOST_CONCURRENCY", 4))
+WEBSITE_BATCH_MAX_URLS = int(os.getenv("WEBSITE_BATCH_MAX_URLS", 100))
+# largest response body read from a site, and whether local fetches may reach
+# loopback, private-network and link-local addresses (off: such URLs are refused)
+WEBSITE_MAX_BYTES = int(os.getenv("WEBSITE_MAX_BYTES", 5_000_000))
+WEBSITE_ALLOW_PRIVATE_HOSTS = os.getenv("WEBSITE_ALLOW_PRIVATE_HOSTS", "false").lower() in ("1", "true", "yes")
+# parsed pages (MDPageInfo) kept in memory for follow-up questions
+WEBSITE_PAGE_CACHE_SIZE = int(os.getenv("WEBSITE_PAGE_CACHE_SIZE", 64))
+
+# Site crawler: link depth and page budget per crawl, concurrent fetches,
+# and minimum delay between requests to one host (robots.txt Crawl-delay
+# wins when larger)
+CRAWL_MAX_DEPTH = int(os.getenv("CRAWL_MAX_DEPTH", 2))
+CRAWL_MAX_PAGES = int(os.getenv("CRAWL_MAX_PAGES", 50))
+CRAWL_CONCURRENCY = int(os.getenv("CRAWL_CONCURRENCY", 8))
+CRAWL_DELAY_SECONDS = float(os.getenv("CRAWL_DELAY_SECONDS", 0.25))
+
 # logging setup
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
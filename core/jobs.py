@@ -0,0 +1,389 @@
+"""
+Background jobs for work that outlasts an HTTP request.
+
+Submitting a job stores it in a local SQLite database and returns its id at
+once. A fixed pool of asyncio workers takes queued jobs by priority lane
+(high, normal, low). Blocking handlers run in threads so they don't hold up
+the event loop. Clients poll the job, or get it POSTed to their webhook when
+it finishes. Jobs still queued or running when the process stopped are
+queued again on start.
+"""
+
+import asyncio
+import inspect
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Callable, Literal
+
+import requests
+from pydantic import BaseModel
+
+from .config import (
+    JOB_RETENTION_SECONDS,
+    JOB_WORKERS,
+    JOBS_DB_PATH,
+    get_logger,
+)
+
+logger = get_logger(__name__)
+
+JOB_LANES = {"high": 0, "normal": 1, "low": 2}
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+
+_WEBHOOK_ATTEMPTS = 3
+
+# payload fields kept in memory only, never written to the job database
+SECRET_FIELDS = {"api_key", "llm_api_key"}
+_REDACTED = "[redacted]"
+
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    status: JobStatus
+    priority: str
+    payload: dict
+    result: Any = None
+    error: str | None = None
+    webhook_url: str | None = None
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+
+
+# kind -> (payload model, handler taking the validated payload)
+_handlers: dict[str, tuple[type[BaseModel], Callable[[Any], Any]]] = {}
+
+
+def job_handler(kind: str, payload_model: type[BaseModel]):
+    """Register the function that runs jobs of `kind`; it may be sync or async."""
+
+    def decorator(fn):
+        _handlers[kind] = (payload_model, fn)
+        return fn
+
+    return decorator
+
+
+def job_kinds() -> list[str]:
+    return sorted(_handlers)
+
+
+class JobStore:
+    """Jobs table in SQLite; safe to share between the loop and worker threads."""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                status TEXT NOT NULL,
+                priority TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                webhook_url TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                worker_pid INTEGER
+            )
+            """
+        )
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        if "worker_pid" not in columns:
+            # databases created before claims recorded the worker process
+            try:
+                self._db.execute("ALTER TABLE jobs ADD COLUMN worker_pid INTEGER")
+            except sqlite3.OperationalError:
+                pass  # a sibling process added it first
+        self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self._lock = threading.Lock()
+
+    _COLUMNS = (
+        "id, kind, status, priority, payload, result, error, webhook_url, "
+        "created_at, started_at, finished_at"
+    )
+
+    def _row_to_job(self, row: tuple) -> Job:
+        (id, kind, status, priority, payload, result, error, webhook_url,
+         created_at, started_at, finished_at) = row
+        return Job(
+            id=id,
+            kind=kind,
+            status=status,
+            priority=priority,
+            payload=json.loads(payload),
+            result=json.loads(result) if result is not None else None,
+            error=error,
+            webhook_url=webhook_url,
+            created_at=created_at,
+            started_at=started_at,
+            finished_at=finished_at,
+        )
+
+    def create(self, kind: str, payload: dict, priority: str, webhook_url: str | None) -> Job:
+        job = Job(
+            id=uuid.uuid4().hex,
+            kind=kind,
+            status="queued",
+            priority=priority,
+            payload=payload,
+            webhook_url=webhook_url,
+            created_at=time.time(),
+        )
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, kind, status, priority, payload, webhook_url, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job.id, kind, job.status, priority, json.dumps(payload), webhook_url, job.created_at),
+            )
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            row = self._db.execute(f"SELECT {self._COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    def claim(self, job_id: str) -> bool:
+        """Mark a queued job running; False if another worker process got it first."""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, worker_pid = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (time.time(), os.getpid(), job_id),
+            )
+        return cursor.rowcount == 1
+
+    def requeue_interrupted(self, worker_pid: int | None = None) -> int:
+        """
+        Put jobs left running by a stopped process back in the queue: those
+        claimed by `worker_pid`, or all of them.
+        """
+        query = (
+            "UPDATE jobs SET status = 'queued', started_at = NULL, worker_pid = NULL "
+            "WHERE status = 'running'"
+        )
+        params: tuple = ()
+        if worker_pid is not None:
+            query += " AND worker_pid = ?"
+            params = (worker_pid,)
+        with self._lock:
+            cursor = self._db.execute(query, params)
+        return cursor.rowcount
+
+    def finish(self, job_id: str, result: Any = None, error: str | None = None) -> None:
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (
+                    "failed" if error is not None else "succeeded",
+                    json.dumps(result) if error is None else None,
+                    error,
+                    time.time(),
+                    job_id,
+                ),
+            )
+
+    def queued(self) -> list[Job]:
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT {self._COLUMNS} FROM jobs WHERE status = 'queued' ORDER BY created_at"
+            ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    def purge(self, older_than: float) -> int:
+        with self._lock:
+            cursor = self._db.execute(
+                "DELETE FROM jobs WHERE status IN ('succeeded', 'failed') AND finished_at < ?",
+                (time.time() - older_than,),
+            )
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def _send_webhook(job: Job, check_url: Callable[[str], None] | None = None) -> None:
+    if check_url is not None:
+        try:
+            check_url(job.webhook_url)
+        except ValueError as e:
+            logger.warning(f"Not sending the webhook for job {job.id}: {e}")
+            return
+    for attempt in range(_WEBHOOK_ATTEMPTS):
+        try:
+            # redirects could lead past `check_url`
+            response = requests.post(
+                job.webhook_url, json=job.model_dump(), timeout=10, allow_redirects=False
+            )
+            if response.status_code < 500:
+                return
+            reason = f"HTTP {response.status_code}"
+        except requests.RequestException as e:
+            reason = str(e)
+        logger.warning(f"Webhook for job {job.id} failed ({reason}), attempt {attempt + 1}")
+        if attempt + 1 < _WEBHOOK_ATTEMPTS:
+            time.sleep(2**attempt)
+
+
+def recover_jobs(store: JobStore | None = None) -> None:
+    """Purge expired jobs and re-queue interrupted ones before workers start."""
+    own_store = store is None
+    store = store or JobStore(JOBS_DB_PATH)
+    try:
+        purged = store.purge(JOB_RETENTION_SECONDS)
+        if purged:
+            logger.info(f"Purged {purged} expired jobs")
+        requeued = store.requeue_interrupted()
+        if requeued:
+            logger.info(f"Re-queued {requeued} jobs interrupted by the last shutdown")
+    finally:
+        if own_store:
+            store.close()
+
+
+def requeue_worker_jobs(worker_pid: int) -> int:
+    """Re-queue the jobs a dead server worker was running, so its replacement picks them up."""
+    store = JobStore(JOBS_DB_PATH)
+    try:
+        requeued = store.requeue_interrupted(worker_pid)
+    finally:
+        store.close()
+    if requeued:
+        logger.info(f"Re-queued {requeued} jobs interrupted by worker {worker_pid}")
+    return requeued
+
+
+class JobQueue:
+    def __init__(
+        self,
+        db_path: str = JOBS_DB_PATH,
+        workers: int = JOB_WORKERS,
+        check_webhook: Callable[[str], None] | None = None,
+    ):
+        """
+        `check_webhook` raises ValueError for webhook URLs the server must
+        not POST to; it runs on submit and again before each delivery.
+        """
+        self.db_path = db_path
+        self.workers = workers
+        self.check_webhook = check_webhook
+        self.store: JobStore | None = None
+        self._queue: asyncio.PriorityQueue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._webhooks: set[asyncio.Task] = set()
+        self._secrets: dict[str, dict] = {}
+        self._seq = itertools.count()
+
+    async def start(self, recover: bool = True) -> None:
+        """
+        Open the store and start the workers.
+
+        `recover` re-queues jobs a previous process left running. Pre-forked
+        server workers share the database, so the launcher recovers once
+        before forking (and for each worker that dies) and the workers pass
+        False.
+        """
+        self.store = JobStore(self.db_path)
+        if recover:
+            recover_jobs(self.store)
+        self._queue = asyncio.PriorityQueue()
+        # queued jobs may also sit in sibling workers' queues; claim() settles who runs them
+        for job in self.store.queued():
+            self._enqueue(job)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def _enqueue(self, job: Job) -> None:
+        # the sequence number keeps FIFO order within a lane
+        self._queue.put_nowait((JOB_LANES[job.priority], next(self._seq), job.id))
+
+    def submit(
+        self,
+        kind: str,
+        payload: dict,
+        priority: str = "normal",
+        webhook_url: str | None = None,
+    ) -> Job:
+        if self.store is None:
+            raise RuntimeError("Job queue is not running.")
+        if kind not in _handlers:
+            raise ValueError(f"Unknown job kind: '{kind}'. Choose from {', '.join(job_kinds())}")
+        if priority not in JOB_LANES:
+            raise ValueError(f"Unknown priority: '{priority}'. Choose from {', '.join(JOB_LANES)}")
+        if webhook_url and self.check_webhook is not None:
+            self.check_webhook(webhook_url)
+        payload_model, _ = _handlers[kind]
+        # validate up front so a bad payload fails the submit, not the job
+        payload = payload_model(**payload).model_dump()
+        secrets = {k: payload[k] for k in SECRET_FIELDS if payload.get(k)}
+        stored = {**payload, **{k: _REDACTED for k in secrets}}
+        job = self.store.create(kind, stored, priority, webhook_url)
+        if secrets:
+            self._secrets[job.id] = secrets
+        self._enqueue(job)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self.store.get(job_id) if self.store is not None else None
+
+    async def _worker(self) -> None:
+        while True:
+            _lane, _seq, job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.exception(f"Job {job_id} crashed the worker loop")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = self.store.get(job_id)
+        if job is None or job.status != "queued":
+            return
+        payload_model, handler = _handlers[job.kind]
+        if not self.store.claim(job_id):
+            return
+        logger.info(f"Running job {job_id} ({job.kind}, {job.priority})")
+        try:
+            secrets = self._secrets.pop(job_id, {})
+            if any(job.payload.get(k) == _REDACTED and k not in secrets for k in SECRET_FIELDS):
+                raise RuntimeError("API key was not persisted across the restart; resubmit the job.")
+            payload = payload_model(**{**job.payload, **secrets})
+            if inspect.iscoroutinefunction(handler):
+                result = await handler(payload)
+            else:
+                result = await asyncio.to_thread(handler, payload)
+            if isinstance(result, BaseModel):
+                result = result.model_dump()
+            self.store.finish(job_id, result=result)
+        except Exception as e:
+            logger.warning(f"Job {job_id} ({job.kind}) failed: {e}")
+            self.store.finish(job_id, error=str(e) or type(e).__name__)
+
+        job = self.store.get(job_id)
+        if job.webhook_url:
+            # retries back off for seconds; don't hold the worker meanwhile
+            task = asyncio.create_task(asyncio.to_thread(_send_webhook, job, self.check_webhook))
+            self._webhooks.add(task)
+            task.add_done_callback(self._webhooks.discard)
@@ -1,15 +1,20 @@
 import os
 from .config import google_api_key
-from typing import Literal, Any
+from typing import Iterator, Literal, Any
 
 from langchain_core.language_models.chat_models import BaseChatModel
 from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableLambda
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI
 from langchain_anthropic import ChatAnthropic
 from langchain_ollama import ChatOllama
 
+from .quota import estimate_tokens, metered, prompt_text
+from .resilience import guarded, key_fingerprint
+from .singleflight import SingleFlight, freeze
+
 
 PROVIDER_CONFIGS = {
     "google": {
@@ -67,6 +72,9 @@ PROVIDER_CONFIGS = {
     },
 }
 
+# identical concurrent calls to a deterministic (temperature 0) model share one request
+_deterministic_calls = SingleFlight("llm")
+
 
 class LargeLanguageModel:
     def __init__(
@@ -111,6 +119,7 @@ class LargeLanguageModel:
 
         params["model"] = self.model_name
 
+        final_api_key: str | None = None
         if config["api_key_env"]:
             final_api_key = api_key if api_key else os.getenv(config["api_key_env"])
             if not final_api_key:
@@ -148,6 +157,11 @@ class LargeLanguageModel:
             )
 
         params.update(kwargs)
+        self.temperature = temperature
+        self.key_fingerprint = key_fingerprint(final_api_key)
+        self._flight_key = freeze(
+            (self.provider, self.model_name, self.key_fingerprint, final_base_url, kwargs)
+        )
 
         # Validate model names for specific providers
         if self.provider == "google":
@@ -175,6 +189,8 @@ class LargeLanguageModel:
 
         try:
             self.client = llm_class(**params)
+            # chain step that goes through the circuit breaker and concurrency limit
+            self.runnable = RunnableLambda(self.invoke)
             print(
                 f"Successfully initialized {self.provider} LLM with model: {self.model_name}"
             )
@@ -185,11 +201,54 @@ class LargeLanguageModel:
                 f"Details: {e}. Check your API keys, base URLs, and model names."
             )
 
+    def invoke(self, input: Any) -> BaseMessage:
+        """`client.invoke` under this provider's quota, circuit breaker and concurrency limit."""
+        if self.temperature == 0:
+            key = (self._flight_key, "invoke", prompt_text(input))
+            return _deterministic_calls.do(key, self._invoke, input)
+        return self._invoke(input)
+
+    def _invoke(self, input: Any) -> BaseMessage:
+        with metered(self.provider, self.key_fingerprint, estimate_tokens(input)) as reservation:
+            with guarded(self.provider, self.key_fingerprint):
+                response = self.client.invoke(input)
+            reservation.settle(response)
+            return response
+
+    def stream(self, input: Any) -> Iterator[str]:
+        """`invoke`, yielding the response text as the provider produces it."""
+        with metered(self.provider, self.key_fingerprint, estimate_tokens(input)) as reservation:
+            with guarded(self.provider, self.key_fingerprint):
+                response = None
+                for chunk in self.client.stream(input):
+                    response = chunk if response is None else response + chunk
+                    # `text` is a method in older langchain-core and a property in newer
+                    text = chunk.text() if callable(chunk.text) else chunk.text
+                    if text:
+                        yield text
+            reservation.settle(response)
+
     def generate_text(
         self,
         prompt: str,
         system_message: str | None = None,
     ) -> str:
+        if self.temperature == 0:
+            key = (self._flight_key, "text", system_message, prompt)
+            return _deterministic_calls.do(key, self._guarded_generate_text, prompt, system_message)
+        return self._guarded_generate_text(prompt, system_message)
+
+    def _guarded_generate_text(self, prompt: str, system_message: str | None = None) -> str:
+        estimated = estimate_tokens(prompt + (system_message or ""))
+        with metered(self.provider, self.key_fingerprint, estimated):
+            with guarded(self.provider, self.key_fingerprint):
+                return self._generate_text(prompt, system_message)
+
+    def _generate_text(
+        self,
+        prompt: str,
+        system_message: str | None = None,
+    ) -> str:
 
         messages: list[BaseMessage] = []
         if system_message:
@@ -0,0 +1,197 @@
+"""
+Client-side request and token quotas for LLM providers.
+
+Limits come from `LLM_RATE_LIMITS` ("provider=rpm/tpm,...") and apply per
+provider and API key fingerprint, matching how providers enforce them. Each
+quota has two token buckets: requests per minute and estimated tokens per
+minute. A call waits for capacity if it will free up within
+`QUOTA_MAX_WAIT_SECONDS`; otherwise it is shed with `QuotaExceededError`
+before it ever reaches the provider and earns a 429 there.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+from .config import (
+    LLM_RATE_LIMITS,
+    QUOTA_MAX_WAIT_SECONDS,
+    QUOTA_OUTPUT_TOKENS,
+    get_logger,
+)
+
+logger = get_logger(__name__)
+
+
+class QuotaExceededError(RuntimeError):
+    """The call would exceed the provider quota for longer than callers may wait."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_rate_limits(spec: str) -> dict[str, tuple[int, int | None]]:
+    """'google=15/1000000,openai=500' -> {provider: (rpm, tpm or None)}."""
+    limits = {}
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        provider, _, values = item.partition("=")
+        rpm, _, tpm = values.partition("/")
+        limits[provider.strip().lower()] = (int(rpm), int(tpm) if tpm.strip() else None)
+    return limits
+
+
+def prompt_text(input: Any) -> str:
+    """Text of a chat-model input: a prompt value, a message list or a string."""
+    if hasattr(input, "to_string"):
+        return input.to_string()
+    if isinstance(input, list):
+        return "\n".join(str(getattr(m, "content", m)) for m in input)
+    return str(input)
+
+
+def estimate_tokens(input: Any) -> int:
+    """Rough prompt size (~4 characters per token) plus the expected completion."""
+    return len(prompt_text(input)) // 4 + QUOTA_OUTPUT_TOKENS
+
+
+class TokenBucket:
+    """Holds up to `capacity` units, refilled continuously at `capacity` per minute."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.rate = capacity / 60.0
+        self.available = float(capacity)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        # a single request larger than the bucket only needs it full
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def take(self, amount: float) -> None:
+        # may go negative when usage is settled above the estimate
+        self._refill()
+        self.available -= amount
+
+    def give(self, amount: float) -> None:
+        self._refill()
+        self.available = min(self.capacity, self.available + amount)
+
+    @property
+    def utilization(self) -> float:
+        self._refill()
+        return round(1 - max(self.available, 0) / self.capacity, 3)
+
+
+class Quota:
+    def __init__(self, rpm: int, tpm: int | None):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.shed = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, key: str, tokens: int, max_wait: float) -> None:
+        deadline = time.monotonic() + max_wait
+        while True:
+            with self._lock:
+                wait = self.requests.wait_time(1)
+                if self.tokens is not None:
+                    wait = max(wait, self.tokens.wait_time(tokens))
+                if wait == 0:
+                    self.requests.take(1)
+                    if self.tokens is not None:
+                        self.tokens.take(tokens)
+                    return
+                remaining = deadline - time.monotonic()
+                if wait > remaining:
+                    self.shed += 1
+                    raise QuotaExceededError(
+                        f"{key}: rate limit reached, capacity frees up in {wait:.1f}s",
+                        retry_after=wait,
+                    )
+            time.sleep(wait)
+
+    def settle(self, estimated: int, actual: int) -> None:
+        """Correct the token bucket once the provider reports real usage."""
+        if self.tokens is None:
+            return
+        with self._lock:
+            if actual > estimated:
+                self.tokens.take(actual - estimated)
+            else:
+                self.tokens.give(estimated - actual)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            snapshot = {
+                "rpm_limit": self.requests.capacity,
+                "request_utilization": self.requests.utilization,
+                "shed": self.shed,
+            }
+            if self.tokens is not None:
+                snapshot["tpm_limit"] = self.tokens.capacity
+                snapshot["token_utilization"] = self.tokens.utilization
+            return snapshot
+
+
+_limits = parse_rate_limits(LLM_RATE_LIMITS)
+_quotas: dict[str, Quota] = {}
+_quotas_lock = threading.Lock()
+
+
+def quota_for(provider: str, fingerprint: str = "default") -> tuple[str, Quota | None]:
+    key = f"{provider}:{fingerprint}"
+    limit = _limits.get(provider.lower())
+    if limit is None:
+        return key, None
+    with _quotas_lock:
+        quota = _quotas.get(key)
+        if quota is None:
+            quota = _quotas[key] = Quota(*limit)
+        return key, quota
+
+
+class Reservation:
+    def __init__(self, quota: Quota | None, estimated: int):
+        self.quota = quota
+        self.estimated = estimated
+
+    def settle(self, response: Any) -> None:
+        """Replace the estimate with the token count reported on `response`, if any."""
+        usage = getattr(response, "usage_metadata", None) or {}
+        if self.quota is not None and usage.get("total_tokens"):
+            self.quota.settle(self.estimated, usage["total_tokens"])
+
+
+@contextmanager
+def metered(
+    provider: str,
+    fingerprint: str,
+    estimated_tokens: int,
+    max_wait: float = QUOTA_MAX_WAIT_SECONDS,
+) -> Iterator[Reservation]:
+    """Wait for (or be refused) quota before the enclosed provider call."""
+    key, quota = quota_for(provider, fingerprint)
+    if quota is not None:
+        quota.acquire(key, estimated_tokens, max_wait)
+    yield Reservation(quota, estimated_tokens)
+
+
+def quota_utilization() -> dict[str, dict]:
+    """Current use of every rate-limited provider quota."""
+    with _quotas_lock:
+        quotas = dict(_quotas)
+    return {key: quota.snapshot() for key, quota in sorted(quotas.items())}
@@ -0,0 +1,233 @@
+"""
+Circuit breakers and adaptive concurrency limits for upstream LLM providers.
+
+Every provider call runs inside `guarded(...)`. The guard for a provider
+(and API key) has two parts. The circuit breaker fails calls fast after
+repeated errors instead of letting them queue for a dead upstream. The AIMD
+limiter caps how many calls may be in flight at once: the cap grows by one
+per window of healthy calls and shrinks when calls fail or slow down well
+past their usual latency.
+"""
+
+import hashlib
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from .config import (
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_SECONDS,
+    LLM_CONCURRENCY_INITIAL,
+    LLM_CONCURRENCY_MAX,
+    LLM_QUEUE_TIMEOUT_SECONDS,
+    get_logger,
+)
+
+logger = get_logger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """The provider's circuit is open; the call was not attempted."""
+
+
+class ConcurrencyLimitError(RuntimeError):
+    """No concurrency slot for the provider became free in time."""
+
+
+def key_fingerprint(api_key: str | None) -> str:
+    """Short, non-reversible label for an API key, safe to log and expose."""
+    if not api_key:
+        return "default"
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:8]
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures; open ->
+    half-open after `reset_seconds`, letting a single probe call through;
+    the probe's outcome closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_seconds: float = CIRCUIT_RESET_SECONDS,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_seconds:
+                    return False
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    return False
+                self._probing = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def cancel(self) -> None:
+        """The allowed call was abandoned before an outcome; free the probe."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            retry_in = 0.0
+            if self.state == self.OPEN:
+                retry_in = max(self.reset_seconds - (time.monotonic() - self.opened_at), 0.0)
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "retry_in_seconds": round(retry_in, 1),
+            }
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit.
+
+    A successful call within `tolerance` times the smoothed latency adds
+    1/limit (about +1 per limit's worth of calls). A failure halves the limit
+    and a slow call trims it by 10%.
+    """
+
+    def __init__(
+        self,
+        initial: int = LLM_CONCURRENCY_INITIAL,
+        maximum: int = LLM_CONCURRENCY_MAX,
+        minimum: int = 1,
+        tolerance: float = 2.0,
+    ):
+        self.limit = float(initial)
+        self.maximum = maximum
+        self.minimum = minimum
+        self.tolerance = tolerance
+        self.in_flight = 0
+        self.latency: float | None = None
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: float | None = None) -> bool:
+        with self._cond:
+            ok = self._cond.wait_for(lambda: self.in_flight < int(self.limit), timeout)
+            if ok:
+                self.in_flight += 1
+            return ok
+
+    def release(self, latency: float | None = None, ok: bool = True) -> None:
+        """Free a slot; `latency` None means the call never reached the provider."""
+        with self._cond:
+            self.in_flight -= 1
+            if latency is not None:
+                self._adjust(latency, ok)
+            self._cond.notify_all()
+
+    def _adjust(self, latency: float, ok: bool) -> None:
+        if not ok:
+            self.limit = max(self.minimum, self.limit / 2)
+            return
+        if self.latency is not None and latency > self.tolerance * self.latency:
+            self.limit = max(self.minimum, self.limit * 0.9)
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        # slow-moving baseline so one outlier does not reset it
+        self.latency = latency if self.latency is None else 0.9 * self.latency + 0.1 * latency
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "limit": int(self.limit),
+                "in_flight": self.in_flight,
+                "latency_seconds": round(self.latency, 2) if self.latency is not None else None,
+            }
+
+
+class ProviderGuard:
+    def __init__(self):
+        self.breaker = CircuitBreaker()
+        self.limiter = AdaptiveLimiter()
+
+
+_guards: dict[str, ProviderGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def guard_for(provider: str, fingerprint: str = "default") -> tuple[str, ProviderGuard]:
+    # keyed per API key too, so one client's bad key cannot open the circuit for everyone
+    key = f"{provider}:{fingerprint}"
+    with _guards_lock:
+        guard = _guards.get(key)
+        if guard is None:
+            guard = _guards[key] = ProviderGuard()
+        return key, guard
+
+
+@contextmanager
+def guarded(
+    provider: str,
+    fingerprint: str = "default",
+    queue_timeout: float = LLM_QUEUE_TIMEOUT_SECONDS,
+) -> Iterator[None]:
+    """Run the enclosed provider call under its circuit breaker and concurrency limit."""
+    key, guard = guard_for(provider, fingerprint)
+    if not guard.breaker.allow():
+        raise CircuitOpenError(f"{key}: circuit open after repeated failures")
+    if not guard.limiter.acquire(queue_timeout):
+        guard.breaker.cancel()
+        raise ConcurrencyLimitError(
+            f"{key}: no concurrency slot free within {queue_timeout}s "
+            f"(limit {int(guard.limiter.limit)})"
+        )
+
+    start = time.monotonic()
+    try:
+        yield
+    except Exception:
+        guard.limiter.release(time.monotonic() - start, ok=False)
+        guard.breaker.record_failure()
+        if guard.breaker.state == CircuitBreaker.OPEN:
+            logger.warning(f"Circuit for {key} is open")
+        raise
+    except BaseException:
+        # interrupted, not a provider failure
+        guard.limiter.release()
+        guard.breaker.cancel()
+        raise
+    guard.limiter.release(time.monotonic() - start)
+    guard.breaker.record_success()
+
+
+def provider_health() -> dict[str, dict]:
+    """Breaker and limiter state of every provider used so far."""
+    with _guards_lock:
+        guards = dict(_guards)
+    return {
+        key: {"circuit": guard.breaker.snapshot(), "concurrency": guard.limiter.snapshot()}
+        for key, guard in sorted(guards.items())
+    }
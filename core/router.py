@@ -0,0 +1,280 @@
+"""
+Failover and hedged requests across LLM providers.
+
+An `LLMRouter` holds an ordered list of provider/model candidates built from
+`PROVIDER_CONFIGS`. A call goes to the first candidate; on an error or a
+timeout it fails over to the next one. With hedging on, a backup request is
+fired at the next candidate once the primary has been running longer than its
+recent p95 latency, and whichever answers first wins.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Iterator
+
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import RunnableLambda
+from pydantic import BaseModel, Field
+
+from .config import (
+    LLM_FALLBACKS,
+    LLM_HEDGE,
+    LLM_HEDGE_DELAY_SECONDS,
+    LLM_HEDGE_MIN_SAMPLES,
+    LLM_TIMEOUT_SECONDS,
+    get_logger,
+)
+from .llm import PROVIDER_CONFIGS, LargeLanguageModel
+
+logger = get_logger(__name__)
+
+# recent successful call durations kept per provider/model
+_LATENCY_WINDOW = 200
+
+
+class ProviderCandidate(BaseModel):
+    provider: str = Field(..., description="Key of PROVIDER_CONFIGS, e.g. 'google'")
+    model_name: str | None = Field(None, description="Model name; the provider default when omitted")
+    api_key: str | None = None
+    base_url: str | None = None
+
+    @property
+    def key(self) -> str:
+        config = PROVIDER_CONFIGS.get(self.provider.lower(), {})
+        return f"{self.provider.lower()}:{self.model_name or config.get('default_model')}"
+
+
+class LatencyTracker:
+    """Sliding window of call durations for one provider/model."""
+
+    def __init__(self, size: int = _LATENCY_WINDOW):
+        self._samples: deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        with self._lock:
+            if len(self._samples) < LLM_HEDGE_MIN_SAMPLES:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+# shared across routers, since chains build a new router per request
+_latencies: dict[str, LatencyTracker] = {}
+_latencies_lock = threading.Lock()
+
+
+def latency_for(key: str) -> LatencyTracker:
+    with _latencies_lock:
+        tracker = _latencies.get(key)
+        if tracker is None:
+            tracker = _latencies[key] = LatencyTracker()
+        return tracker
+
+
+def parse_candidates(spec: str) -> list[ProviderCandidate]:
+    """'google:gemini-2.5-flash,openai' -> candidates, in order."""
+    candidates = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        provider, _, model_name = item.partition(":")
+        candidates.append(
+            ProviderCandidate(provider=provider.strip(), model_name=model_name.strip() or None)
+        )
+    return candidates
+
+
+class LLMRouter:
+    """
+    Drop-in for `LargeLanguageModel` that spreads calls over several providers.
+
+    `generate_text` and `runnable` (for langchain chains) behave like the
+    single-provider versions. Candidate clients are created on first use, so a
+    fallback with a missing API key only matters if it is actually reached.
+    A request that loses a hedge or times out cannot be interrupted; its
+    result is discarded when it eventually returns.
+    """
+
+    def __init__(
+        self,
+        candidates: list[ProviderCandidate | dict],
+        hedge: bool = LLM_HEDGE,
+        timeout: float = LLM_TIMEOUT_SECONDS,
+        temperature: float = 0.4,
+        **kwargs: Any,
+    ):
+        if not candidates:
+            raise ValueError("LLMRouter needs at least one provider candidate.")
+        self.candidates = [
+            c if isinstance(c, ProviderCandidate) else ProviderCandidate(**c)
+            for c in candidates
+        ]
+        self.hedge = hedge
+        self.timeout = timeout
+        self.temperature = temperature
+        self.kwargs = kwargs
+        self.provider = self.candidates[0].provider
+        self.model_name = self.candidates[0].model_name
+        self._models: dict[int, LargeLanguageModel] = {}
+        self._models_lock = threading.Lock()
+        self.runnable = RunnableLambda(self.invoke)
+
+    def _model(self, i: int) -> LargeLanguageModel:
+        with self._models_lock:
+            llm = self._models.get(i)
+            if llm is None:
+                candidate = self.candidates[i]
+                llm = LargeLanguageModel(
+                    model_name=candidate.model_name,
+                    api_key=candidate.api_key or "",
+                    provider=candidate.provider,
+                    base_url=candidate.base_url,
+                    temperature=self.temperature,
+                    **self.kwargs,
+                )
+                self._models[i] = llm
+            return llm
+
+    def hedge_delay(self, i: int) -> float:
+        p95 = latency_for(self.candidates[i].key).percentile(0.95)
+        return p95 if p95 is not None else LLM_HEDGE_DELAY_SECONDS
+
+    def _call(self, i: int, llm: LargeLanguageModel, fn: Callable[[LargeLanguageModel], Any]):
+        start = time.monotonic()
+        result = fn(llm)
+        latency_for(self.candidates[i].key).record(time.monotonic() - start)
+        return result
+
+    def route(self, fn: Callable[[LargeLanguageModel], Any]) -> Any:
+        """Run `fn` against candidates in order until one succeeds."""
+        errors: list[str] = []
+        pending: dict[Future, tuple[int, float]] = {}
+        next_index = 0
+        pool = ThreadPoolExecutor(max_workers=len(self.candidates))
+
+        def launch() -> bool:
+            nonlocal next_index
+            while next_index < len(self.candidates):
+                i = next_index
+                next_index += 1
+                try:
+                    llm = self._model(i)
+                except Exception as e:
+                    errors.append(f"{self.candidates[i].key}: {e}")
+                    continue
+                pending[pool.submit(self._call, i, llm, fn)] = (i, time.monotonic())
+                return True
+            return False
+
+        try:
+            launch()
+            while pending:
+                now = time.monotonic()
+                wake_at = min(started + self.timeout for _, started in pending.values())
+                hedge_at = None
+                if self.hedge and len(pending) == 1 and next_index < len(self.candidates):
+                    i, started = next(iter(pending.values()))
+                    hedge_at = started + self.hedge_delay(i)
+                    wake_at = min(wake_at, hedge_at)
+
+                done, _ = wait(pending, timeout=max(wake_at - now, 0), return_when=FIRST_COMPLETED)
+                for future in done:
+                    i, _started = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.warning(f"LLM call to {self.candidates[i].key} failed: {e}")
+                        errors.append(f"{self.candidates[i].key}: {e}")
+                        continue
+                    if i > 0:
+                        logger.info(f"LLM call served by fallback {self.candidates[i].key}")
+                    return result
+
+                now = time.monotonic()
+                for future, (i, started) in list(pending.items()):
+                    if now >= started + self.timeout:
+                        del pending[future]
+                        logger.warning(f"LLM call to {self.candidates[i].key} timed out after {self.timeout}s")
+                        errors.append(f"{self.candidates[i].key}: timed out after {self.timeout}s")
+
+                if not pending:
+                    launch()
+                elif hedge_at is not None and now >= hedge_at and len(pending) == 1:
+                    logger.info(
+                        f"Hedging slow call to {self.candidates[pending[next(iter(pending))][0]].key}"
+                    )
+                    launch()
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        raise RuntimeError("All LLM providers failed: " + "; ".join(errors))
+
+    def invoke(self, input: Any) -> BaseMessage:
+        """Chat-model invoke with routing; used as `runnable` in chains."""
+        return self.route(lambda llm: llm.invoke(input))
+
+    def stream(self, input: Any) -> Iterator[str]:
+        """
+        Stream from the first candidate that starts answering. Candidates are
+        only switched before the first chunk; there is no hedging or timeout.
+        """
+        errors: list[str] = []
+        for i, candidate in enumerate(self.candidates):
+            try:
+                chunks = self._model(i).stream(input)
+                first = next(chunks, None)
+            except Exception as e:
+                logger.warning(f"LLM stream from {candidate.key} failed: {e}")
+                errors.append(f"{candidate.key}: {e}")
+                continue
+            if i > 0:
+                logger.info(f"LLM stream served by fallback {candidate.key}")
+            if first is not None:
+                yield first
+                yield from chunks
+            return
+        raise RuntimeError("All LLM providers failed: " + "; ".join(errors))
+
+    def generate_text(self, prompt: str, system_message: str | None = None) -> str:
+        return self.route(lambda llm: llm.generate_text(prompt, system_message=system_message))
+
+
+def build_llm(**llm_options: Any) -> LargeLanguageModel | LLMRouter:
+    """
+    LLM for `llm_options` (the `LargeLanguageModel` arguments).
+
+    When `LLM_FALLBACKS` is configured the requested provider becomes the
+    primary candidate of a router with those fallbacks behind it.
+    """
+    fallbacks = parse_candidates(LLM_FALLBACKS)
+    if not fallbacks:
+        return LargeLanguageModel(**llm_options)
+
+    options = dict(llm_options)
+    primary = ProviderCandidate(
+        provider=options.pop("provider", "google"),
+        model_name=options.pop("model_name", None),
+        api_key=options.pop("api_key", None) or None,
+        base_url=options.pop("base_url", None),
+    )
+    candidates = [primary] + [c for c in fallbacks if c.key != primary.key]
+    return LLMRouter(candidates, **options)
+
+
+if __name__ == "__main__":
+    router = LLMRouter(
+        [
+            ProviderCandidate(provider="google", model_name="gemini-2.5-flash"),
+            ProviderCandidate(provider="openai", model_name="gpt-5-mini"),
+        ],
+        hedge=True,
+    )
+    print(router.generate_text("Hello, how are you?"))
@@ -0,0 +1,148 @@
+"""
+Request coalescing: concurrent identical calls share one upstream operation.
+
+The first caller for a key runs the operation; callers arriving while it is
+in flight wait for it and receive the same result or exception. Nothing is
+cached afterwards, so the next call after completion runs again.
+"""
+
+import asyncio
+import functools
+import inspect
+import threading
+from typing import Any, Awaitable, Callable, Hashable
+
+from .config import get_logger
+
+logger = get_logger(__name__)
+
+
+def freeze(value: Any) -> Hashable:
+    """Hashable stand-in for call arguments (lists, sets and dicts included)."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(v) for v in value)
+    return value if isinstance(value, Hashable) else repr(value)
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Thread-based coalescing for blocking functions."""
+
+    def __init__(self, name: str = "singleflight"):
+        self.name = name
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.waiters += 1
+
+        if not leader:
+            logger.debug(f"{self.name}: joining in-flight call")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            if call.waiters:
+                logger.info(f"{self.name}: served {call.waiters} coalesced callers")
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """
+    Task-based coalescing for coroutines. A cancelled waiter does not cancel
+    the others; the shared call is cancelled when its last waiter goes away.
+    """
+
+    def __init__(self, name: str = "singleflight"):
+        self.name = name
+        self._tasks: dict[Hashable, asyncio.Task] = {}
+        self._waiters: dict[Hashable, int] = {}
+
+    async def do(
+        self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any
+    ) -> Any:
+        # tasks belong to a loop, so flights are not shared across loops
+        key = (id(asyncio.get_running_loop()), key)
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._tasks[key] = task
+
+            def _done(t: asyncio.Task, k: Hashable = key) -> None:
+                if self._tasks.get(k) is t:
+                    del self._tasks[k]
+                    self._waiters.pop(k, None)
+
+            task.add_done_callback(_done)
+        else:
+            logger.debug(f"{self.name}: joining in-flight call")
+        self._waiters[key] = self._waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            if self._tasks.get(key) is task:
+                self._waiters[key] -= 1
+                if not self._waiters[key] and not task.done():
+                    logger.debug(f"{self.name}: no callers left; cancelling the call")
+                    task.cancel()
+
+
+def coalesce(key: Callable[..., Hashable] | None = None):
+    """
+    Decorator that coalesces concurrent calls with equal arguments.
+
+    `key` maps the call arguments to the coalescing key; by default all
+    arguments are used. Works on plain and `async` functions.
+    """
+
+    def decorator(fn):
+        def make_key(args, kwargs):
+            return key(*args, **kwargs) if key else freeze((args, kwargs))
+
+        if inspect.iscoroutinefunction(fn):
+            async_flight = AsyncSingleFlight(fn.__qualname__)
+
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                return await async_flight.do(make_key(args, kwargs), fn, *args, **kwargs)
+
+            async_wrapper.flight = async_flight
+            return async_wrapper
+
+        flight = SingleFlight(fn.__qualname__)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            return flight.do(make_key(args, kwargs), fn, *args, **kwargs)
+
+        wrapper.flight = flight
+        return wrapper
+
+    return decorator
@@ -432,6 +432,26 @@ def make_api_request(endpoint: str, method: str = "GET", data: Optional[Dict] =
     except Exception as e:
         return {"success": False, "error": f"Unexpected error: {str(e)}"}
 
+def run_job(kind: str, payload: Dict, timeout: int = 900, poll_interval: float = 2.0) -> Dict[str, Any]:
+    """Submit a background job and poll it until it finishes, for work longer than a request timeout"""
+    submitted = make_api_request("/v1/jobs", "POST", {"kind": kind, "payload": payload, "priority": "high"})
+    if not submitted["success"]:
+        return submitted
+
+    job_id = submitted["data"]["id"]
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        polled = make_api_request(f"/v1/jobs/{job_id}")
+        if not polled["success"]:
+            return polled
+        job = polled["data"]
+        if job["status"] == "succeeded":
+            return {"success": True, "data": job["result"]}
+        if job["status"] == "failed":
+            return {"success": False, "error": job["error"]}
+        time.sleep(poll_interval)
+    return {"success": False, "error": f"Job {job_id} still running after {timeout}s"}
+
 def display_response(response: Dict[str, Any]):
     """Display API response with proper formatting"""
     if response["success"]:
@@ -1094,7 +1114,7 @@ def github_analysis_interface():
             if llm_temperature != 0.4:
                 data["llm_temperature"] = llm_temperature
             
-            response = make_api_request("/v1/github/answer", "POST", data)
+            response = run_job("github.answer", data)
             display_response(response)
 
 def website_markdown_interface():
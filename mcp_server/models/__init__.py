@@ -1,3 +1,12 @@
-from yt import YTVideoInfo
+from .page import MDCodeBlock, MDHeading, MDImage, MDLink, MDPageInfo, MDTable
+from .yt import YTVideoInfo
 
-__all__ = ["YTVideoInfo"]
+__all__ = [
+    "MDCodeBlock",
+    "MDHeading",
+    "MDImage",
+    "MDLink",
+    "MDPageInfo",
+    "MDTable",
+    "YTVideoInfo",
+]
@@ -0,0 +1,44 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel, Field
+
+
+class MDHeading(BaseModel):
+    level: int
+    text: str
+    anchor: Optional[str] = None
+
+
+class MDLink(BaseModel):
+    text: str = Field(default="")
+    url: str
+
+
+class MDImage(BaseModel):
+    alt: str = Field(default="")
+    src: str
+
+
+class MDCodeBlock(BaseModel):
+    language: Optional[str] = None
+    code: str
+
+
+class MDTable(BaseModel):
+    headers: List[str] = Field(default_factory=list)
+    rows: List[List[str]] = Field(default_factory=list)
+
+
+class MDPageInfo(BaseModel):
+    url: Optional[str] = None
+    title: str = Field(default="")
+    metadata: Dict[str, str] = Field(default_factory=dict)
+    author: Optional[str] = None
+    last_updated: Optional[str] = None
+    tags: List[str] = Field(default_factory=list)
+    headings: List[MDHeading] = Field(default_factory=list)
+    paragraphs: List[str] = Field(default_factory=list)
+    links: List[MDLink] = Field(default_factory=list)
+    images: List[MDImage] = Field(default_factory=list)
+    code_blocks: List[MDCodeBlock] = Field(default_factory=list)
+    tables: List[MDTable] = Field(default_factory=list)
+    markdown: str = Field(default="")
@@ -14,3 +14,4 @@ class YTVideoInfo(BaseModel):
     categories: List[str] = Field(default_factory=list)
     captions: Optional[str] = None
     transcript: Optional[str] = None
+    transcript_language: Optional[str] = None
@@ -1,13 +1,31 @@
+import asyncio
+import json
 from typing import Optional, Any
 
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp import types as mcp
 
+from core.config import YOUTUBE_WINDOW_SECONDS
 from core.llm import LargeLanguageModel
+from core.quota import quota_utilization
+from core.resilience import provider_health
+from core.router import LLMRouter, ProviderCandidate
 from prompts.github import github_processor_optimized
-from tools.website_context.request_md import return_markdown as fetch_markdown
+from prompts.youtube import (
+    answer_from_transcript as youtube_answer_from_transcript,
+    fetch_timed_transcript_async,
+    format_windows,
+    get_chain as youtube_chain,
+)
+from tools.github_crawler.context_store import (
+    ingest_repository,
+    get_ingested_context,
+    get_code_index,
+)
+from tools.website_context.fetcher import fetch_markdown_async
 from tools.website_context.html_md import return_html_md as html_to_md
+from tools.youtube_utils.get_info import get_video_info_async
 
 
 server = Server("agentic-browser-mcp")
@@ -40,10 +58,29 @@ async def list_tools() -> list[mcp.Tool]:
                     "api_key": {"type": "string"},
                     "base_url": {"type": "string"},
                     "temperature": {"type": "number", "default": 0.4},
+                    "fallbacks": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "provider": {"type": "string"},
+                                "model_name": {"type": "string"},
+                                "api_key": {"type": "string"},
+                                "base_url": {"type": "string"},
+                            },
+                            "required": ["provider"],
+                        },
+                    },
+                    "hedge": {"type": "boolean", "default": False},
                 },
                 "required": ["prompt"],
             },
         ),
+        mcp.Tool(
+            name="llm.status",
+            description="Circuit breaker, concurrency and rate-limit utilization per LLM provider",
+            inputSchema={"type": "object", "properties": {}},
+        ),
         mcp.Tool(
             name="github.answer",
             description="Answer a question about a repository using provided context",
@@ -55,28 +92,94 @@ async def list_tools() -> list[mcp.Tool]:
                     "tree": {"type": "string"},
                     "summary": {"type": "string"},
                     "chat_history": {"type": "string"},
+                    "context_id": {"type": "string"},
+                },
+                "required": ["question"],
+            },
+        ),
+        mcp.Tool(
+            name="github.ingest",
+            description="Ingest a GitHub repository server-side and return a context_id for github.answer",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "repo_url": {"type": "string"},
+                    "refresh": {"type": "boolean", "default": False},
+                    "engine": {
+                        "type": "string",
+                        "enum": ["gitingest", "native", "incremental"],
+                        "default": "gitingest",
+                    },
+                    "include_patterns": {"type": "array", "items": {"type": "string"}},
+                    "exclude_patterns": {"type": "array", "items": {"type": "string"}},
+                    "max_file_size": {"type": "integer"},
                 },
-                "required": ["question", "text", "tree", "summary"],
+                "required": ["repo_url"],
             },
         ),
         mcp.Tool(
             name="website.fetch_markdown",
-            description="Fetch markdown content for a given URL via Jina proxy",
+            description="Fetch markdown content for a given URL, via the Jina proxy or directly",
             inputSchema={
                 "type": "object",
-                "properties": {"url": {"type": "string"}},
+                "properties": {
+                    "url": {"type": "string"},
+                    "mode": {"type": "string", "enum": ["jina", "local", "auto"]},
+                },
                 "required": ["url"],
             },
         ),
         mcp.Tool(
             name="website.html_to_md",
-            description="Convert raw HTML to markdown",
+            description="Convert raw HTML to markdown, keeping only the main content unless full_body is set",
             inputSchema={
                 "type": "object",
-                "properties": {"html": {"type": "string"}},
+                "properties": {
+                    "html": {"type": "string"},
+                    "full_body": {"type": "boolean", "default": False},
+                },
                 "required": ["html"],
             },
         ),
+        mcp.Tool(
+            name="youtube.info",
+            description="Video metadata and cleaned transcript (YTVideoInfo) for a YouTube URL",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "url": {"type": "string"},
+                    "langs": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["url"],
+            },
+        ),
+        mcp.Tool(
+            name="youtube.transcript",
+            description="Cleaned transcript of a YouTube video, optionally as [m:ss-m:ss] timestamped passages",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "url": {"type": "string"},
+                    "timestamps": {"type": "boolean", "default": False},
+                    "langs": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["url"],
+            },
+        ),
+        mcp.Tool(
+            name="youtube.answer",
+            description="Answer a question about a YouTube video from its transcript",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "url": {"type": "string"},
+                    "question": {"type": "string"},
+                    "chat_history": {"type": "string"},
+                    "langs": {"type": "array", "items": {"type": "string"}},
+                },
+                "required": ["url", "question"],
+            },
+        ),
     ]
 
 
@@ -86,37 +189,115 @@ async def call_tool(name: str, arguments: Optional[dict[str, Any]] = None):
 
     try:
         if name == "llm.generate":
-            llm = LargeLanguageModel(
-                model_name=arguments.get("model"),
-                api_key=arguments.get("api_key") or "",
-                provider=arguments.get("provider", "google"),
-                base_url=arguments.get("base_url"),
-                temperature=float(arguments.get("temperature", 0.4)),
-            )
-            content = llm.generate_text(
+            if arguments.get("fallbacks"):
+                primary = ProviderCandidate(
+                    provider=arguments.get("provider", "google"),
+                    model_name=arguments.get("model"),
+                    api_key=arguments.get("api_key"),
+                    base_url=arguments.get("base_url"),
+                )
+                llm = LLMRouter(
+                    [primary, *arguments["fallbacks"]],
+                    hedge=bool(arguments.get("hedge", False)),
+                    temperature=float(arguments.get("temperature", 0.4)),
+                )
+            else:
+                llm = LargeLanguageModel(
+                    model_name=arguments.get("model"),
+                    api_key=arguments.get("api_key") or "",
+                    provider=arguments.get("provider", "google"),
+                    base_url=arguments.get("base_url"),
+                    temperature=float(arguments.get("temperature", 0.4)),
+                )
+            # quota waits and provider calls block; keep the other tools responsive
+            content = await asyncio.to_thread(
+                llm.generate_text,
                 arguments["prompt"],
                 system_message=arguments.get("system_message"),
             )
             return [mcp.TextContent(type="text", text=content)]
 
+        if name == "llm.status":
+            payload = {"providers": provider_health(), "quotas": quota_utilization()}
+            return [mcp.TextContent(type="text", text=json.dumps(payload))]
+
         if name == "github.answer":
-            ans = github_processor_optimized(
-                question=arguments["question"],
-                text=arguments.get("text", ""),
-                tree=arguments.get("tree", ""),
-                summary=arguments.get("summary", ""),
-                chat_history=arguments.get("chat_history", ""),
+
+            def answer() -> str:
+                repository = code_index = None
+                if arguments.get("context_id"):
+                    repository = get_ingested_context(arguments["context_id"])
+                    if repository is None:
+                        return f"Error: Unknown context_id: {arguments['context_id']}"
+                    code_index = get_code_index(arguments["context_id"])
+
+                return str(
+                    github_processor_optimized(
+                        question=arguments["question"],
+                        text=arguments.get("text", ""),
+                        tree=arguments.get("tree", ""),
+                        summary=arguments.get("summary", ""),
+                        chat_history=arguments.get("chat_history", ""),
+                        code_index=code_index,
+                        repository=repository,
+                    )
+                )
+
+            # pack reads, index building and the LLM call all block
+            return [mcp.TextContent(type="text", text=await asyncio.to_thread(answer))]
+
+        if name == "github.ingest":
+            context_id, repository = await ingest_repository(
+                arguments["repo_url"],
+                refresh=bool(arguments.get("refresh", False)),
+                engine=arguments.get("engine", "gitingest"),
+                include_patterns=arguments.get("include_patterns"),
+                exclude_patterns=arguments.get("exclude_patterns"),
+                max_file_size=arguments.get("max_file_size"),
             )
-            return [mcp.TextContent(type="text", text=str(ans))]
+            payload = {
+                "context_id": context_id,
+                "summary": repository.summary,
+                "tree": repository.tree,
+                "file_count": len(repository),
+            }
+            return [mcp.TextContent(type="text", text=json.dumps(payload))]
 
         if name == "website.fetch_markdown":
-            md = fetch_markdown(arguments["url"])
+            md = await fetch_markdown_async(arguments["url"], mode=arguments.get("mode"))
             return [mcp.TextContent(type="text", text=md)]
 
         if name == "website.html_to_md":
-            md = html_to_md(arguments["html"])
+            md = html_to_md(arguments["html"], full_body=bool(arguments.get("full_body", False)))
             return [mcp.TextContent(type="text", text=md)]
 
+        if name == "youtube.info":
+            info = await get_video_info_async(arguments["url"], arguments.get("langs"))
+            return [mcp.TextContent(type="text", text=info.model_dump_json())]
+
+        if name == "youtube.transcript":
+            transcript = await fetch_timed_transcript_async(arguments["url"], arguments.get("langs"))
+            if transcript is None:
+                return [mcp.TextContent(type="text", text="Error: No transcript available for this video")]
+            windows = transcript.windows(YOUTUBE_WINDOW_SECONDS)
+            if arguments.get("timestamps"):
+                text = format_windows(windows)
+            else:
+                text = "\n".join(w.text for w in windows)
+            return [mcp.TextContent(type="text", text=text)]
+
+        if name == "youtube.answer":
+            transcript = await fetch_timed_transcript_async(arguments["url"], arguments.get("langs"))
+            ans = await asyncio.to_thread(
+                youtube_answer_from_transcript,
+                youtube_chain(),
+                arguments["question"],
+                transcript,
+                arguments["url"],
+                arguments.get("chat_history", ""),
+            )
+            return [mcp.TextContent(type="text", text=str(ans))]
+
         return [mcp.TextContent(type="text", text=f"Unknown tool: {name}")]
 
     except Exception as e:
@@ -1,8 +1,20 @@
-from core.llm import LargeLanguageModel
+from core.quota import QuotaExceededError
+from core.router import build_llm
+from core.config import LLM_CONTEXT_CHARS
+from prompts.map_reduce import (
+    group_documents,
+    map_reduce_answer,
+    needs_map_reduce,
+    split_text,
+)
 from langchain_core.runnables import RunnableLambda, RunnableParallel
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
 
+# share of the question's terms the matched definitions must name before they
+# replace the repository content (overview questions name no definitions)
+_STRONG_MATCH_COVERAGE = 0.5
+
 
 parser = StrOutputParser()
 
@@ -21,6 +33,10 @@ Repository Summary:
 Repository File Structure (Tree):
 {tree}
 
+---
+Referenced Definitions (file:start-end line ranges of symbols related to the question):
+{definitions}
+
 ---
 Relevant File Content:
 {content}
@@ -56,6 +72,7 @@ prompt = PromptTemplate(
     input_variables=[
         "tree",
         "summary",
+        "definitions",
         "content",
         "question",
         "chat_history",
@@ -64,6 +81,7 @@ prompt = PromptTemplate(
 final_chain = RunnableParallel(
     {
         "content": RunnableLambda(lambda d: d.get("text", "")),
+        "definitions": RunnableLambda(lambda d: d.get("definitions", "")),
         "question": RunnableLambda(lambda d: d["question"]),
         "chat_history": RunnableLambda(lambda d: d.get("chat_history", "")),
         "tree": RunnableLambda(lambda d: d["tree"]),
@@ -72,10 +90,14 @@ final_chain = RunnableParallel(
 )
 
 
-def _build_chain(llm_options: dict | None = None):
+def _build_llm_and_chain(llm_options: dict | None = None):
     llm_options = llm_options or {}
-    llm = LargeLanguageModel(**llm_options)
-    return final_chain | prompt | llm.client | parser
+    llm = build_llm(**llm_options)
+    return llm, final_chain | prompt | llm.runnable | parser
+
+
+def _build_chain(llm_options: dict | None = None):
+    return _build_llm_and_chain(llm_options)[1]
 
 
 def get_chain(llm_options: dict | None = None):
@@ -89,21 +111,68 @@ def github_processor_optimized(
     summary,
     chat_history="",
     llm_options: dict | None = None,
+    code_index=None,
+    repository=None,
 ):
     try:
         content = text
-        chain = _build_chain(llm_options)
-        input_data = {
-            "question": question,
-            "text": content,
-            "tree": tree,
-            "summary": summary,
-            "chat_history": chat_history,
-        }
-
-        result = chain.invoke(input_data)
-        return result
-
+        if repository is not None:
+            tree = tree or repository.tree
+            summary = summary or repository.summary
+
+        definitions, strong_match = "", False
+        if code_index is not None:
+            symbols, coverage = code_index.match(question)
+            definitions = code_index.render_definitions(question, symbols=symbols)
+            strong_match = bool(definitions) and coverage >= _STRONG_MATCH_COVERAGE
+
+        llm, chain = _build_llm_and_chain(llm_options)
+
+        def answer_with(file_content: str) -> str:
+            return chain.invoke(
+                {
+                    "question": question,
+                    "text": file_content,
+                    "definitions": definitions or "None",
+                    "tree": tree,
+                    "summary": summary,
+                    "chat_history": chat_history,
+                }
+            )
+
+        if strong_match and not content:
+            # the matched definitions stand in for the full repository dump;
+            # text sent by the caller is always kept
+            return answer_with("Omitted; see Referenced Definitions and the file tree.")
+
+        if repository is not None and not content:
+            if repository.raw_size <= LLM_CONTEXT_CHARS:
+                content = repository.content
+            else:
+                # chunk file by file straight from the pack
+                return map_reduce_answer(
+                    question,
+                    group_documents(repository.iter_files()),
+                    answer_with,
+                    llm,
+                    source="code repository",
+                    chat_history=chat_history,
+                )
+
+        if needs_map_reduce(content):
+            return map_reduce_answer(
+                question,
+                split_text(content),
+                answer_with,
+                llm,
+                source="code repository",
+                chat_history=chat_history,
+            )
+        return answer_with(content)
+
+    except QuotaExceededError:
+        # the API turns this into a 429 with Retry-After
+        raise
     except Exception as e:
         print(f"Error in github_processor_optimized: {e}")
         return f"Error processing GitHub content: {str(e)}"
@@ -0,0 +1,219 @@
+"""
+Map-reduce answering for contexts that do not fit in one model call.
+
+The context is split into chunks, each chunk is reduced to question-relevant
+notes by concurrent "map" calls, and the caller's own answer chain runs once
+over the combined notes.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Iterable
+
+from core import get_logger
+from core.config import (
+    LLM_CONTEXT_CHARS,
+    MAP_REDUCE_CHUNK_CHARS,
+    MAP_REDUCE_CONCURRENCY,
+    MAP_REDUCE_MAX_FAILED_SHARE,
+)
+from core.llm import LargeLanguageModel
+from core.quota import QuotaExceededError
+from core.router import LLMRouter
+
+logger = get_logger(__name__)
+
+NOTHING_RELEVANT = "NONE"
+COMPLETE_MARKER = "COMPLETE ANSWER:"
+
+map_system_message = f"""
+You extract information from one excerpt of a larger {{source}} to help answer a question.
+Copy every fact, name, number, code snippet or quote from the excerpt that is relevant to the question, keeping source references such as file paths, headings or timestamps.
+Do not answer from outside knowledge. If nothing in the excerpt is relevant, reply with exactly "{NOTHING_RELEVANT}".
+If the excerpt alone fully and unambiguously answers the question, start your reply with "{COMPLETE_MARKER}" followed by the answer.
+"""
+
+map_prompt_template = """
+Question: {question}
+
+Chat History (if available):
+{chat_history}
+
+Excerpt {index} of {total}:
+{chunk}
+"""
+
+
+def needs_map_reduce(text: str, limit: int = LLM_CONTEXT_CHARS) -> bool:
+    return len(text) > limit
+
+
+def split_text(text: str, chunk_chars: int = MAP_REDUCE_CHUNK_CHARS) -> list[str]:
+    """Split on paragraph, then line boundaries so chunks stay under `chunk_chars`."""
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+
+    def flush():
+        nonlocal current, size
+        if current:
+            chunks.append("".join(current))
+        current, size = [], 0
+
+    for paragraph in text.split("\n\n"):
+        piece = paragraph + "\n\n"
+        if len(piece) > chunk_chars:
+            flush()
+            # oversized paragraph: fall back to lines, then hard slices
+            for line in piece.splitlines(keepends=True):
+                while len(line) > chunk_chars:
+                    flush()
+                    chunks.append(line[:chunk_chars])
+                    line = line[chunk_chars:]
+                if size + len(line) > chunk_chars:
+                    flush()
+                current.append(line)
+                size += len(line)
+            continue
+        if size + len(piece) > chunk_chars:
+            flush()
+        current.append(piece)
+        size += len(piece)
+
+    flush()
+    return chunks
+
+
+def group_documents(
+    documents: Iterable[tuple[str, str]],
+    chunk_chars: int = MAP_REDUCE_CHUNK_CHARS,
+) -> list[str]:
+    """Pack (label, text) documents such as repository files into chunks, splitting large ones."""
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for label, text in documents:
+        block = f"--- {label} ---\n{text}\n\n"
+        if len(block) > chunk_chars:
+            chunks.extend(
+                f"--- {label} (part {i + 1}) ---\n{part}"
+                for i, part in enumerate(split_text(text, chunk_chars))
+            )
+            continue
+        if size + len(block) > chunk_chars and current:
+            chunks.append("".join(current))
+            current, size = [], 0
+        current.append(block)
+        size += len(block)
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def _map_chunk(
+    llm: LargeLanguageModel | LLMRouter,
+    source: str,
+    question: str,
+    chat_history: str,
+    chunk: str,
+    index: int,
+    total: int,
+) -> str:
+    return llm.generate_text(
+        map_prompt_template.format(
+            question=question,
+            chat_history=chat_history or "None",
+            chunk=chunk,
+            index=index,
+            total=total,
+        ),
+        system_message=map_system_message.format(source=source),
+    ).strip()
+
+
+def map_reduce_answer(
+    question: str,
+    chunks: list[str],
+    answer_fn: Callable[[str], str],
+    llm: LargeLanguageModel | LLMRouter,
+    source: str = "document",
+    chat_history: str = "",
+    max_workers: int = MAP_REDUCE_CONCURRENCY,
+) -> str:
+    """
+    Answer `question` over `chunks` that together exceed the model window.
+
+    Map calls run concurrently, at most `max_workers` at a time, on the shared
+    `llm` client. As soon as one returns a complete answer, calls that have not
+    started are cancelled. `answer_fn` receives the combined notes as context
+    and produces the final answer with the caller's prompt.
+
+    When more than MAP_REDUCE_MAX_FAILED_SHARE of the map calls failed, or
+    no chunk yielded notes and some failed, the first failure is raised
+    rather than answering from a fraction of the context. Fewer failures
+    are named in the notes, so the answer can say it may be incomplete.
+    """
+    total = len(chunks)
+    notes: dict[int, str] = {}
+    failures: list[Exception] = []
+    complete: str | None = None
+    logger.info(f"Map-reduce over {total} chunks of a {source}, {max_workers} concurrent")
+
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        pending: dict[Future, int] = {
+            pool.submit(
+                _map_chunk, llm, source, question, chat_history, chunk, i + 1, total
+            ): i
+            for i, chunk in enumerate(chunks)
+        }
+        while pending and complete is None:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = pending.pop(future)
+                try:
+                    result = future.result()
+                except QuotaExceededError:
+                    # the remaining chunks would wait on the same quota
+                    raise
+                except Exception as e:
+                    logger.warning(f"Map call for chunk {i + 1}/{total} failed: {e}")
+                    failures.append(e)
+                    continue
+                if result.startswith(COMPLETE_MARKER):
+                    complete = result[len(COMPLETE_MARKER) :].strip()
+                    logger.info(f"Chunk {i + 1}/{total} answered the question; stopping map phase")
+                    break
+                if result and result != NOTHING_RELEVANT:
+                    notes[i] = result
+    finally:
+        # drop chunks that have not started; running calls finish in the background
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    if complete is not None:
+        return answer_fn(complete)
+
+    if failures and (not notes or len(failures) > total * MAP_REDUCE_MAX_FAILED_SHARE):
+        # the failed chunks may hold the answer; an outage must not read as "nothing relevant"
+        logger.error(f"{len(failures)}/{total} map calls failed; {len(notes)} chunks yielded notes")
+        raise failures[0]
+    if not notes:
+        return answer_fn("")
+
+    combined = "\n\n".join(f"[Excerpt {i + 1}]\n{notes[i]}" for i in sorted(notes))
+    if failures:
+        combined += (
+            f"\n\n[Note: {len(failures)} of {total} excerpts could not be read; "
+            "say that the answer may be incomplete.]"
+        )
+    if needs_map_reduce(combined):
+        # notes alone still overflow the window: reduce them again
+        return map_reduce_answer(
+            question,
+            split_text(combined),
+            answer_fn,
+            llm,
+            source=f"set of notes taken from a {source}",
+            chat_history=chat_history,
+            max_workers=max_workers,
+        )
+    return answer_fn(combined)
@@ -1,14 +1,26 @@
+import json
+import re
+from functools import lru_cache
+
 from langchain.prompts import PromptTemplate
-from core.llm import LargeLanguageModel
+from core.router import build_llm
+from mcp_server.models import MDPageInfo
+from prompts.map_reduce import map_reduce_answer, needs_map_reduce, split_text
+from tools.website_context.dedup import drop_repeated_blocks, unique_chunks
 
 from langchain_core.runnables import RunnableLambda, RunnableParallel
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import PromptTemplate
 
-llm = LargeLanguageModel()
 parser = StrOutputParser()
 
 
+@lru_cache(maxsize=1)
+def get_llm():
+    """Shared LLM client, created on the first question rather than at import."""
+    return build_llm()
+
+
 prompt_template_str = """
 System:
 You are “MDPageChat,” a specialized assistant designed to answer questions about a Markdown website page using ONLY the data provided in an MDPageInfo object. Never hallucinate or invent details. If a user’s question cannot be answered from the data, reply “Data not available.”
@@ -77,11 +89,9 @@ simple_chain = RunnableParallel(
     }
 )
 
-text_chain = simple_chain | prompt | llm.client | parser
-
-
+@lru_cache(maxsize=1)
 def get_chain():
-    return text_chain
+    return simple_chain | prompt | get_llm().runnable | parser
 
 
 def get_answer(
@@ -90,10 +100,71 @@ def get_answer(
     text,
     chat_history="",
 ):
-    prompt_input = {
-        "context": text,
-        "question": question,
-        "chat_history": str(chat_history),
-    }
-    answer = prompt | llm.client | parser
-    return answer.invoke(prompt_input)
+    answer = prompt | get_llm().runnable | parser
+
+    def answer_with(context: str) -> str:
+        return answer.invoke(
+            {
+                "context": context,
+                "question": question,
+                "chat_history": str(chat_history),
+            }
+        )
+
+    # repeated blocks and near-identical chunks cost tokens without adding context
+    text = drop_repeated_blocks(text)
+    if needs_map_reduce(text):
+        return map_reduce_answer(
+            question,
+            unique_chunks(split_text(text)),
+            answer_with,
+            get_llm(),
+            source="website page",
+            chat_history=str(chat_history),
+        )
+    return answer_with(text)
+
+
+# question wording -> MDPageInfo sections worth sending for it
+SECTION_HINTS = {
+    "headings": re.compile(r"\b(outline|structure|sections?|headings?|contents|toc|topics?|overview)\b", re.I),
+    "links": re.compile(r"\b(links?|urls?|resources?|references?|sources?|websites?|further reading)\b", re.I),
+    "images": re.compile(r"\b(images?|pictures?|photos?|figures?|diagrams?|screenshots?|illustrations?)\b", re.I),
+    "code_blocks": re.compile(r"\b(code|snippets?|examples?|commands?|functions?|install\w*|syntax|scripts?|cli)\b", re.I),
+    "tables": re.compile(r"\b(tables?|compar\w*|columns?|rows?|pric\w*|specs?|specifications?|data)\b", re.I),
+    "metadata": re.compile(r"\b(author|wrote|written|published|updated|dates?|metadata|tags?|keywords?|language)\b", re.I),
+}
+
+# sections that answer "list the ..." questions without the page text
+_LISTING_SECTIONS = {"headings", "links", "images", "metadata"}
+
+
+def page_context(page: MDPageInfo, question: str) -> str:
+    """
+    The parts of `page` that `question` needs, as MDPageInfo-shaped JSON
+    followed by the page markdown when the answer depends on the text.
+    """
+    wanted = {name for name, pattern in SECTION_HINTS.items() if pattern.search(question)}
+    context: dict = {"title": page.title, "url": page.url}
+    if page.metadata.get("description"):
+        context["metadata"] = {"description": page.metadata["description"]}
+    if "metadata" in wanted:
+        context.update(
+            metadata=page.metadata,
+            author=page.author,
+            last_updated=page.last_updated,
+            tags=page.tags,
+        )
+    for section in ("headings", "links", "images", "code_blocks", "tables"):
+        if section in wanted:
+            context[section] = [item.model_dump(exclude_none=True) for item in getattr(page, section)]
+
+    text = json.dumps({k: v for k, v in context.items() if v not in (None, [], {})}, ensure_ascii=False, indent=1)
+    if not wanted or not wanted <= _LISTING_SECTIONS:
+        text += "\n\nmarkdown:\n" + page.markdown
+    return text
+
+
+def get_page_answer(question: str, page: MDPageInfo, chat_history="") -> str:
+    """Answer `question` about a parsed page, sending only the sections it needs."""
+    return get_answer(get_chain(), question, page_context(page, question), chat_history)
@@ -1,5 +1,6 @@
 from langchain.prompts import PromptTemplate
-from core.llm import LargeLanguageModel
+from core.router import build_llm
+from prompts.map_reduce import map_reduce_answer, needs_map_reduce, split_text
 
 from langchain_core.prompts import PromptTemplate
 
@@ -8,12 +9,29 @@ from langchain.schema.runnable import (
     RunnableParallel,
 )
 from langchain_core.output_parsers import StrOutputParser
+import math
+import re
 import sys
 import os
+from collections import Counter
+from functools import lru_cache
+from typing import Iterator
+
+from core.config import YOUTUBE_CONTEXT_CHARS, YOUTUBE_WINDOW_SECONDS
+from core.singleflight import coalesce
 
 try:
-    from tools.youtube_utils.transcript_generator import processed_transcript
-    from tools.youtube_utils.get_subs import get_subtitle_content
+    from tools.youtube_utils.transcript_generator import (
+        processed_transcript,
+        processed_timed_transcript,
+        TimedTranscript,
+        TranscriptWindow,
+    )
+    from tools.youtube_utils.get_subs import (
+        get_subtitle_content,
+        get_subtitle_content_async,
+    )
+    from tools.youtube_utils.service import SubtitlesUnavailableError
 
 except ImportError:
     sys.path.append(
@@ -21,8 +39,17 @@ except ImportError:
             os.path.dirname(os.path.abspath(__file__)),
         ),
     )
-    from tools.youtube_utils.transcript_generator import processed_transcript
-    from tools.youtube_utils.get_subs import get_subtitle_content
+    from tools.youtube_utils.transcript_generator import (
+        processed_transcript,
+        processed_timed_transcript,
+        TimedTranscript,
+        TranscriptWindow,
+    )
+    from tools.youtube_utils.get_subs import (
+        get_subtitle_content,
+        get_subtitle_content_async,
+    )
+    from tools.youtube_utils.service import SubtitlesUnavailableError
 
 from dotenv import load_dotenv
 
@@ -30,45 +57,125 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 load_dotenv()
 
 
-llm = LargeLanguageModel()
 parser = StrOutputParser()
 
 
-def fetch_transcript(video_url):
-    raw_transcript = get_subtitle_content(video_url, lang="en")
+@lru_cache(maxsize=1)
+def get_llm():
+    """The default LLM, built on first use so importing this module needs no API key."""
+    return build_llm()
 
-    known_error_messages = [
-        "Video unavailable.",
-        "Subtitles not available for the specified language.",
-        "Subtitles were requested but could not be retrieved from file.",
-        "Subtitles not available for the specified language or download failed.",
-    ]
-    known_error_prefixes = [
-        "Error downloading subtitles:",
-        "An unexpected error occurred while fetching subtitles:",
-    ]
 
-    is_actual_error = False
-    if raw_transcript in known_error_messages:
-        is_actual_error = True
-    else:
-        if raw_transcript:
-            for prefix in known_error_prefixes:
-                if raw_transcript.startswith(prefix):
-                    is_actual_error = True
-                    break
+def _fetch_raw_transcript(video_url, langs=None):
+    """
+    Raw subtitle text, or an empty string when the video has none in `langs`.
+    Unavailable videos and failed extractions raise YouTubeError.
+    """
+    try:
+        return get_subtitle_content(video_url, langs)
+    except SubtitlesUnavailableError:
+        return ""
+
+
+async def _fetch_raw_transcript_async(video_url, langs=None):
+    try:
+        return await get_subtitle_content_async(video_url, langs)
+    except SubtitlesUnavailableError:
+        return ""
+
+
+def _timed(raw_transcript) -> TimedTranscript | None:
+    if not raw_transcript:
+        return None
+    transcript = processed_timed_transcript(raw_transcript)
+    return transcript if len(transcript) else None
+
+
+@coalesce()
+def fetch_transcript(video_url, langs=None):
+    raw_transcript = _fetch_raw_transcript(video_url, langs)
+    return processed_transcript(raw_transcript) if raw_transcript else ""
+
+
+@coalesce()
+def fetch_timed_transcript(video_url, langs=None) -> TimedTranscript | None:
+    """
+    Transcript with cue timings in the first available of `langs`
+    (YOUTUBE_SUBTITLE_LANGS by default), or None when the video has no
+    usable subtitles. Raises YouTubeError when the video is unavailable or
+    cannot be extracted, rather than answering without a transcript.
+    """
+    return _timed(_fetch_raw_transcript(video_url, langs))
+
+
+@coalesce()
+async def fetch_timed_transcript_async(video_url, langs=None) -> TimedTranscript | None:
+    """`fetch_timed_transcript` without blocking the event loop."""
+    return _timed(await _fetch_raw_transcript_async(video_url, langs))
+
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+_STOPWORDS = {
+    "the", "and", "for", "what", "how", "does", "did", "this", "that", "with",
+    "from", "when", "where", "which", "who", "why", "video", "about", "are",
+    "was", "were", "they", "you", "say", "said", "talk", "there", "their",
+}
+
 
-    if raw_transcript and not is_actual_error:
-        cleaned_transcript = processed_transcript(raw_transcript)
+def format_windows(windows: list[TranscriptWindow]) -> str:
+    return "\n\n".join(f"{w.label} {w.text}" for w in windows)
 
-    else:
-        cleaned_transcript = ""
 
-    return cleaned_transcript
+def select_transcript_windows(
+    transcript: TimedTranscript,
+    question: str,
+    max_chars: int = YOUTUBE_CONTEXT_CHARS,
+    window_seconds: float = YOUTUBE_WINDOW_SECONDS,
+) -> list[TranscriptWindow] | None:
+    """
+    Time windows of the transcript relevant to `question`, in chronological order.
+
+    Short transcripts are returned whole. Longer ones are ranked by TF-IDF
+    overlap with the question and trimmed to `max_chars`; None means nothing
+    matched (e.g. "summarize the video") and the whole transcript is needed.
+    """
+    windows = transcript.windows(window_seconds)
+    if sum(len(w.text) + 16 for w in windows) <= max_chars:
+        return windows
+
+    terms = {t for t in _WORD_RE.findall(question.lower()) if len(t) > 2} - _STOPWORDS
+    if not terms:
+        return None
+
+    counts = [Counter(_WORD_RE.findall(w.text.lower())) for w in windows]
+    doc_freq = Counter(t for c in counts for t in terms if c[t])
+    idf = {t: math.log((len(windows) + 1) / (doc_freq[t] + 1)) + 1 for t in terms}
+    scores = [
+        sum(c[t] * idf[t] for t in terms) / math.sqrt(sum(c.values()) or 1)
+        for c in counts
+    ]
+
+    ranked = sorted(
+        (i for i, score in enumerate(scores) if score > 0),
+        key=lambda i: -scores[i],
+    )
+    if not ranked:
+        return None
+
+    chosen, used = [], 0
+    for i in ranked:
+        size = len(windows[i].text) + 16
+        if used + size > max_chars:
+            break
+        chosen.append(i)
+        used += size
+    return [windows[i] for i in sorted(chosen)]
 
 
 def get_context(d):
     """Get context from transcript or return empty string if no transcript available"""
+    if "context" in d:
+        return d["context"]
     url = d.get("url", "")
     transcript = fetch_transcript(url) if url else ""
     return transcript
@@ -94,6 +201,9 @@ Guidelines:
    • Suggest topics or tags; do NOT invent other video titles.
 7. If user asks anything outside the scope of the schema:
    • Respond “Data not available.”
+8. When the transcript is given as passages prefixed with [m:ss-m:ss] timestamps:
+   • Cite the timestamp of the passage you used, e.g. “(at 12:34)”.
+   • The passages may be only the parts of the video relevant to the question.
 
 ---
 Context:
@@ -135,11 +245,9 @@ main_chain2 = RunnableParallel(
     }
 )
 
-youtube_chain = main_chain2 | prompt | llm.client | parser
-
-
+@lru_cache(maxsize=1)
 def get_chain():
-    return youtube_chain
+    return main_chain2 | prompt | get_llm().runnable | parser
 
 
 def get_answer(
@@ -147,11 +255,65 @@ def get_answer(
     question,
     url=None,
     chat_history="",
+    langs=None,
 ):
-    return chain.invoke(
-        {
-            "question": question,
-            "url": url,
-            "chat_history": str(chat_history),
-        }
+    transcript = fetch_timed_transcript(url, langs) if url else None
+    return answer_from_transcript(chain, question, transcript, url, chat_history)
+
+
+def answer_from_transcript(
+    chain,
+    question,
+    transcript: TimedTranscript | None,
+    url=None,
+    chat_history="",
+):
+    """`get_answer` for a transcript that has already been fetched."""
+    def answer_with(context: str) -> str:
+        return chain.invoke(
+            {
+                "question": question,
+                "url": url,
+                "context": context,
+                "chat_history": str(chat_history),
+            }
+        )
+
+    context = transcript_context(question, transcript)
+    if needs_map_reduce(context):
+        return map_reduce_answer(
+            question,
+            split_text(context),
+            answer_with,
+            get_llm(),
+            source="video transcript",
+            chat_history=str(chat_history),
+        )
+    return answer_with(context)
+
+
+def transcript_context(question, transcript: TimedTranscript | None) -> str:
+    """The timestamped passages sent with `question`; all of them when it concerns the whole video."""
+    if transcript is None:
+        return ""
+    windows = select_transcript_windows(transcript, question)
+    if windows is None:
+        windows = transcript.windows(YOUTUBE_WINDOW_SECONDS)
+    return format_windows(windows)
+
+
+def stream_answer_from_transcript(
+    question,
+    transcript: TimedTranscript | None,
+    url=None,
+    chat_history="",
+) -> Iterator[str]:
+    """`answer_from_transcript`, yielding the answer as the model writes it."""
+    context = transcript_context(question, transcript)
+    if needs_map_reduce(context):
+        # assembled from several calls, so it arrives in one piece
+        yield answer_from_transcript(get_chain(), question, transcript, url, chat_history)
+        return
+    yield from get_llm().stream(
+        prompt.format(context=context, question=question, chat_history=str(chat_history))
     )
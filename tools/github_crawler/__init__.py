@@ -2,8 +2,17 @@
 GitHub Crawler - injectscs the github repo to a singular markdown file.
 """
 
-from convertor import convert_github_repo_to_markdown
+from .convertor import convert_github_repo_to_markdown, InjestedContent
+from .context_store import ingest_repository, get_ingested_context, get_code_index
+from .code_index import CodeIndex
+from .pack_store import PackedRepository
 
 __all__ = [
     "convert_github_repo_to_markdown",
+    "InjestedContent",
+    "ingest_repository",
+    "get_ingested_context",
+    "get_code_index",
+    "CodeIndex",
+    "PackedRepository",
 ]
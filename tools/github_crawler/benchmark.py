@@ -0,0 +1,64 @@
+"""
+Compare gitingest against the native per-file pipeline on one local clone.
+
+    python -m tools.github_crawler.benchmark https://github.com/langchain-ai/langchain
+    python -m tools.github_crawler.benchmark path/to/existing/checkout
+"""
+
+import argparse
+import os
+import resource
+import time
+from contextlib import nullcontext
+
+from gitingest import ingest
+
+from .file_ingest import FileFilter, iter_repository_files, shallow_clone
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench_gitingest(root: str) -> tuple[float, int, int]:
+    start = time.perf_counter()
+    _summary, _tree, content = ingest(root)
+    return time.perf_counter() - start, content.count("\nFILE: "), len(content)
+
+
+def bench_native(root: str, max_workers: int) -> tuple[float, int, int]:
+    start = time.perf_counter()
+    files = chars = 0
+    for record in iter_repository_files(root, FileFilter(), max_workers=max_workers):
+        files += 1
+        chars += len(record.content)
+    return time.perf_counter() - start, files, chars
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("repo", help="repository URL or local checkout")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    source = nullcontext(args.repo) if os.path.isdir(args.repo) else shallow_clone(args.repo)
+    with source as root:
+        # native first: gitingest's monolithic string would dominate peak RSS
+        for name, run in (
+            ("native", lambda: bench_native(root, args.workers)),
+            ("gitingest", lambda: bench_gitingest(root)),
+        ):
+            timings = []
+            for _ in range(args.rounds):
+                elapsed, files, chars = run()
+                timings.append(elapsed)
+            print(
+                f"{name:>10}: best {min(timings):.2f}s over {args.rounds} rounds, "
+                f"{files} files, {chars / 1e6:.1f}M chars, peak RSS {_peak_rss_mb():.0f} MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
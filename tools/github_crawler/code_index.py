@@ -0,0 +1,359 @@
+import ast
+import os
+import re
+from collections import defaultdict
+from typing import Callable, Iterable
+
+from pydantic import BaseModel
+
+from core import get_logger
+from .incremental import IngestDelta
+
+logger = get_logger(__name__)
+
+# regex fallback definitions per file extension: (kind, pattern with a `name` group)
+_BRACE_PATTERNS: dict[tuple[str, ...], list[tuple[str, re.Pattern]]] = {
+    (".js", ".jsx", ".ts", ".tsx", ".mjs", ".cjs"): [
+        ("class", re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+(?P<name>\w+)")),
+        ("function", re.compile(r"^\s*(?:export\s+)?(?:default\s+)?(?:async\s+)?function\s*\*?\s*(?P<name>\w+)")),
+        ("function", re.compile(r"^\s*(?:export\s+)?(?:const|let|var)\s+(?P<name>\w+)\s*=\s*(?:async\s+)?(?:function\b|\([^)]*\)\s*(?::\s*[^=]+)?=>|\w+\s*=>)")),
+        ("method", re.compile(r"^\s+(?:public\s+|private\s+|protected\s+|static\s+|async\s+)*(?P<name>(?!if\b|for\b|while\b|switch\b|catch\b|return\b)\w+)\s*\([^)]*\)\s*(?::\s*[\w<>\[\]|, ]+)?\s*\{")),
+        ("interface", re.compile(r"^\s*(?:export\s+)?(?:interface|type)\s+(?P<name>\w+)")),
+    ],
+    (".go",): [
+        ("method", re.compile(r"^func\s+\([^)]*\)\s*(?P<name>\w+)")),
+        ("function", re.compile(r"^func\s+(?P<name>\w+)")),
+        ("class", re.compile(r"^type\s+(?P<name>\w+)\s+(?:struct|interface)")),
+    ],
+    (".java", ".kt", ".cs", ".scala", ".swift"): [
+        ("class", re.compile(r"^\s*(?:[\w@]+\s+)*(?:class|interface|enum|record|object|struct)\s+(?P<name>\w+)")),
+        ("method", re.compile(r"^\s+(?:[\w@<>\[\],]+\s+)+(?P<name>(?!if\b|for\b|while\b|switch\b|catch\b|return\b|new\b)\w+)\s*\([^;]*\)\s*(?:throws [\w., ]+)?\s*\{?\s*$")),
+        ("function", re.compile(r"^\s*(?:\w+\s+)*(?:fun|func)\s+(?P<name>\w+)")),
+    ],
+    (".rs",): [
+        ("function", re.compile(r"^\s*(?:pub(?:\([^)]*\))?\s+)?(?:async\s+)?(?:unsafe\s+)?fn\s+(?P<name>\w+)")),
+        ("class", re.compile(r"^\s*(?:pub(?:\([^)]*\))?\s+)?(?:struct|enum|trait)\s+(?P<name>\w+)")),
+        ("class", re.compile(r"^\s*impl(?:<[^>]*>)?\s+(?:[\w:]+\s+for\s+)?(?P<name>\w+)")),
+    ],
+    (".c", ".h", ".cc", ".cpp", ".hpp", ".php"): [
+        ("class", re.compile(r"^\s*(?:abstract\s+|final\s+)?(?:class|struct|interface|trait)\s+(?P<name>\w+)")),
+        ("function", re.compile(r"^\s*(?:public\s+|private\s+|protected\s+|static\s+)*function\s+(?P<name>\w+)")),
+        ("function", re.compile(r"^(?:[\w*&:<>]+\s+)+\**(?P<name>(?!if\b|for\b|while\b|switch\b|return\b)[\w:~]+)\s*\([^;]*\)\s*(?:const\s*)?\{?\s*$")),
+    ],
+}
+
+_RUBY_PATTERNS = [
+    ("class", re.compile(r"^\s*(?:class|module)\s+(?P<name>[\w:]+)")),
+    ("function", re.compile(r"^\s*def\s+(?:self\.)?(?P<name>\w+[?!=]?)")),
+]
+
+# cap for definitions whose end could not be determined
+_MAX_SYMBOL_LINES = 200
+
+_WORD_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_CAMEL_RE = re.compile(r"[A-Z]+(?=[A-Z][a-z])|[A-Z]?[a-z]+|[A-Z]+|\d+")
+
+_STOPWORDS = {
+    "the", "and", "for", "where", "what", "how", "does", "this", "that", "with",
+    "from", "which", "when", "into", "code", "file", "files", "function", "class",
+    "method", "handled", "defined", "implemented", "used", "work", "works", "repo",
+    "repository", "there", "show", "explain", "find", "about", "get", "set",
+    "give", "tell", "describe", "overview", "summary", "summarize", "summarise",
+    "readme", "project", "please", "main", "purpose", "doing", "does",
+}
+
+# least score (one exact name match, or three loose ones) for a definition to
+# count; questions with fewer terms need each of them to hit
+_MIN_SCORE = 3.0
+
+
+class Symbol(BaseModel):
+    name: str
+    kind: str
+    path: str
+    start_line: int
+    end_line: int
+    parent: str | None = None
+
+    @property
+    def qualified_name(self) -> str:
+        return f"{self.parent}.{self.name}" if self.parent else self.name
+
+
+def _split_identifier(name: str) -> list[str]:
+    return [p.lower() for part in name.split("_") for p in _CAMEL_RE.findall(part)]
+
+
+def _stems_match(a: str, b: str) -> bool:
+    """Loose match so "authentication" finds `authenticate` and `auth_user`."""
+    if a == b:
+        return True
+    shorter, longer = sorted((a, b), key=len)
+    return len(shorter) >= 4 and longer.startswith(shorter[: max(4, len(shorter) - 3)])
+
+
+def extract_python_symbols(path: str, text: str) -> list[Symbol]:
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return extract_regex_symbols(path, text, [
+            ("class", re.compile(r"^\s*class\s+(?P<name>\w+)")),
+            ("function", re.compile(r"^\s*(?:async\s+)?def\s+(?P<name>\w+)")),
+        ])
+
+    symbols: list[Symbol] = []
+
+    def visit(node: ast.AST, parent: str | None) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                if isinstance(child, ast.ClassDef):
+                    kind = "class"
+                else:
+                    kind = "method" if parent else "function"
+                # include decorators in the reported range
+                start = min([child.lineno] + [d.lineno for d in child.decorator_list])
+                symbols.append(
+                    Symbol(
+                        name=child.name,
+                        kind=kind,
+                        path=path,
+                        start_line=start,
+                        end_line=child.end_lineno or child.lineno,
+                        parent=parent,
+                    )
+                )
+                if isinstance(child, ast.ClassDef):
+                    visit(child, child.name)
+
+    visit(tree, None)
+    return symbols
+
+
+def _brace_block_end(lines: list[str], start: int) -> int | None:
+    """Index of the line closing the first `{` opened at or after `start`."""
+    depth = 0
+    opened = False
+    for i in range(start, min(len(lines), start + _MAX_SYMBOL_LINES * 5)):
+        for ch in lines[i]:
+            if ch == "{":
+                depth += 1
+                opened = True
+            elif ch == "}":
+                depth -= 1
+                if opened and depth <= 0:
+                    return i
+        if not opened and (lines[i].rstrip().endswith(";") or i > start + 3):
+            return None  # declaration without a body
+    return None
+
+
+def extract_regex_symbols(
+    path: str,
+    text: str,
+    patterns: list[tuple[str, re.Pattern]],
+    braces: bool = False,
+) -> list[Symbol]:
+    lines = text.splitlines()
+    starts: list[tuple[int, str, str]] = []
+    for i, line in enumerate(lines):
+        for kind, pattern in patterns:
+            match = pattern.match(line)
+            if match:
+                starts.append((i, kind, match.group("name")))
+                break
+
+    symbols = []
+    for n, (i, kind, name) in enumerate(starts):
+        end = _brace_block_end(lines, i) if braces else None
+        if end is None:
+            next_start = starts[n + 1][0] if n + 1 < len(starts) else len(lines)
+            end = min(next_start, i + _MAX_SYMBOL_LINES) - 1
+        symbols.append(
+            Symbol(name=name, kind=kind, path=path, start_line=i + 1, end_line=max(end, i) + 1)
+        )
+    return symbols
+
+
+def extract_symbols(path: str, text: str) -> list[Symbol]:
+    """Definitions in one file, using `ast` for Python and regexes elsewhere."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".py", ".pyi"):
+        return extract_python_symbols(path, text)
+    if ext in (".rb", ".rake"):
+        return extract_regex_symbols(path, text, _RUBY_PATTERNS)
+    for extensions, patterns in _BRACE_PATTERNS.items():
+        if ext in extensions:
+            return extract_regex_symbols(path, text, patterns, braces=True)
+    return []
+
+
+class CodeIndex:
+    """
+    Maps symbol names to their definitions (file and line range) across a repository.
+
+    Only symbols are kept in memory; definition source is fetched through
+    `read_file` (e.g. `PackedRepository.read`) when rendered.
+    """
+
+    def __init__(self, read_file: Callable[[str], str] | None = None):
+        # without a reader the index keeps the text of files that define symbols
+        self._texts: dict[str, str] = {}
+        self._keep_texts = read_file is None
+        self.read_file = read_file or self._texts.__getitem__
+        self.symbols_by_path: dict[str, list[Symbol]] = {}
+        self._by_token: dict[str, set[tuple[str, int]]] = defaultdict(set)
+
+    @classmethod
+    def build(
+        cls,
+        files: dict[str, str] | Iterable[tuple[str, str]],
+        read_file: Callable[[str], str] | None = None,
+    ) -> "CodeIndex":
+        index = cls(read_file)
+        items = files.items() if isinstance(files, dict) else files
+        for path, text in items:
+            index._add_file(path, text)
+        logger.info(
+            f"Indexed {sum(len(s) for s in index.symbols_by_path.values())} symbols "
+            f"in {len(index.symbols_by_path)} files"
+        )
+        return index
+
+    def _add_file(self, path: str, text: str) -> None:
+        symbols = extract_symbols(path, text)
+        if not symbols:
+            return
+        if self._keep_texts:
+            self._texts[path] = text
+        self.symbols_by_path[path] = symbols
+        for i, symbol in enumerate(symbols):
+            for token in {symbol.name.lower(), *_split_identifier(symbol.name)}:
+                self._by_token[token].add((path, i))
+
+    def _remove_file(self, path: str) -> None:
+        for i, symbol in enumerate(self.symbols_by_path.pop(path, [])):
+            for token in {symbol.name.lower(), *_split_identifier(symbol.name)}:
+                self._by_token[token].discard((path, i))
+                if not self._by_token[token]:
+                    del self._by_token[token]
+        self._texts.pop(path, None)
+
+    def apply_delta(
+        self,
+        files: dict[str, str],
+        delta: IngestDelta,
+        read_file: Callable[[str], str] | None = None,
+    ) -> None:
+        """Re-index only the paths an incremental ingest touched."""
+        if read_file is not None:
+            self._keep_texts = False
+            self._texts.clear()
+            self.read_file = read_file
+        for path in delta.deleted + delta.changed:
+            self._remove_file(path)
+        for path in delta.changed:
+            if path in files:
+                self._add_file(path, files[path])
+
+    def lookup(self, question: str, limit: int = 8) -> list[Symbol]:
+        """Definitions most likely referenced by a natural-language question."""
+        return self.match(question, limit)[0]
+
+    def match(self, question: str, limit: int = 8) -> tuple[list[Symbol], float]:
+        """
+        `lookup`, plus the share (0-1) of the question's terms that those
+        definitions name. A low share means the question is not about them.
+        """
+        words = _WORD_RE.findall(question)
+        exact = {w.lower() for w in words if len(w) > 2 and w.lower() not in _STOPWORDS}
+        terms = {
+            t for w in words for t in _split_identifier(w) if len(t) > 2 and t not in _STOPWORDS
+        }
+
+        scores: dict[tuple[str, int], float] = defaultdict(float)
+        matched: dict[tuple[str, int], set[str]] = defaultdict(set)
+        for token, refs in self._by_token.items():
+            if token in exact:
+                weight, hits = 3.0, {t for t in _split_identifier(token) if t in terms}
+            else:
+                hits = {term for term in terms if _stems_match(token, term)}
+                if not hits:
+                    continue
+                weight = 1.0
+            for ref in refs:
+                score = weight
+                if weight == 1.0 and token == self.symbols_by_path[ref[0]][ref[1]].name.lower():
+                    # "authentication" says more about `authenticate` than about `AuthManager`
+                    score = 2.0
+                scores[ref] += score
+                matched[ref] |= hits
+
+        min_score = min(_MIN_SCORE, float(len(terms)))
+        ranked = sorted(
+            (item for item in scores.items() if item[1] >= min_score),
+            key=lambda item: (
+                -item[1],
+                # prefer classes/functions over methods, then shorter definitions
+                self.symbols_by_path[item[0][0]][item[0][1]].kind == "method",
+                self._span(item[0]),
+            ),
+        )[:limit]
+        covered = set().union(*(matched[ref] for ref, _ in ranked)) if ranked else set()
+        coverage = len(covered) / len(terms) if terms else 0.0
+        return [self.symbols_by_path[path][i] for (path, i), _ in ranked], coverage
+
+    def _span(self, ref: tuple[str, int]) -> int:
+        symbol = self.symbols_by_path[ref[0]][ref[1]]
+        return symbol.end_line - symbol.start_line
+
+    def source(self, symbol: Symbol) -> str:
+        try:
+            lines = self.read_file(symbol.path).splitlines()
+        except KeyError:
+            return ""
+        return "\n".join(lines[symbol.start_line - 1 : symbol.end_line])
+
+    def render_definitions(
+        self, question: str, max_chars: int = 24000, symbols: list[Symbol] | None = None
+    ) -> str:
+        """Source of the definitions referenced by `question` (or `symbols`), trimmed to `max_chars`."""
+        blocks = []
+        used = 0
+        for symbol in self.lookup(question) if symbols is None else symbols:
+            ext = os.path.splitext(symbol.path)[1].lstrip(".")
+            block = (
+                f"{symbol.path}:{symbol.start_line}-{symbol.end_line} "
+                f"({symbol.kind} {symbol.qualified_name})\n"
+                f"```{ext}\n{self.source(symbol)}\n```"
+            )
+            if used + len(block) > max_chars:
+                break
+            blocks.append(block)
+            used += len(block)
+        return "\n\n".join(blocks)
+
+
+if __name__ == "__main__":
+    index = CodeIndex.build({
+        "app/auth.py": (
+            "class AuthManager:\n"
+            "    def authenticate(self, token):\n"
+            "        return token in self.tokens\n"
+            "\n"
+            "\n"
+            "def login_user(name, password):\n"
+            "    return AuthManager().authenticate(password)\n"
+        ),
+        "app/render.py": "def render_page(page):\n    return page.html\n",
+    })
+    for question in [
+        "Where is authentication handled",
+        "How does render_page work?",
+        "Give me an overview of the project",
+    ]:
+        symbols, coverage = index.match(question)
+        print(f"{question!r}: {[s.qualified_name for s in symbols]} (coverage {coverage:.2f})")
+
+    symbols, coverage = index.match("Where is authentication handled")
+    assert symbols and symbols[0].name == "authenticate" and coverage == 1.0
+    assert not index.lookup("Give me an overview of the project")
@@ -0,0 +1,245 @@
+import asyncio
+import hashlib
+import os
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from pydantic import HttpUrl
+
+from core import get_logger
+from core.config import (
+    GITHUB_CONTEXT_CACHE_SIZE,
+    GITHUB_PACK_DIR,
+    GITHUB_PACK_MAX_AGE_SECONDS,
+    GITHUB_PACK_MAX_BYTES,
+)
+from .code_index import CodeIndex
+from .convertor import convert_github_repo_to_markdown, split_content
+from .file_ingest import FileFilter, pack_repo_natively
+from .incremental import update_repository
+from .pack_store import PackedRepository, delete_pack, sweep_packs, touch_pack, write_pack
+
+logger = get_logger(__name__)
+
+# context_id -> ingested repository, least recently used first. Contents live
+# in compressed, memory-mapped packs; only the offset index is in memory.
+_contexts: "OrderedDict[str, PackedRepository]" = OrderedDict()
+
+# context_id -> symbol index over the ingested files, built on first use
+_indexes: dict[str, CodeIndex] = {}
+
+# context_id -> ingestion currently running for that repository
+_inflight: dict[str, asyncio.Task] = {}
+
+
+def normalize_repo_url(repo_link: HttpUrl | str) -> str:
+    """Canonical form of a repository URL so equivalent links share one context."""
+    parsed = urlparse(str(repo_link).strip())
+    host = (parsed.hostname or "").lower()
+    path = parsed.path.rstrip("/")
+    if path.endswith(".git"):
+        path = path[: -len(".git")]
+    return f"https://{host}{path}"
+
+
+def context_id_for(repo_link: HttpUrl | str) -> str:
+    """Stable handle for a repository, derived from its normalized URL."""
+    return hashlib.sha1(normalize_repo_url(repo_link).encode("utf-8")).hexdigest()[:16]
+
+
+def _pack_path(context_id: str) -> str:
+    return os.path.join(GITHUB_PACK_DIR, context_id)
+
+
+def _location_path(context_id: str) -> str:
+    return _pack_path(context_id) + ".location"
+
+
+def _record_location(context_id: str, base_path: str | None) -> None:
+    """
+    Note where the pack of `context_id` lives when it is not at `_pack_path`
+    (incremental packs stay with their repository mirror), or forget it.
+    """
+    path = _location_path(context_id)
+    if base_path is None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        return
+    os.makedirs(GITHUB_PACK_DIR, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(os.path.abspath(base_path))
+    os.replace(tmp, path)
+
+
+def _recorded_location(context_id: str) -> str | None:
+    try:
+        with open(_location_path(context_id), "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _remember(context_id: str, repository: PackedRepository) -> None:
+    _contexts[context_id] = repository
+    _contexts.move_to_end(context_id)
+    while len(_contexts) > GITHUB_CONTEXT_CACHE_SIZE:
+        # only the in-memory entry: other workers may still use the pack on
+        # disk, which `sweep_packs` removes once it goes unused
+        evicted, _ = _contexts.popitem(last=False)
+        _indexes.pop(evicted, None)
+        logger.info(f"Evicted ingested repository context {evicted}")
+
+
+def _pack_ingested(base_path: str, tree: str, summary: str, content: str) -> PackedRepository:
+    write_pack(base_path, split_content(content).items(), tree, summary)
+    return PackedRepository(base_path)
+
+
+def _sweep() -> None:
+    sweep_packs(GITHUB_PACK_DIR, GITHUB_PACK_MAX_AGE_SECONDS, GITHUB_PACK_MAX_BYTES)
+
+
+async def _ingest(
+    context_id: str,
+    repo_url: str,
+    engine: str,
+    include_patterns: list[str] | None,
+    exclude_patterns: list[str] | None,
+    max_file_size: int | None,
+) -> PackedRepository:
+    if engine != "incremental":
+        # a full re-ingest invalidates the symbol index; it is rebuilt lazily
+        _indexes.pop(context_id, None)
+        await asyncio.to_thread(_record_location, context_id, None)
+
+    if engine == "gitingest":
+        await asyncio.to_thread(_sweep)
+        ingested = await convert_github_repo_to_markdown(
+            repo_url,
+            include_patterns=set(include_patterns) if include_patterns else None,
+            exclude_patterns=set(exclude_patterns) if exclude_patterns else None,
+            max_file_size=max_file_size,
+        )
+        return await asyncio.to_thread(
+            _pack_ingested,
+            _pack_path(context_id),
+            ingested.tree,
+            ingested.summary,
+            ingested.content,
+        )
+
+    filter_options: dict = {
+        "include_patterns": include_patterns,
+        "exclude_patterns": exclude_patterns,
+    }
+    if max_file_size is not None:
+        filter_options["max_file_size"] = max_file_size
+    file_filter = FileFilter(**filter_options)
+
+    if engine == "incremental":
+        repository, delta = await asyncio.to_thread(
+            update_repository, repo_url, file_filter=file_filter
+        )
+        # the pack stays with the mirror; an older full ingest would shadow it
+        await asyncio.to_thread(_record_location, context_id, repository.base_path)
+        await asyncio.to_thread(delete_pack, _pack_path(context_id))
+        index = _indexes.get(context_id)
+        if index is not None and not delta.is_empty:
+            changed = {p: repository.read(p) for p in delta.changed if p in repository}
+            await asyncio.to_thread(index.apply_delta, changed, delta, repository.read)
+        return repository
+    if engine == "native":
+        await asyncio.to_thread(_sweep)
+        await asyncio.to_thread(
+            pack_repo_natively, repo_url, _pack_path(context_id), file_filter
+        )
+        return PackedRepository(_pack_path(context_id))
+    raise ValueError(f"Unknown ingestion engine: '{engine}'")
+
+
+async def ingest_repository(
+    repo_link: HttpUrl | str,
+    refresh: bool = False,
+    engine: str = "gitingest",
+    include_patterns: list[str] | None = None,
+    exclude_patterns: list[str] | None = None,
+    max_file_size: int | None = None,
+) -> tuple[str, PackedRepository]:
+    """
+    Ingest a repository server-side and return its context handle.
+
+    Concurrent calls for the same repository await a single ingestion task.
+    `engine` selects gitingest, the native per-file pipeline, or incremental
+    re-ingestion from a local mirror that only re-reads files changed since the
+    last ingested commit.
+    """
+    repo_url = normalize_repo_url(repo_link)
+    context_id = context_id_for(repo_url)
+
+    if not refresh:
+        repository = get_ingested_context(context_id)
+        if repository is not None:
+            return context_id, repository
+
+    task = _inflight.get(context_id)
+    if task is None:
+        logger.info(f"Ingesting repository {repo_url} as context {context_id}")
+        task = asyncio.create_task(
+            _ingest(
+                context_id,
+                repo_url,
+                engine,
+                include_patterns,
+                exclude_patterns,
+                max_file_size,
+            )
+        )
+        _inflight[context_id] = task
+
+        def _done(t: asyncio.Task, key: str = context_id) -> None:
+            if _inflight.get(key) is t:
+                del _inflight[key]
+            if not t.cancelled() and t.exception() is None:
+                _remember(key, t.result())
+
+        task.add_done_callback(_done)
+    else:
+        logger.info(f"Joining in-flight ingestion of {repo_url}")
+
+    # shield so one cancelled waiter does not abort the ingestion for the rest
+    repository = await asyncio.shield(task)
+    return context_id, repository
+
+
+def get_ingested_context(context_id: str) -> PackedRepository | None:
+    """Return a previously ingested repository by its context handle."""
+    repository = _contexts.get(context_id)
+    if repository is not None:
+        _contexts.move_to_end(context_id)
+        touch_pack(repository.base_path)
+        return repository
+
+    # packs outlive the process, so a restart or an eviction does not lose
+    # ingested repos; incremental packs are found through their recorded location
+    for base_path in (_pack_path(context_id), _recorded_location(context_id)):
+        if base_path is not None and PackedRepository.exists(base_path):
+            repository = PackedRepository(base_path)
+            touch_pack(base_path)
+            _remember(context_id, repository)
+            return repository
+    return None
+
+
+def get_code_index(context_id: str) -> CodeIndex | None:
+    """Symbol index for an ingested repository, built from its files on first use."""
+    index = _indexes.get(context_id)
+    if index is None:
+        repository = get_ingested_context(context_id)
+        if repository is None:
+            return None
+        index = CodeIndex.build(repository.iter_files(), read_file=repository.read)
+        _indexes[context_id] = index
+    return index
@@ -7,7 +7,14 @@ except ImportError:
 
     HAS_INGEST_ASYNC = False
 from pydantic import HttpUrl, BaseModel
+from urllib.parse import urlparse
 import asyncio
+import re
+
+from core.singleflight import coalesce
+
+_SEPARATOR = "=" * 48
+_FILE_HEADER_RE = re.compile(rf"^{_SEPARATOR}\nFILE: (.+)\n{_SEPARATOR}\n", re.MULTILINE)
 
 
 class InjestedContent(BaseModel):
@@ -16,15 +23,71 @@ class InjestedContent(BaseModel):
     content: str
 
 
-async def convert_github_repo_to_markdown(repo_link: HttpUrl) -> InjestedContent:
+def render_tree(repo_url: str, paths: list[str]) -> str:
+    """Directory structure in the same layout gitingest produces."""
+    root: dict = {}
+    for path in paths:
+        node = root
+        for part in path.split("/"):
+            node = node.setdefault(part, {})
+
+    lines = [f"{urlparse(repo_url).path.strip('/').replace('/', '-')}/"]
+
+    def walk(node: dict, prefix: str) -> None:
+        # directories first, then files, both alphabetical
+        names = sorted(node, key=lambda n: (not node[n], n.lower()))
+        for i, name in enumerate(names):
+            last = i == len(names) - 1
+            suffix = "/" if node[name] else ""
+            lines.append(f"{prefix}{'└── ' if last else '├── '}{name}{suffix}")
+            if node[name]:
+                walk(node[name], prefix + ("    " if last else "│   "))
+
+    walk(root, "    ")
+    return "Directory structure:\n└── " + "\n".join(lines)
+
+
+def render_content(files: dict[str, str]) -> str:
+    return "".join(
+        f"{_SEPARATOR}\nFILE: {path}\n{_SEPARATOR}\n{files[path]}\n\n"
+        for path in sorted(files)
+    )
+
+
+def split_content(content: str) -> dict[str, str]:
+    """Split a gitingest-style content dump back into path -> file text."""
+    files: dict[str, str] = {}
+    headers = list(_FILE_HEADER_RE.finditer(content))
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(content)
+        files[header.group(1).strip()] = content[header.end() : end].rstrip("\n")
+    return files
+
+
+@coalesce()
+async def convert_github_repo_to_markdown(
+    repo_link: HttpUrl,
+    include_patterns: set[str] | None = None,
+    exclude_patterns: set[str] | None = None,
+    max_file_size: int | None = None,
+) -> InjestedContent:
     """
     Convert a GitHub repository to a markdown file.
     """
+    options: dict = {
+        "include_patterns": include_patterns,
+        "exclude_patterns": exclude_patterns,
+    }
+    if max_file_size is not None:
+        options["max_file_size"] = max_file_size
+
     if HAS_INGEST_ASYNC:
-        summary, tree, content = await ingest_async(str(repo_link))
+        summary, tree, content = await ingest_async(str(repo_link), **options)
     else:
-        # fallback for sync ingest (not recommended for async frameworks)
-        summary, tree, content = ingest(str(repo_link))
+        # fallback for sync ingest, run off the event loop
+        summary, tree, content = await asyncio.to_thread(
+            ingest, str(repo_link), **options
+        )
 
     return InjestedContent(
         tree=tree,
@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Iterable, Iterator
+from urllib.parse import urlparse
+
+import pathspec
+from pydantic import BaseModel
+
+from core import get_logger
+from core.config import GITHUB_MAX_FILE_SIZE
+from .convertor import render_tree
+from .pack_store import PackWriter
+
+logger = get_logger(__name__)
+
+# vendored, generated and binary-ish files that never help answer questions
+DEFAULT_EXCLUDE_PATTERNS = [
+    ".git/",
+    "node_modules/",
+    "vendor/",
+    "bower_components/",
+    "__pycache__/",
+    ".venv/",
+    "venv/",
+    "dist/",
+    "build/",
+    "target/",
+    ".next/",
+    "*.min.js",
+    "*.min.css",
+    "*.map",
+    "*.lock",
+    "package-lock.json",
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.ico", "*.svg", "*.webp",
+    "*.pdf", "*.zip", "*.tar", "*.gz", "*.whl", "*.jar",
+    "*.so", "*.dll", "*.dylib", "*.exe", "*.o", "*.a", "*.pyc", "*.class",
+    "*.woff", "*.woff2", "*.ttf", "*.eot",
+    "*.mp3", "*.mp4", "*.mov", "*.wav",
+    "*.sqlite", "*.sqlite3", "*.db",
+]
+
+
+class FileRecord(BaseModel):
+    path: str
+    size: int
+    content: str
+
+
+def looks_binary(data: bytes) -> bool:
+    """Same heuristic as git: a NUL byte within the first 8000 bytes."""
+    return b"\0" in data[:8000]
+
+
+class FileFilter:
+    """Decides which repository paths are ingested: excludes, includes and size cap."""
+
+    def __init__(
+        self,
+        include_patterns: Iterable[str] | None = None,
+        exclude_patterns: Iterable[str] | None = None,
+        max_file_size: int = GITHUB_MAX_FILE_SIZE,
+        use_default_excludes: bool = True,
+    ):
+        excludes = list(DEFAULT_EXCLUDE_PATTERNS) if use_default_excludes else []
+        excludes.extend(exclude_patterns or [])
+        self.exclude = pathspec.GitIgnoreSpec.from_lines(excludes)
+        includes = list(include_patterns or [])
+        self.include = pathspec.GitIgnoreSpec.from_lines(includes) if includes else None
+        self.max_file_size = max_file_size
+        settings = [sorted(excludes), sorted(includes), max_file_size]
+        # stored with ingested packs, so a later ingest can tell whether the rules changed
+        self.fingerprint = hashlib.sha1(json.dumps(settings).encode("utf-8")).hexdigest()[:16]
+
+    def excludes_dir(self, rel_dir: str) -> bool:
+        return self.exclude.match_file(rel_dir.rstrip("/") + "/")
+
+    def accepts(self, rel_path: str, size: int) -> bool:
+        if size > self.max_file_size:
+            return False
+        if self.exclude.match_file(rel_path):
+            return False
+        return self.include is None or self.include.match_file(rel_path)
+
+
+def gitignored(rel_path: str, ignores: list[tuple[str, pathspec.GitIgnoreSpec]]) -> bool:
+    """Whether a (directory, spec) .gitignore from `ignores` that applies to `rel_path` matches it."""
+    for base, spec in ignores:
+        if base and not rel_path.startswith(base + "/"):
+            continue
+        local = rel_path[len(base) + 1 :] if base else rel_path
+        if spec.match_file(local):
+            return True
+    return False
+
+
+def _walk(root: str, file_filter: FileFilter) -> Iterator[tuple[str, str, int]]:
+    """Yield (absolute path, relative path, size) honoring nested .gitignore files."""
+    # each entry: (directory relative to root, spec from that directory's .gitignore)
+    stack: list[tuple[str, list[tuple[str, pathspec.GitIgnoreSpec]]]] = [("", [])]
+
+    while stack:
+        rel_dir, ignores = stack.pop()
+        abs_dir = os.path.join(root, rel_dir)
+
+        gitignore = os.path.join(abs_dir, ".gitignore")
+        if os.path.isfile(gitignore):
+            with open(gitignore, "r", encoding="utf-8", errors="replace") as f:
+                ignores = ignores + [(rel_dir, pathspec.GitIgnoreSpec.from_lines(f))]
+
+        try:
+            entries = sorted(os.scandir(abs_dir), key=lambda e: e.name)
+        except OSError as e:
+            logger.warning(f"Cannot list {abs_dir}: {e}")
+            continue
+
+        subdirs = []
+        for entry in entries:
+            rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+            if entry.is_symlink():
+                continue
+            if entry.is_dir():
+                if not file_filter.excludes_dir(rel_path) and not gitignored(rel_path + "/", ignores):
+                    subdirs.append((rel_path, ignores))
+            elif entry.is_file():
+                size = entry.stat().st_size
+                if file_filter.accepts(rel_path, size) and not gitignored(rel_path, ignores):
+                    yield entry.path, rel_path, size
+
+        stack.extend(reversed(subdirs))
+
+
+def _read_file(abs_path: str, rel_path: str, size: int) -> FileRecord | None:
+    try:
+        with open(abs_path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        logger.warning(f"Cannot read {rel_path}: {e}")
+        return None
+    if looks_binary(data):
+        return None
+    return FileRecord(path=rel_path, size=size, content=data.decode("utf-8", errors="replace"))
+
+
+def iter_repository_files(
+    root: str,
+    file_filter: FileFilter | None = None,
+    max_workers: int = 8,
+) -> Iterator[FileRecord]:
+    """
+    Stream the text files of a local checkout as `FileRecord`s.
+
+    Files are read on a thread pool with a bounded number in flight, so memory
+    stays proportional to the pool size rather than to the repository.
+    """
+    file_filter = file_filter or FileFilter()
+    pending: deque[Future] = deque()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for abs_path, rel_path, size in _walk(root, file_filter):
+            pending.append(pool.submit(_read_file, abs_path, rel_path, size))
+            if len(pending) >= max_workers * 4:
+                record = pending.popleft().result()
+                if record is not None:
+                    yield record
+
+        while pending:
+            record = pending.popleft().result()
+            if record is not None:
+                yield record
+
+
+@contextmanager
+def shallow_clone(repo_url: str) -> Iterator[str]:
+    """Shallow-clone `repo_url` into a temporary directory for the duration of the block."""
+    with tempfile.TemporaryDirectory(prefix="agentic-ingest-") as tmp:
+        result = subprocess.run(
+            ["git", "clone", "--depth", "1", "--quiet", repo_url, tmp],
+            capture_output=True,
+            check=False,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"git clone failed: {result.stderr.decode(errors='replace').strip()}"
+            )
+        yield tmp
+
+
+def pack_repo_natively(
+    repo_url: str,
+    base_path: str,
+    file_filter: FileFilter | None = None,
+    max_workers: int = 8,
+) -> None:
+    """Shallow-clone a remote repository and stream its files straight into a pack."""
+    with shallow_clone(repo_url) as root:
+        writer = PackWriter(base_path)
+        try:
+            for record in iter_repository_files(root, file_filter, max_workers):
+                writer.add(record.path, record.content)
+        except BaseException:
+            writer.abort()
+            raise
+        paths = writer.paths
+        writer.close(
+            tree=render_tree(repo_url, paths),
+            summary=(
+                f"Repository: {urlparse(repo_url).path.strip('/')}\n"
+                f"Files analyzed: {len(paths)}\n"
+            ),
+            meta={"repo_url": repo_url},
+        )
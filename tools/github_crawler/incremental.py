@@ -0,0 +1,259 @@
+import os
+import subprocess
+from typing import Iterator
+
+import pathspec
+from urllib.parse import urlparse
+
+from pydantic import BaseModel, Field, HttpUrl
+
+from core import get_logger
+from core.config import REPO_CACHE_DIR
+from .convertor import render_tree
+from .file_ingest import FileFilter, gitignored, looks_binary
+from .pack_store import PackWriter, PackedRepository
+
+logger = get_logger(__name__)
+
+class IngestDelta(BaseModel):
+    """Files touched by an incremental update, for refreshing derived indexes."""
+
+    previous_commit: str | None = None
+    commit: str
+    added: list[str] = Field(default_factory=list)
+    modified: list[str] = Field(default_factory=list)
+    deleted: list[str] = Field(default_factory=list)
+
+    @property
+    def changed(self) -> list[str]:
+        return self.added + self.modified
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.modified or self.deleted)
+
+# blobs requested per `git cat-file --batch` call, bounding memory on first ingest
+_CAT_FILE_BATCH = 512
+
+
+def _git(git_dir: str, *args: str, input: bytes | None = None) -> bytes:
+    result = subprocess.run(
+        ["git", "--git-dir", git_dir, *args],
+        input=input,
+        capture_output=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(
+            f"git {' '.join(args)} failed: {result.stderr.decode(errors='replace').strip()}"
+        )
+    return result.stdout
+
+
+class RepoMirror:
+    """Local bare clone of a remote repository kept up to date with `git fetch`."""
+
+    def __init__(self, repo_url: str, cache_dir: str = REPO_CACHE_DIR):
+        self.repo_url = repo_url
+        parsed = urlparse(repo_url)
+        slug = f"{parsed.hostname or 'local'}{parsed.path}".strip("/").replace("/", "__")
+        self.git_dir = os.path.join(cache_dir, f"{slug}.git")
+        # pack holding the ingested files; its meta records the ingested commit
+        self.pack_base = os.path.join(cache_dir, slug)
+
+    def sync(self) -> str:
+        """Clone or fetch new objects; return the commit of the default branch."""
+        if not os.path.isdir(self.git_dir):
+            os.makedirs(os.path.dirname(self.git_dir), exist_ok=True)
+            logger.info(f"Cloning {self.repo_url} into {self.git_dir}")
+            result = subprocess.run(
+                ["git", "clone", "--bare", "--quiet", self.repo_url, self.git_dir],
+                capture_output=True,
+                check=False,
+            )
+            if result.returncode != 0:
+                raise RuntimeError(
+                    f"git clone failed: {result.stderr.decode(errors='replace').strip()}"
+                )
+        else:
+            logger.info(f"Fetching new objects for {self.repo_url}")
+            _git(
+                self.git_dir,
+                "fetch",
+                "--quiet",
+                "--prune",
+                "origin",
+                "+refs/heads/*:refs/heads/*",
+            )
+        return _git(self.git_dir, "rev-parse", "HEAD").decode().strip()
+
+    def list_blobs(self, commit: str) -> dict[str, tuple[str, int]]:
+        """Map path -> (blob sha, size) for every file in `commit`."""
+        out = _git(self.git_dir, "ls-tree", "-r", "-z", "--long", commit)
+        blobs: dict[str, tuple[str, int]] = {}
+        for entry in out.split(b"\0"):
+            if not entry:
+                continue
+            meta, path = entry.split(b"\t", 1)
+            _mode, obj_type, sha, size = meta.split()
+            if obj_type != b"blob":
+                continue  # submodules
+            blobs[path.decode("utf-8", errors="replace")] = (sha.decode(), int(size))
+        return blobs
+
+    def diff(self, old: str, new: str) -> IngestDelta:
+        out = _git(
+            self.git_dir, "diff", "--name-status", "-z", "--no-renames", old, new
+        )
+        delta = IngestDelta(previous_commit=old, commit=new)
+        parts = [p.decode("utf-8", errors="replace") for p in out.split(b"\0") if p]
+        for status, path in zip(parts[::2], parts[1::2]):
+            if status == "A":
+                delta.added.append(path)
+            elif status == "D":
+                delta.deleted.append(path)
+            else:  # M, T
+                delta.modified.append(path)
+        return delta
+
+    def iter_texts(
+        self,
+        blobs: dict[str, tuple[str, int]],
+        paths: list[str],
+    ) -> Iterator[tuple[str, str]]:
+        """Yield (path, text) for `paths` (from `list_blobs`), batched through `git cat-file --batch`."""
+        wanted = [(path, blobs[path][0]) for path in paths if path in blobs]
+
+        for start in range(0, len(wanted), _CAT_FILE_BATCH):
+            batch = wanted[start : start + _CAT_FILE_BATCH]
+            request = "".join(f"{sha}\n" for _, sha in batch).encode()
+            out = _git(self.git_dir, "cat-file", "--batch", input=request)
+
+            pos = 0
+            for path, _sha in batch:
+                header_end = out.index(b"\n", pos)
+                size = int(out[pos:header_end].split()[2])
+                data = out[header_end + 1 : header_end + 1 + size]
+                pos = header_end + 1 + size + 1
+                if not looks_binary(data):
+                    yield path, data.decode("utf-8", errors="replace")
+
+    def gitignores(self, blobs: dict[str, tuple[str, int]]) -> list[tuple[str, pathspec.GitIgnoreSpec]]:
+        """(directory, spec) for every .gitignore in `blobs`, as the native walk reads them."""
+        paths = [p for p in blobs if os.path.basename(p) == ".gitignore"]
+        return [
+            (os.path.dirname(path), pathspec.GitIgnoreSpec.from_lines(text.splitlines()))
+            for path, text in self.iter_texts(blobs, paths)
+        ]
+
+    def load_state(self) -> PackedRepository | None:
+        if not PackedRepository.exists(self.pack_base):
+            return None
+        return PackedRepository(self.pack_base)
+
+
+def render_summary(repo_url: str, commit: str, file_count: int) -> str:
+    return (
+        f"Repository: {urlparse(repo_url).path.strip('/')}\n"
+        f"Commit: {commit}\n"
+        f"Files analyzed: {file_count}\n"
+    )
+
+
+def _touches_gitignore(delta: IngestDelta) -> bool:
+    return any(os.path.basename(p) == ".gitignore" for p in delta.deleted + delta.changed)
+
+
+def update_repository(
+    repo_link: HttpUrl | str,
+    cache_dir: str = REPO_CACHE_DIR,
+    file_filter: FileFilter | None = None,
+) -> tuple[PackedRepository, IngestDelta]:
+    """
+    Ingest a repository, re-reading only the files changed since the last ingest.
+
+    The first call clones and reads everything; later calls fetch new objects
+    and apply `git diff` between the last ingested commit and the new head.
+    Unchanged files are copied between packs still compressed. Files are
+    selected by `file_filter` and the repository's .gitignore files; when
+    either differs from the last ingest, everything is read again.
+    """
+    repo_url = str(repo_link)
+    file_filter = file_filter or FileFilter()
+    mirror = RepoMirror(repo_url, cache_dir)
+    commit = mirror.sync()
+    previous = mirror.load_state()
+    same_filter = previous is not None and previous.meta.get("filter") == file_filter.fingerprint
+
+    if same_filter and previous.meta.get("commit") == commit:
+        logger.info(f"{repo_url} unchanged at {commit[:12]}")
+        return previous, IngestDelta(previous_commit=commit, commit=commit)
+
+    blobs = mirror.list_blobs(commit)
+    ignores = mirror.gitignores(blobs)
+
+    def accepts(path: str) -> bool:
+        return (
+            path in blobs
+            and file_filter.accepts(path, blobs[path][1])
+            and not gitignored(path, ignores)
+        )
+
+    delta = mirror.diff(previous.meta["commit"], commit) if same_filter else None
+    if delta is not None and _touches_gitignore(delta):
+        # a changed .gitignore can bring back files that did not change themselves
+        delta = None
+
+    writer = PackWriter(mirror.pack_base)
+    try:
+        if delta is None:
+            for path, text in mirror.iter_texts(blobs, [p for p in blobs if accepts(p)]):
+                writer.add(path, text)
+            before = set(previous.paths) if previous is not None else set()
+            after = set(writer.paths)
+            delta = IngestDelta(
+                previous_commit=previous.meta.get("commit") if previous is not None else None,
+                commit=commit,
+                added=sorted(after - before),
+                modified=sorted(after & before),
+                deleted=sorted(before - after),
+            )
+            logger.info(f"Full ingest of {repo_url}@{commit[:12]}: {len(writer.paths)} files")
+
+        else:
+            touched = set(delta.deleted) | set(delta.changed)
+            for path in previous.paths:
+                if path in touched:
+                    continue
+                if not accepts(path):
+                    delta.deleted.append(path)
+                    continue
+                if previous.codec == writer.codec:
+                    writer.add_raw(path, *previous.read_raw(path))
+                else:
+                    writer.add(path, previous.read(path))
+            # a file can turn binary or exceed the size cap between commits,
+            # in which case it is simply not re-added
+            changed = [p for p in delta.changed if accepts(p)]
+            for path, text in mirror.iter_texts(blobs, changed):
+                writer.add(path, text)
+            # report only what the new pack holds, so derived indexes match it
+            written = set(writer.paths)
+            delta.deleted.extend(p for p in delta.modified if p not in written)
+            delta.added = [p for p in delta.added if p in written]
+            delta.modified = [p for p in delta.modified if p in written]
+            logger.info(
+                f"Incremental ingest of {repo_url} {previous.meta['commit'][:12]}..{commit[:12]}: "
+                f"+{len(delta.added)} ~{len(delta.modified)} -{len(delta.deleted)}"
+            )
+    except BaseException:
+        writer.abort()
+        raise
+
+    paths = writer.paths
+    writer.close(
+        tree=render_tree(repo_url, paths),
+        summary=render_summary(repo_url, commit, len(paths)),
+        meta={"commit": commit, "repo_url": repo_url, "filter": file_filter.fingerprint},
+    )
+    return PackedRepository(mirror.pack_base), delta
@@ -0,0 +1,280 @@
+try:
+    import zstandard
+
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+import json
+import mmap
+import os
+import time
+import uuid
+import zlib
+from typing import Iterable, Iterator
+
+from core import get_logger
+from .convertor import render_content
+
+logger = get_logger(__name__)
+
+# pack layout: <name>.<token>.pack holds the compressed file blobs back to back;
+# <name>.idx is JSON with the codec, tree, summary, the pack file name and
+# path -> [offset, length, size]. Replacing the index is the commit point, so
+# readers never pair an index with a pack from a different write.
+PACK_SUFFIX = ".pack"
+INDEX_SUFFIX = ".idx"
+
+
+def _pack_file(base_path: str) -> str | None:
+    """Pack file currently referenced by the index at `base_path`, if any."""
+    try:
+        with open(base_path + INDEX_SUFFIX, "r", encoding="utf-8") as f:
+            name = json.load(f)["pack"]
+    except (FileNotFoundError, KeyError, ValueError):
+        return None
+    return os.path.join(os.path.dirname(base_path), name)
+
+
+def _compressor(codec: str):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress
+    return lambda data: zlib.compress(data, 6)
+
+
+def _decompressor(codec: str):
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress
+    return zlib.decompress
+
+
+class PackWriter:
+    """
+    Streams compressed file blobs into a new pack file and writes the index on close.
+
+    Files are consumed one at a time, so a repository is never held in memory
+    as a single string. The index is replaced atomically on `close`.
+    """
+
+    def __init__(self, base_path: str, codec: str | None = None):
+        self.base_path = base_path
+        self.codec = codec or ("zstd" if HAS_ZSTD else "zlib")
+        self._compress = _compressor(self.codec)
+        self.entries: dict[str, list[int]] = {}
+        self._offset = 0
+        self._raw_total = 0
+        os.makedirs(os.path.dirname(base_path) or ".", exist_ok=True)
+        self._pack_path = f"{base_path}.{uuid.uuid4().hex[:12]}{PACK_SUFFIX}"
+        self._pack = open(self._pack_path, "wb")
+
+    @property
+    def paths(self) -> list[str]:
+        return list(self.entries)
+
+    def add(self, path: str, text: str) -> None:
+        raw = text.encode("utf-8")
+        self.add_raw(path, self._compress(raw), len(raw))
+
+    def add_raw(self, path: str, blob: bytes, size: int) -> None:
+        """Append an already-compressed blob (same codec), e.g. copied from another pack."""
+        self._pack.write(blob)
+        self.entries[path] = [self._offset, len(blob), size]
+        self._offset += len(blob)
+        self._raw_total += size
+
+    def close(self, tree: str, summary: str, meta: dict | None = None) -> None:
+        self._pack.close()
+        previous_pack = _pack_file(self.base_path)
+        # unique per writer: workers may ingest the same repository at once
+        index_tmp = f"{self.base_path}{INDEX_SUFFIX}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+        with open(index_tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "codec": self.codec,
+                    "tree": tree,
+                    "summary": summary,
+                    "meta": meta or {},
+                    "pack": os.path.basename(self._pack_path),
+                    "files": self.entries,
+                },
+                f,
+            )
+        os.replace(index_tmp, self.base_path + INDEX_SUFFIX)
+        # open readers keep their mapping of the old pack after it is unlinked
+        if previous_pack:
+            try:
+                os.remove(previous_pack)
+            except FileNotFoundError:
+                pass
+        logger.info(
+            f"Wrote {len(self.entries)} files to {self._pack_path} "
+            f"({self._raw_total / 1e6:.1f} MB -> {self._offset / 1e6:.1f} MB, {self.codec})"
+        )
+
+    def abort(self) -> None:
+        self._pack.close()
+        os.remove(self._pack_path)
+
+
+def write_pack(
+    base_path: str,
+    files: Iterable[tuple[str, str]],
+    tree: str,
+    summary: str,
+    meta: dict | None = None,
+) -> None:
+    """Compress `files` into a pack at `base_path`."""
+    writer = PackWriter(base_path)
+    try:
+        for path, text in files:
+            writer.add(path, text)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close(tree, summary, meta)
+
+
+class PackedRepository:
+    """
+    Read-only view of an ingested repository stored by `write_pack`.
+
+    The pack is memory-mapped and each file is decompressed only when read,
+    so answering a question touches just the files it needs.
+    """
+
+    def __init__(self, base_path: str):
+        self.base_path = base_path
+        with open(base_path + INDEX_SUFFIX, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        self.tree: str = index["tree"]
+        self.summary: str = index["summary"]
+        self.meta: dict = index.get("meta", {})
+        self.codec: str = index["codec"]
+        self._entries: dict[str, list[int]] = index["files"]
+        self._decompress = _decompressor(self.codec)
+
+        with open(os.path.join(os.path.dirname(base_path), index["pack"]), "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            # mmap of an empty file is an error on most platforms
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    @classmethod
+    def exists(cls, base_path: str) -> bool:
+        pack = _pack_file(base_path)
+        return pack is not None and os.path.exists(pack)
+
+    @property
+    def paths(self) -> list[str]:
+        return list(self._entries)
+
+    @property
+    def raw_size(self) -> int:
+        """Total size in bytes of the uncompressed file contents."""
+        return sum(entry[2] for entry in self._entries.values())
+
+    def __contains__(self, path: str) -> bool:
+        return path in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def read_raw(self, path: str) -> tuple[bytes, int]:
+        """Compressed blob of `path` and its uncompressed size."""
+        offset, length, size = self._entries[path]
+        if self._mmap is None:
+            return b"", size
+        return self._mmap[offset : offset + length], size
+
+    def read(self, path: str) -> str:
+        blob, _size = self.read_raw(path)
+        return self._decompress(blob).decode("utf-8") if blob else ""
+
+    def iter_files(self) -> Iterator[tuple[str, str]]:
+        for path in sorted(self._entries):
+            yield path, self.read(path)
+
+    @property
+    def content(self) -> str:
+        """Whole-repository dump; decompresses everything, so avoid on hot paths."""
+        return render_content(dict(self.iter_files()))
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+def delete_pack(base_path: str) -> None:
+    for path in (_pack_file(base_path), base_path + INDEX_SUFFIX):
+        if path is None:
+            continue
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# unreferenced pack and temp files younger than this may still be being written
+_ORPHAN_GRACE_SECONDS = 3600
+
+
+def sweep_packs(directory: str, max_age: float, max_bytes: int) -> int:
+    """
+    Delete packs in `directory` whose index was not touched for `max_age`
+    seconds, then the least recently touched ones until the packs fit in
+    `max_bytes` (0 disables either limit). Pack and temp files no index
+    refers to are removed too. Returns the number of packs deleted.
+
+    Safe to run from several processes at once; readers that already have a
+    pack mapped keep reading it after it is deleted.
+    """
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    now = time.time()
+    packs: list[tuple[float, int, str]] = []
+    referenced: set[str] = set()
+    for name in names:
+        if not name.endswith(INDEX_SUFFIX):
+            continue
+        base_path = os.path.join(directory, name[: -len(INDEX_SUFFIX)])
+        pack = _pack_file(base_path)
+        try:
+            touched = os.path.getmtime(base_path + INDEX_SUFFIX)
+            size = os.path.getsize(pack) if pack else 0
+        except FileNotFoundError:
+            continue
+        if pack:
+            referenced.add(os.path.basename(pack))
+        packs.append((touched, size, base_path))
+
+    deleted = 0
+    total = sum(size for _, size, _ in packs)
+    for touched, size, base_path in sorted(packs):
+        expired = max_age and now - touched > max_age
+        if not expired and not (max_bytes and total > max_bytes):
+            continue
+        delete_pack(base_path)
+        total -= size
+        deleted += 1
+
+    for name in names:
+        if not (name.endswith(PACK_SUFFIX) or name.endswith(".tmp")) or name in referenced:
+            continue
+        path = os.path.join(directory, name)
+        try:
+            if now - os.path.getmtime(path) > _ORPHAN_GRACE_SECONDS:
+                os.remove(path)
+        except FileNotFoundError:
+            pass
+    if deleted:
+        logger.info(f"Swept {deleted} packs from {directory}")
+    return deleted
+
+
+def touch_pack(base_path: str) -> None:
+    """Mark a pack as used, so `sweep_packs` keeps it longer."""
+    try:
+        os.utime(base_path + INDEX_SUFFIX)
+    except FileNotFoundError:
+        pass
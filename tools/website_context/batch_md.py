@@ -0,0 +1,82 @@
+import asyncio
+import time
+from typing import AsyncIterator
+from urllib.parse import urlparse
+
+import httpx
+from pydantic import BaseModel
+
+from core import get_logger
+from core.config import WEBSITE_FETCH_TIMEOUT_SECONDS
+from .fetcher import FetchMode, close_pool, fetch_markdown_async
+
+logger = get_logger(__name__)
+
+
+class BatchResult(BaseModel):
+    index: int
+    url: str
+    markdown: str | None = None
+    error: str | None = None
+    elapsed: float
+
+
+async def _fetch_one(index: int, url: str, timeout: float, mode: FetchMode | None) -> BatchResult:
+    started = time.monotonic()
+    try:
+        if urlparse(url).scheme not in ("http", "https"):
+            raise ValueError("Only HTTP/HTTPS URLs are supported")
+        markdown = await fetch_markdown_async(url, timeout, mode)
+        return BatchResult(index=index, url=url, markdown=markdown, elapsed=time.monotonic() - started)
+    except Exception as e:
+        if isinstance(e, TimeoutError):
+            error = f"Timed out after {timeout:g}s"
+        elif isinstance(e, httpx.HTTPStatusError):
+            error = f"HTTP {e.response.status_code}"
+        else:
+            error = str(e) or type(e).__name__
+        logger.warning(f"Batch fetch of {url} failed: {error}")
+        return BatchResult(index=index, url=url, error=error, elapsed=time.monotonic() - started)
+
+
+async def iter_markdown_batch(
+    urls: list[str],
+    timeout: float = WEBSITE_FETCH_TIMEOUT_SECONDS,
+    mode: FetchMode | None = None,
+) -> AsyncIterator[BatchResult]:
+    """
+    Fetch every URL concurrently and yield each result as soon as it finishes.
+
+    A failed or timed-out URL yields a result with `error` set; it never
+    aborts the rest of the batch. Closing the iterator early cancels the
+    fetches still running, except those another caller is also waiting for.
+    """
+    tasks = [asyncio.create_task(_fetch_one(i, url, timeout, mode)) for i, url in enumerate(urls)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def fetch_markdown_batch(
+    urls: list[str],
+    timeout: float = WEBSITE_FETCH_TIMEOUT_SECONDS,
+    mode: FetchMode | None = None,
+) -> list[BatchResult]:
+    """All results of `iter_markdown_batch`, in input order."""
+    results = [result async for result in iter_markdown_batch(urls, timeout, mode)]
+    return sorted(results, key=lambda r: r.index)
+
+
+if __name__ == "__main__":
+    urls = ["https://example.com", "https://portfolio.tashif.codes", "not-a-url"]
+
+    async def main():
+        async for result in iter_markdown_batch(urls, timeout=20):
+            status = result.error or f"{len(result.markdown)} chars"
+            print(f"[{result.index}] {result.url} ({result.elapsed:.2f}s): {status}")
+        await close_pool()
+
+    asyncio.run(main())
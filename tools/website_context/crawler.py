@@ -0,0 +1,256 @@
+"""
+Bounded site crawler for documentation-style Q&A.
+
+Starting from one URL, follows same-site links breadth-first up to a depth
+and page budget and yields each page as markdown as soon as it is fetched.
+Pages are fetched concurrently over the shared pool from `fetcher`, while
+robots.txt rules and a per-host delay (the larger of ours and the site's
+Crawl-delay) keep it polite. URLs are normalized before they are queued.
+Pages that duplicate or nearly duplicate an earlier page (see `dedup`) are
+skipped, and blocks repeated from earlier pages are stripped from later ones.
+"""
+
+import asyncio
+import hashlib
+import re
+from typing import AsyncIterator
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+from urllib.robotparser import RobotFileParser
+
+import httpx
+from pydantic import BaseModel
+
+from core import get_logger
+from core.config import (
+    CRAWL_CONCURRENCY,
+    CRAWL_DELAY_SECONDS,
+    CRAWL_MAX_DEPTH,
+    CRAWL_MAX_PAGES,
+    WEBSITE_FETCH_TIMEOUT_SECONDS,
+)
+from .dedup import DedupIndex, drop_repeated_blocks
+from .fetcher import _get, fetch_html
+from .page_info import extract_page
+
+logger = get_logger(__name__)
+
+# product token matched against robots.txt User-agent lines
+ROBOTS_AGENT = "AgenticBrowser"
+
+_TRACKING_PARAMS = re.compile(r"^(utm_\w+|fbclid|gclid|mc_cid|mc_eid|ref_src)$", re.I)
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_SKIP_EXTENSIONS = (
+    ".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".ico", ".pdf", ".zip",
+    ".gz", ".tar", ".mp3", ".mp4", ".webm", ".css", ".js", ".json", ".xml",
+    ".woff", ".woff2", ".ttf",
+)
+
+
+class CrawledPage(BaseModel):
+    url: str
+    depth: int
+    title: str | None = None
+    markdown: str
+    content_hash: str
+
+
+def normalize_url(url: str, base: str | None = None) -> str | None:
+    """
+    Canonical form of a (possibly relative) link, or None if it isn't HTTP(S).
+
+    Drops the fragment, default port and tracking parameters, lowercases the
+    scheme and host, and sorts the query so equivalent links compare equal.
+    """
+    parts = urlsplit(urljoin(base, url) if base else url)
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    if parts.port and parts.port != _DEFAULT_PORTS[scheme]:
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not _TRACKING_PARAMS.match(k)
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def content_hash(markdown: str) -> str:
+    """Hash of the markdown with whitespace collapsed, so reflowed copies match."""
+    return hashlib.sha256(" ".join(markdown.split()).encode()).hexdigest()
+
+
+def _site(url: str) -> str:
+    host = urlsplit(url).hostname or ""
+    return host[4:] if host.startswith("www.") else host
+
+
+class _Robots:
+    """robots.txt per origin, fetched once and shared by the crawl's workers."""
+
+    def __init__(self, timeout: float):
+        self.timeout = timeout
+        self._parsers: dict[str, asyncio.Task] = {}
+
+    async def _load(self, origin: str) -> RobotFileParser:
+        parser = RobotFileParser(origin + "/robots.txt")
+        try:
+            response, body = await _get(parser.url, parser.url, self.timeout, check_status=False)
+        except (httpx.HTTPError, ValueError, TimeoutError):
+            parser.allow_all = True
+            return parser
+        if response.status_code in (401, 403):
+            parser.disallow_all = True
+        elif response.status_code >= 400:
+            parser.allow_all = True
+        else:
+            parser.parse(body.decode("utf-8", "replace").splitlines())
+        return parser
+
+    async def get(self, url: str) -> RobotFileParser:
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        if origin not in self._parsers:
+            self._parsers[origin] = asyncio.ensure_future(self._load(origin))
+        return await self._parsers[origin]
+
+
+class _HostGate:
+    """Spaces out request starts to one host by a minimum delay."""
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._next = 0.0
+
+    async def wait(self, delay: float) -> None:
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            if self._next > loop.time():
+                await asyncio.sleep(self._next - loop.time())
+            self._next = loop.time() + delay
+
+
+def _crawlable(hrefs: list[str]) -> list[str]:
+    links = []
+    for href in hrefs:
+        link = normalize_url(href)
+        if link and not urlsplit(link).path.lower().endswith(_SKIP_EXTENSIONS):
+            links.append(link)
+    return links
+
+
+async def crawl_site(
+    start_url: str,
+    max_depth: int = CRAWL_MAX_DEPTH,
+    max_pages: int = CRAWL_MAX_PAGES,
+    concurrency: int = CRAWL_CONCURRENCY,
+    delay: float = CRAWL_DELAY_SECONDS,
+    timeout: float = WEBSITE_FETCH_TIMEOUT_SECONDS,
+    path_prefix: str | None = None,
+    drop_repeats: bool = True,
+) -> AsyncIterator[CrawledPage]:
+    """
+    Crawl the site of `start_url` and yield pages as they are fetched.
+
+    Follows links on the same site (www. ignored) up to `max_depth` hops and
+    fetches at most `max_pages` pages; `path_prefix` (e.g. "/docs/") limits
+    the crawl further. Pages that fail, are disallowed by robots.txt, aren't
+    HTML or duplicate earlier content are skipped. With `drop_repeats`,
+    blocks already sent with an earlier page are left out of later ones.
+    Closing the iterator stops the crawl.
+    """
+    start = normalize_url(start_url if "://" in start_url else "https://" + start_url)
+    if start is None:
+        raise ValueError(f"Not an HTTP(S) URL: {start_url}")
+    site = _site(start)
+
+    frontier: asyncio.Queue = asyncio.Queue()
+    results: asyncio.Queue = asyncio.Queue()
+    seen_urls = {start}
+    pages = DedupIndex(max_entries=max_pages)
+    seen_blocks: set[str] = set()
+    robots = _Robots(timeout)
+    gates: dict[str, _HostGate] = {}
+    fetched = 0
+
+    def in_scope(url: str) -> bool:
+        return _site(url) == site and (not path_prefix or urlsplit(url).path.startswith(path_prefix))
+
+    async def worker() -> None:
+        nonlocal fetched
+        while True:
+            url, depth = await frontier.get()
+            try:
+                if fetched >= max_pages:
+                    continue
+                # reserve the page before awaiting, so concurrent workers can't overshoot
+                fetched += 1
+                parser = await robots.get(url)
+                if not parser.can_fetch(ROBOTS_AGENT, url):
+                    logger.debug(f"robots.txt disallows {url}")
+                    fetched -= 1
+                    continue
+                host = urlsplit(url).netloc
+                gate = gates.setdefault(host, _HostGate())
+                await gate.wait(max(delay, float(parser.crawl_delay(ROBOTS_AGENT) or 0)))
+
+                html, media_type = await fetch_html(url, timeout)
+                if media_type not in ("", "text/html", "application/xhtml+xml"):
+                    continue
+                # one parse gives the markdown, the title and the links to follow
+                page, hrefs = await asyncio.to_thread(extract_page, html, url)
+                title, markdown, links = page.title or None, page.markdown, _crawlable(hrefs)
+                duplicate = await asyncio.to_thread(pages.add_if_new, url, markdown)
+                if duplicate is not None:
+                    logger.debug(f"Skipping {url}: {duplicate.kind} duplicate of {duplicate.of}")
+                    continue
+                digest = content_hash(markdown)
+                if drop_repeats:
+                    markdown = drop_repeated_blocks(markdown, seen_blocks)
+                results.put_nowait(
+                    CrawledPage(url=url, depth=depth, title=title, markdown=markdown, content_hash=digest)
+                )
+
+                if depth < max_depth:
+                    for link in links:
+                        if link not in seen_urls and in_scope(link):
+                            seen_urls.add(link)
+                            frontier.put_nowait((link, depth + 1))
+            except Exception as e:
+                logger.info(f"Crawl skipped {url}: {e or type(e).__name__}")
+            finally:
+                frontier.task_done()
+
+    frontier.put_nowait((start, 0))
+    workers = [asyncio.create_task(worker()) for _ in range(max(concurrency, 1))]
+    drained = asyncio.create_task(frontier.join())
+    try:
+        while True:
+            next_page = asyncio.create_task(results.get())
+            done, _ = await asyncio.wait({next_page, drained}, return_when=asyncio.FIRST_COMPLETED)
+            if next_page in done:
+                yield next_page.result()
+                continue
+            next_page.cancel()
+            while not results.empty():
+                yield results.get_nowait()
+            break
+    finally:
+        for task in [*workers, drained]:
+            task.cancel()
+        await asyncio.gather(*workers, drained, return_exceptions=True)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from .fetcher import close_pool
+
+    url = sys.argv[1] if len(sys.argv) > 1 else "https://docs.python.org/3/tutorial/"
+
+    async def main():
+        async for page in crawl_site(url, max_depth=1, max_pages=10):
+            print(f"[depth {page.depth}] {page.url} - {page.title} ({len(page.markdown)} chars)")
+        await close_pool()
+
+    asyncio.run(main())
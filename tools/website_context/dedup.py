@@ -0,0 +1,252 @@
+"""
+Duplicate detection for pages and markdown blocks.
+
+Three checks, cheapest first:
+
+- exact: SHA-256 of the whitespace- and case-normalized text.
+- SimHash: 64-bit fingerprints of word shingles. Pages within a few bits of
+  each other are the same page with small edits (timestamps, counters,
+  session ids). Blocks of the fingerprint are indexed so lookups don't scan.
+- MinHash: signatures that estimate the Jaccard similarity of shingle sets,
+  banded into LSH buckets. This catches pages that share most of their text
+  but not all of it (a page and its print view, paginated copies).
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Hashable, Iterable, Literal
+
+from pydantic import BaseModel
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_MERSENNE = (1 << 61) - 1
+_MASK64 = (1 << 64) - 1
+
+# blocks shorter than this (headings, "Example:", lone links) repeat legitimately
+MIN_BLOCK_CHARS = 40
+
+
+def normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def exact_hash(text: str) -> str:
+    return hashlib.sha256(normalize(text).encode()).hexdigest()
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+def shingles(text: str, size: int = 5) -> set[str]:
+    """Overlapping `size`-word windows of the text, lowercased."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= size:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i : i + size]) for i in range(len(words) - size + 1)}
+
+
+def simhash(features: Iterable[str]) -> int:
+    weights = [0] * 64
+    for feature in features:
+        h = _hash64(feature)
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class MinHasher:
+    """`num_perm` universal hash permutations; signatures compare position by position."""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        params = hashlib.blake2b(f"minhash:{seed}".encode(), digest_size=64)
+        self.perms = []
+        for i in range(num_perm):
+            digest = hashlib.blake2b(params.digest() + i.to_bytes(4, "big"), digest_size=16).digest()
+            a = int.from_bytes(digest[:8], "big") % _MERSENNE or 1
+            b = int.from_bytes(digest[8:], "big") % _MERSENNE
+            self.perms.append((a, b))
+
+    def signature(self, features: Iterable[str]) -> tuple[int, ...]:
+        hashes = [_hash64(f) for f in features]
+        if not hashes:
+            return tuple(_MASK64 for _ in self.perms)
+        return tuple(min((a * h + b) % _MERSENNE for h in hashes) for a, b in self.perms)
+
+    @staticmethod
+    def similarity(a: tuple[int, ...], b: tuple[int, ...]) -> float:
+        return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class Duplicate(BaseModel):
+    of: Hashable
+    kind: Literal["exact", "simhash", "minhash"]
+    similarity: float
+
+
+class _Entry:
+    __slots__ = ("digest", "fingerprint", "signature")
+
+    def __init__(self, digest: str, fingerprint: int, signature: tuple[int, ...]):
+        self.digest = digest
+        self.fingerprint = fingerprint
+        self.signature = signature
+
+
+class DedupIndex:
+    """
+    Remembers up to `max_entries` documents and finds duplicates of new ones.
+
+    `max_distance` is the largest SimHash Hamming distance and
+    `min_similarity` the smallest estimated Jaccard similarity treated as
+    a duplicate.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        max_distance: int = 3,
+        min_similarity: float = 0.85,
+        num_perm: int = 64,
+        bands: int = 16,
+    ):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.min_similarity = min_similarity
+        self.bands = bands
+        self._rows = num_perm // bands
+        self._hasher = MinHasher(num_perm)
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._exact: dict[str, Hashable] = {}
+        # 4 x 16-bit blocks: fingerprints within 3 bits share at least one block
+        self._simhash_buckets: dict[tuple[int, int], set[Hashable]] = {}
+        self._lsh_buckets: dict[tuple[int, tuple[int, ...]], set[Hashable]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _simhash_keys(self, fingerprint: int) -> list[tuple[int, int]]:
+        return [(i, fingerprint >> (16 * i) & 0xFFFF) for i in range(4)]
+
+    def _lsh_keys(self, signature: tuple[int, ...]) -> list[tuple[int, tuple[int, ...]]]:
+        return [(i, signature[i * self._rows : (i + 1) * self._rows]) for i in range(self.bands)]
+
+    def _entry(self, text: str) -> _Entry:
+        features = shingles(text)
+        return _Entry(exact_hash(text), simhash(features), self._hasher.signature(features))
+
+    def _find(self, entry: _Entry) -> Duplicate | None:
+        if entry.digest in self._exact:
+            return Duplicate(of=self._exact[entry.digest], kind="exact", similarity=1.0)
+
+        candidates = set().union(*(self._simhash_buckets.get(k, ()) for k in self._simhash_keys(entry.fingerprint)))
+        best = None
+        for key in candidates:
+            distance = hamming(entry.fingerprint, self._entries[key].fingerprint)
+            if distance <= self.max_distance and (best is None or distance < best[1]):
+                best = (key, distance)
+        if best is not None:
+            return Duplicate(of=best[0], kind="simhash", similarity=1 - best[1] / 64)
+
+        candidates = set().union(*(self._lsh_buckets.get(k, ()) for k in self._lsh_keys(entry.signature)))
+        best = None
+        for key in candidates:
+            similarity = MinHasher.similarity(entry.signature, self._entries[key].signature)
+            if similarity >= self.min_similarity and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        if best is not None:
+            return Duplicate(of=best[0], kind="minhash", similarity=best[1])
+        return None
+
+    def _add(self, key: Hashable, entry: _Entry) -> None:
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self._exact.setdefault(entry.digest, key)
+        for k in self._simhash_keys(entry.fingerprint):
+            self._simhash_buckets.setdefault(k, set()).add(key)
+        for k in self._lsh_keys(entry.signature):
+            self._lsh_buckets.setdefault(k, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        if self._exact.get(entry.digest) == key:
+            del self._exact[entry.digest]
+        for k in self._simhash_keys(entry.fingerprint):
+            self._simhash_buckets[k].discard(key)
+        for k in self._lsh_keys(entry.signature):
+            self._lsh_buckets[k].discard(key)
+
+    def check(self, text: str) -> Duplicate | None:
+        """The stored document `text` duplicates, if any."""
+        entry = self._entry(text)
+        with self._lock:
+            return self._find(entry)
+
+    def add_if_new(self, key: Hashable, text: str) -> Duplicate | None:
+        """Store `text` under `key` unless it duplicates a stored document; returns that match."""
+        entry = self._entry(text)
+        with self._lock:
+            duplicate = self._find(entry)
+            if duplicate is None:
+                self._add(key, entry)
+            return duplicate
+
+
+def drop_repeated_blocks(markdown: str, seen: set[str] | None = None) -> str:
+    """
+    Remove paragraphs (blank-line separated blocks) already in `seen`.
+
+    Pass the same `seen` set across pages to strip blocks repeated from page
+    to page (boilerplate that survived extraction); without it, repeats
+    within this text are removed. Short blocks are always kept.
+    """
+    seen = set() if seen is None else seen
+    kept = []
+    for block in re.split(r"\n\s*\n", markdown):
+        if len(block.strip()) >= MIN_BLOCK_CHARS:
+            digest = exact_hash(block)
+            if digest in seen:
+                continue
+            seen.add(digest)
+        kept.append(block)
+    return "\n\n".join(kept)
+
+
+def unique_chunks(chunks: list[str], max_distance: int = 3) -> list[str]:
+    """`chunks` without exact or near-identical (SimHash) repeats, order kept."""
+    index = DedupIndex(max_entries=len(chunks) or 1, max_distance=max_distance, min_similarity=1.01)
+    return [chunk for i, chunk in enumerate(chunks) if index.add_if_new(i, chunk) is None]
+
+
+if __name__ == "__main__":
+    import random
+
+    random.seed(7)
+    words = [f"word{i}" for i in range(500)]
+    article = " ".join(random.choice(words) for _ in range(800))
+    pages = {
+        "a": article,
+        "a?utm=1": article.upper(),
+        "a-edited": article.replace("word1 ", "word2 ", 3) + " updated today",
+        "a-print": article[: int(len(article) * 0.93)],
+        "b": " ".join(random.choice(words) for _ in range(800)),
+    }
+    index = DedupIndex()
+    for key, text in pages.items():
+        duplicate = index.add_if_new(key, text)
+        print(f"{key}: {'new' if duplicate is None else duplicate.model_dump()}")
+
+    footer = "Copyright 2025 Example Inc. All rights reserved. Privacy, terms and cookies."
+    seen: set[str] = set()
+    for text in [f"First page body text.\n\n{footer}", f"Second page body text.\n\n{footer}"]:
+        print(repr(drop_repeated_blocks(text, seen)))
@@ -0,0 +1,359 @@
+"""
+Page fetching for the website tools, in one of three modes:
+
+- "jina": through the Jina AI reader (https://r.jina.ai/), which also renders
+  JavaScript and converts PDFs, at the cost of a third-party hop.
+- "local": the page itself over our own connection pool, decoded and
+  converted with the html_md path.
+- "auto": local first, falling back to Jina when the local fetch fails or
+  yields almost no text (typically a JavaScript-only page).
+
+Every request, and every redirect it is sent to, is refused when its host
+resolves to a loopback, private-network or link-local address (unless
+WEBSITE_ALLOW_PRIVATE_HOSTS is set), and bodies are read up to
+WEBSITE_MAX_BYTES.
+"""
+
+import asyncio
+import ipaddress
+import socket
+from typing import Literal
+from urllib.parse import urlparse
+
+import httpx
+
+from core import get_logger
+from core.config import (
+    WEBSITE_ALLOW_PRIVATE_HOSTS,
+    WEBSITE_FETCH_MODE,
+    WEBSITE_FETCH_TIMEOUT_SECONDS,
+    WEBSITE_MAX_BYTES,
+    WEBSITE_MAX_CONNECTIONS,
+    WEBSITE_PER_HOST_CONCURRENCY,
+)
+from core.singleflight import coalesce
+from mcp_server.models import MDPageInfo
+from .html_md import decode_html
+from .page_info import page_info
+
+logger = get_logger(__name__)
+
+FetchMode = Literal["local", "jina", "auto"]
+
+JINA_READER = "https://r.jina.ai/"
+
+USER_AGENT = "Mozilla/5.0 (compatible; AgenticBrowser/0.1; +https://github.com/tashifkhan/agentic-browser)"
+
+_HTML_TYPES = {"", "text/html", "application/xhtml+xml"}
+
+# a local fetch with less text than this is most likely a JavaScript shell
+_MIN_LOCAL_CHARS = 200
+
+_MAX_REDIRECTS = 10
+
+
+class BlockedURLError(ValueError):
+    """The URL is not http(s), or its host resolves to a non-public address."""
+
+
+def _split_url(url: str) -> tuple[str, int]:
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise BlockedURLError(f"Only HTTP/HTTPS URLs are supported: {url}")
+    return parsed.hostname, parsed.port or (443 if parsed.scheme == "https" else 80)
+
+
+def _check_addresses(url: str, host: str, addresses: list) -> None:
+    for *_, sockaddr in addresses:
+        address = ipaddress.ip_address(sockaddr[0].split("%")[0])
+        if not address.is_global or address.is_multicast:
+            raise BlockedURLError(f"Refusing to fetch {url}: {host} resolves to non-public address {address}")
+
+
+async def check_public_url(url: str) -> None:
+    """Raise BlockedURLError unless `url` is http(s) on a host with only public addresses."""
+    host, port = _split_url(url)
+    if WEBSITE_ALLOW_PRIVATE_HOSTS:
+        return
+    try:
+        addresses = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise httpx.ConnectError(f"Cannot resolve {host}: {e}") from e
+    _check_addresses(url, host, addresses)
+
+
+def check_public_url_sync(url: str) -> None:
+    """`check_public_url` for threads without an event loop (e.g. job webhooks)."""
+    host, port = _split_url(url)
+    if WEBSITE_ALLOW_PRIVATE_HOSTS:
+        return
+    try:
+        addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise BlockedURLError(f"Cannot resolve {host}: {e}") from e
+    _check_addresses(url, host, addresses)
+
+
+async def _read_capped(response: httpx.Response, max_bytes: int = WEBSITE_MAX_BYTES) -> bytes:
+    length = response.headers.get("content-length", "")
+    if length.isdigit() and int(length) > max_bytes:
+        raise ValueError(f"Response from {response.url} is larger than {max_bytes} bytes")
+    chunks, size = [], 0
+    # decoded chunks, so compressed bodies are capped at their real size
+    async for chunk in response.aiter_bytes():
+        size += len(chunk)
+        if size > max_bytes:
+            raise ValueError(f"Response from {response.url} is larger than {max_bytes} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+class _Pool:
+    """One pooled client per event loop, plus a semaphore per target host."""
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=WEBSITE_MAX_CONNECTIONS,
+                max_keepalive_connections=WEBSITE_MAX_CONNECTIONS,
+            ),
+            headers={"User-Agent": USER_AGENT},
+            # redirects are followed by `_get`, which checks every hop
+            follow_redirects=False,
+        )
+        self.hosts: dict[str, asyncio.Semaphore] = {}
+
+    def host_slot(self, url: str) -> asyncio.Semaphore:
+        host = (urlparse(url).hostname or url).lower()
+        slot = self.hosts.get(host)
+        if slot is None:
+            slot = self.hosts[host] = asyncio.Semaphore(WEBSITE_PER_HOST_CONCURRENCY)
+        return slot
+
+
+_pool: _Pool | None = None
+
+
+def _get_pool() -> _Pool:
+    global _pool
+    if _pool is None or _pool.loop is not asyncio.get_running_loop():
+        _pool = _Pool()
+    return _pool
+
+
+async def close_pool() -> None:
+    """Close the pooled client; call on application shutdown."""
+    global _pool
+    if _pool is not None and _pool.loop is asyncio.get_running_loop():
+        await _pool.client.aclose()
+    _pool = None
+
+
+async def _get(
+    url: str,
+    request_url: str,
+    timeout: float,
+    headers: dict[str, str] | None = None,
+    check_status: bool = True,
+) -> tuple[httpx.Response, bytes]:
+    """
+    GET `request_url` on behalf of `url`, following redirects to public hosts
+    only. Returns the final response (already closed) and its body.
+    """
+    pool = _get_pool()
+    # the per-host limit is for the site being read, even when a proxy fetches it
+    async with pool.host_slot(url):
+        async with asyncio.timeout(timeout):
+            for _ in range(_MAX_REDIRECTS + 1):
+                await check_public_url(request_url)
+                request = pool.client.build_request("GET", request_url, headers=headers, timeout=timeout)
+                response = await pool.client.send(request, stream=True)
+                try:
+                    if response.next_request is not None:
+                        request_url = str(response.next_request.url)
+                        continue
+                    if check_status:
+                        response.raise_for_status()
+                    return response, await _read_capped(response)
+                finally:
+                    await response.aclose()
+    raise httpx.TooManyRedirects(f"More than {_MAX_REDIRECTS} redirects for {url}", request=request)
+
+
+async def fetch_html(url: str, timeout: float = WEBSITE_FETCH_TIMEOUT_SECONDS) -> tuple[str, str]:
+    """The decoded body of `url` and its media type, fetched directly."""
+    response, body = await _get(
+        url,
+        url,
+        timeout,
+        headers={"Accept": "text/html,application/xhtml+xml;q=0.9,text/*;q=0.8"},
+    )
+    content_type = response.headers.get("content-type", "")
+    media_type = content_type.split(";")[0].strip().lower()
+    if media_type not in _HTML_TYPES and not media_type.startswith("text/"):
+        raise ValueError(f"Cannot convert {media_type} locally")
+    return decode_html(body, content_type), media_type
+
+
+async def fetch_page_info(
+    url: str, timeout: float = WEBSITE_FETCH_TIMEOUT_SECONDS, full_body: bool = False
+) -> MDPageInfo:
+    """Fetch `url` directly and build its (cached) page model."""
+    html, media_type = await fetch_html(url, timeout)
+    if media_type not in _HTML_TYPES:
+        raise ValueError(f"Expected an HTML page, got {media_type}")
+    # BeautifulSoup and html2text take about a second on large pages
+    return await asyncio.to_thread(page_info, html, url, full_body)
+
+
+async def fetch_local(
+    url: str, timeout: float = WEBSITE_FETCH_TIMEOUT_SECONDS, full_body: bool = False
+) -> str:
+    body, media_type = await fetch_html(url, timeout)
+    # plain text and markdown pages are already what we want
+    if media_type not in _HTML_TYPES:
+        return body
+    # the page model comes from the same parse and is cached for follow-up questions
+    return (await asyncio.to_thread(page_info, body, url, full_body)).markdown
+
+
+async def fetch_jina(url: str, timeout: float = WEBSITE_FETCH_TIMEOUT_SECONDS) -> str:
+    response, body = await _get(url, JINA_READER + url, timeout)
+    return decode_html(body, response.headers.get("content-type", ""))
+
+
+@coalesce(
+    key=lambda url, timeout=None, mode=None, full_body=False: (url, mode or WEBSITE_FETCH_MODE, full_body)
+)
+async def fetch_markdown_async(
+    url: str,
+    timeout: float = WEBSITE_FETCH_TIMEOUT_SECONDS,
+    mode: FetchMode | None = None,
+    full_body: bool = False,
+) -> str:
+    """
+    Markdown for `url` using `mode` (default: WEBSITE_FETCH_MODE), within
+    `timeout` seconds. Locally converted pages keep only their main content
+    unless `full_body` is set.
+    """
+    mode = mode or WEBSITE_FETCH_MODE
+    if mode == "jina":
+        return await fetch_jina(url, timeout)
+    if mode == "local":
+        return await fetch_local(url, timeout, full_body)
+    if mode != "auto":
+        raise ValueError(f"Unknown fetch mode: '{mode}'. Choose from local, jina, auto")
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    try:
+        markdown = await fetch_local(url, timeout, full_body)
+        if len(markdown.strip()) >= _MIN_LOCAL_CHARS:
+            return markdown
+        logger.info(f"Local fetch of {url} returned little text; falling back to Jina")
+    except Exception as e:
+        if isinstance(e, TimeoutError):
+            raise
+        logger.info(f"Local fetch of {url} failed ({e or type(e).__name__}); falling back to Jina")
+    return await fetch_jina(url, max(deadline - loop.time(), 0.001))
+
+
+if __name__ == "__main__":
+    # stand-in site: checks the local path, the SSRF guard and the size cap offline
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    article = "<p>" + "Ça coûte 5 €, déjà payé. " * 20 + "</p>"
+    oversized = b"<p>" + b"x" * WEBSITE_MAX_BYTES + b"</p>"
+    pages = {
+        "/header": ("text/html; charset=windows-1252", f"<h1>Café</h1>{article}".encode("cp1252")),
+        "/meta": (
+            "text/html",
+            f'<html><head><meta charset="iso-8859-15"></head><body><h1>Café</h1>{article}</body></html>'.encode("iso-8859-15"),
+        ),
+        "/utf8": ("text/html", f"<h1>Café</h1>{article}".encode("utf-8")),
+        "/notes.md": ("text/markdown; charset=utf-8", "# Notes\n\nAlready markdown.".encode()),
+        "/big": ("text/html", oversized),
+        "/big-unsized": ("text/html", oversized),
+    }
+
+    class StandIn(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/to-metadata":
+                self.send_response(302)
+                self.send_header("Location", "http://169.254.169.254/latest/meta-data/")
+                self.end_headers()
+                return
+            if self.path == "/to-utf8":
+                self.send_response(302)
+                self.send_header("Location", "/utf8")
+                self.end_headers()
+                return
+            if self.path not in pages:
+                self.send_error(404)
+                return
+            content_type, body = pages[self.path]
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            # without a length the body is read until the connection closes
+            if self.path != "/big-unsized":
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            try:
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    WEBSITE_ALLOW_PRIVATE_HOSTS = False
+    check_addresses = _check_addresses
+
+    def _check_addresses(url: str, host: str, addresses: list) -> None:
+        # the stand-in plays a public site; every other address is checked for real
+        if not url.startswith(base + "/"):
+            check_addresses(url, host, addresses)
+
+    async def expect_error(error_type: type[Exception], url: str) -> Exception:
+        try:
+            await fetch_markdown_async(url, timeout=10, mode="local")
+        except error_type as e:
+            return e
+        raise AssertionError(f"{url} was fetched")
+
+    async def main():
+        for path in ["/header", "/meta", "/utf8", "/to-utf8"]:
+            markdown = await fetch_markdown_async(base + path, timeout=5, mode="local")
+            print(f"{path}: {markdown.strip().splitlines()[0]!r} ({len(markdown)} chars)")
+            assert "Café" in markdown and "5 €" in markdown, path
+        markdown = await fetch_markdown_async(base + "/notes.md", timeout=5, mode="local")
+        assert markdown.startswith("# Notes")
+        await expect_error(httpx.HTTPStatusError, base + "/missing")
+
+        # non-public targets, directly or through a redirect
+        for url in [
+            "http://127.0.0.1:9/",
+            "http://localhost:9/",
+            "http://169.254.169.254/latest/meta-data/",
+            "http://[::1]:9/",
+            "file:///etc/passwd",
+            base + "/to-metadata",
+        ]:
+            error = await expect_error(BlockedURLError, url)
+            print(f"blocked {url}: {error}")
+
+        # bodies over WEBSITE_MAX_BYTES, announced or not
+        for path in ["/big", "/big-unsized"]:
+            error = await expect_error(ValueError, base + path)
+            assert "larger than" in str(error), error
+            print(f"capped {path}: {error}")
+        await close_pool()
+
+    asyncio.run(main())
+    server.shutdown()
+    print("fetcher checks passed")
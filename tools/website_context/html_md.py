@@ -1,16 +1,69 @@
-from bs4 import BeautifulSoup
+import codecs
+import re
+
+from bs4 import BeautifulSoup, Tag
 import html2text
 
+from .readability import main_content
 
-def return_html_md(html: str) -> str:
-    """Extension sends html body its converted to markdown text."""
-    soup = BeautifulSoup(html, "html.parser")
+_META_CHARSET = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.I)
+_HEADER_CHARSET = re.compile(r"""charset\s*=\s*["']?([a-zA-Z0-9_.:-]+)""", re.I)
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+# browsers decode these labels as windows-1252, which also maps 0x80-0x9f
+_WINDOWS_1252_ALIASES = {"iso-8859-1", "iso8859-1", "latin1", "latin-1", "us-ascii", "ascii"}
+
+
+def decode_html(content: bytes, content_type: str = "") -> str:
+    """
+    Decode fetched HTML the way a browser would: byte order mark, then the
+    Content-Type charset, then <meta charset>, then UTF-8, then windows-1252.
+    """
+    labels = [encoding for bom, encoding in _BOMS if content.startswith(bom)][:1]
+    if match := _HEADER_CHARSET.search(content_type):
+        labels.append(match.group(1))
+    if match := _META_CHARSET.search(content[:4096]):
+        labels.append(match.group(1).decode("ascii"))
+    labels.append("utf-8")
+    for label in labels:
+        label = label.lower()
+        if label in _WINDOWS_1252_ALIASES:
+            label = "windows-1252"
+        try:
+            return content.decode(label)
+        except (LookupError, UnicodeDecodeError):
+            continue
+    return content.decode("windows-1252", errors="replace")
+
+
+def content_root(soup: BeautifulSoup, full_body: bool = False) -> Tag:
+    """The page's main content element (modifying `soup`), or its whole body."""
     body = soup.body if soup.body else soup
-    body_html = str(body.prettify())
+    if not full_body:
+        body = main_content(soup) or body
+    return body
+
+
+def node_to_md(node: Tag) -> str:
+    body_html = str(node.prettify())
     markdowntext = html2text.html2text(body_html)
     return markdowntext
 
 
+def return_html_md(html: str, full_body: bool = False) -> str:
+    """
+    Extension sends html body its converted to markdown text.
+
+    Only the page's main content is kept (navigation, footers, banners and
+    sidebars are dropped) unless `full_body` is set.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    return node_to_md(content_root(soup, full_body))
+
+
 if __name__ == "__main__":
     import requests
 
@@ -22,5 +75,6 @@ if __name__ == "__main__":
     print("\nConverting HTML to Markdown...")
     markdown = return_html_md(html)
     print(markdown)
+    print(f"Full body markdown length: {len(return_html_md(html, full_body=True))}")
     print(f"Markdown length: {len(markdown)}")
     print(f"Markdown preview: {markdown[:500]}")
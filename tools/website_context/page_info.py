@@ -0,0 +1,179 @@
+"""
+Structured page model (MDPageInfo) built from a single HTML parse.
+
+Head metadata is read first. The same soup then yields the main-content
+element, and one walk over that element collects headings, paragraphs,
+links, images, code blocks and tables. The markdown is rendered from the
+same element. Results are kept in a small LRU cache keyed by the page's
+content, so repeated questions about one page skip the work.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, Tag
+
+from core.config import WEBSITE_PAGE_CACHE_SIZE
+from mcp_server.models import MDCodeBlock, MDHeading, MDImage, MDLink, MDPageInfo, MDTable
+from .html_md import content_root, node_to_md
+
+_LANGUAGE_CLASS = re.compile(r"^(?:language|lang|highlight|brush)-?(?P<lang>[\w+#-]+)$")
+_HEADINGS = {"h1", "h2", "h3", "h4", "h5", "h6"}
+_UPDATED_KEYS = ("article:modified_time", "og:updated_time", "datemodified", "last-modified", "dcterms.modified")
+_PUBLISHED_KEYS = ("article:published_time", "datepublished", "date", "dcterms.created")
+
+# content hash -> page, least recently used first
+_pages: "OrderedDict[str, MDPageInfo]" = OrderedDict()
+_pages_lock = threading.Lock()
+
+
+def _text(tag: Tag) -> str:
+    return " ".join(tag.get_text(" ", strip=True).split())
+
+
+def _read_head(soup: BeautifulSoup) -> tuple[dict[str, str], list[str]]:
+    metadata: dict[str, str] = {}
+    tags: list[str] = []
+    for meta in soup.find_all("meta"):
+        key = (meta.get("name") or meta.get("property") or meta.get("itemprop") or "").lower()
+        content = (meta.get("content") or "").strip()
+        if not key or not content:
+            continue
+        if key == "article:tag":
+            tags.append(content)
+        elif key == "keywords":
+            tags.extend(k.strip() for k in content.split(",") if k.strip())
+        metadata.setdefault(key, content)
+    if "description" not in metadata and "og:description" in metadata:
+        metadata["description"] = metadata["og:description"]
+    canonical = soup.find("link", rel="canonical")
+    if canonical and canonical.get("href"):
+        metadata["canonical"] = canonical["href"]
+    if soup.html and soup.html.get("lang"):
+        metadata["language"] = soup.html["lang"]
+    return metadata, list(dict.fromkeys(tags))
+
+
+def _code_language(pre: Tag) -> str | None:
+    for tag in [pre, *pre.find_all("code", limit=1)]:
+        for cls in tag.get("class", []):
+            if match := _LANGUAGE_CLASS.match(cls):
+                return match.group("lang")
+    return pre.get("data-language") or pre.get("data-lang")
+
+
+def _table(table: Tag) -> MDTable:
+    rows = []
+    headers: list[str] = []
+    for tr in table.find_all("tr"):
+        # cells of nested tables belong to those tables
+        if tr.find_parent("table") is not table:
+            continue
+        cells = tr.find_all(["th", "td"], recursive=False)
+        if not cells:
+            continue
+        if not headers and not rows and all(c.name == "th" for c in cells):
+            headers = [_text(c) for c in cells]
+        else:
+            rows.append([_text(c) for c in cells])
+    return MDTable(headers=headers, rows=rows)
+
+
+def extract_page_info(html: str, url: str | None = None, full_body: bool = False) -> MDPageInfo:
+    """Parse `html` once into an MDPageInfo (uncached; see `page_info`)."""
+    return extract_page(html, url, full_body)[0]
+
+
+def extract_page(html: str, url: str | None = None, full_body: bool = False) -> tuple[MDPageInfo, list[str]]:
+    """
+    `extract_page_info`, plus the absolute URL of every followable link on
+    the whole page (navigation included), for crawling.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    metadata, tags = _read_head(soup)
+    base = urljoin(url or "", soup.base["href"]) if soup.base and soup.base.get("href") else url
+    page_title = soup.title.get_text(strip=True) if soup.title else ""
+    # read before the navigation is stripped from the soup
+    followable = [
+        urljoin(base or "", a["href"].strip())
+        for a in soup.find_all("a", href=True)
+        if "nofollow" not in (a.get("rel") or [])
+    ]
+
+    root = content_root(soup, full_body)
+    page = MDPageInfo(url=url, metadata=metadata, tags=tags)
+    for tag in root.find_all(True):
+        name = tag.name
+        if name in _HEADINGS:
+            text = _text(tag)
+            if text:
+                page.headings.append(MDHeading(level=int(name[1]), text=text, anchor=tag.get("id")))
+        elif name == "p":
+            text = _text(tag)
+            if text:
+                page.paragraphs.append(text)
+        elif name == "a" and tag.get("href"):
+            href = tag["href"].strip()
+            if href.startswith(("#", "javascript:")):
+                continue
+            page.links.append(MDLink(text=_text(tag), url=urljoin(base or "", href)))
+        elif name == "img" and (tag.get("src") or tag.get("data-src")):
+            src = tag.get("src") or tag.get("data-src")
+            page.images.append(MDImage(alt=tag.get("alt", "").strip(), src=urljoin(base or "", src)))
+        elif name == "pre":
+            code = tag.get_text().strip("\n")
+            if code.strip():
+                page.code_blocks.append(MDCodeBlock(language=_code_language(tag), code=code))
+        elif name == "table":
+            table = _table(tag)
+            if table.headers or table.rows:
+                page.tables.append(table)
+
+    page.title = metadata.get("og:title") or page_title or next(
+        (h.text for h in page.headings if h.level == 1), ""
+    )
+    page.author = metadata.get("author") or metadata.get("article:author")
+    page.last_updated = next((metadata[k] for k in (*_UPDATED_KEYS, *_PUBLISHED_KEYS) if k in metadata), None)
+    if page.last_updated is None:
+        time_tag = root.find("time", datetime=True)
+        page.last_updated = time_tag["datetime"] if time_tag else None
+    page.markdown = node_to_md(root)
+    return page, followable
+
+
+def page_info(html: str, url: str | None = None, full_body: bool = False) -> MDPageInfo:
+    """Cached `extract_page_info`; the same page content is only parsed once."""
+    key = hashlib.sha256(f"{url}\0{int(full_body)}\0{html}".encode("utf-8", "surrogatepass")).hexdigest()
+    with _pages_lock:
+        page = _pages.get(key)
+        if page is not None:
+            _pages.move_to_end(key)
+            return page
+    page = extract_page_info(html, url, full_body)
+    with _pages_lock:
+        _pages[key] = page
+        while len(_pages) > WEBSITE_PAGE_CACHE_SIZE:
+            _pages.popitem(last=False)
+    return page
+
+
+if __name__ == "__main__":
+    html = """
+    <html lang="en"><head><title>Install guide</title>
+    <meta name="description" content="How to install the tool">
+    <meta name="author" content="Docs Team"><meta property="article:tag" content="setup">
+    </head><body><nav><a href="/">Home</a></nav>
+    <article><h1 id="install">Install</h1>
+    <p>Install the package with pip, then verify it, and configure your API keys before use.</p>
+    <pre><code class="language-bash">pip install agentic-browser</code></pre>
+    <h2 id="providers">Providers</h2>
+    <table><tr><th>Provider</th><th>Key</th></tr><tr><td>Google</td><td>GOOGLE_API_KEY</td></tr></table>
+    <p>See the <a href="/docs/providers">provider guide</a> for details, caveats, and limits.</p>
+    <img src="/img/setup.png" alt="Setup screen"></article></body></html>
+    """
+    page = page_info(html, "https://docs.example.com/install")
+    print(page.model_dump_json(indent=2, exclude={"markdown"}))
+    print(page.markdown)
@@ -0,0 +1,161 @@
+"""
+Readability-style main-content detection.
+
+Paragraph-like blocks are scored by their text (length and commas) and the
+score is credited to their parent and grandparent containers. Containers are
+weighted by tag and class/id hints and penalized for link density. The best
+container wins, together with any siblings that score close to it. Navigation,
+footers, cookie banners, sidebars and the like are dropped along the way.
+"""
+
+import re
+
+from bs4 import BeautifulSoup, Tag
+
+_UNWANTED_TAGS = [
+    "script", "style", "noscript", "template", "iframe", "svg", "canvas",
+    "button", "input", "select", "textarea", "nav", "footer", "aside",
+]
+_UNLIKELY = re.compile(
+    r"banner|breadcrumb|combx|comment|community|consent|cookie|disqus|extra|footer|gdpr|"
+    r"header|legends|menu|modal|nav|newsletter|pager|pagination|popup|promo|related|remark|"
+    r"rss|share|shoutbox|sidebar|skyscraper|social|sponsor|subscribe|tags|toolbar|widget|ad-break|\bads?\b",
+    re.I,
+)
+_LIKELY = re.compile(r"and|article|body|column|content|main|shadow|entry|post|story|text|blog", re.I)
+_POSITIVE = re.compile(r"article|body|content|entry|hentry|main|page|post|text|blog|story|prose|markdown", re.I)
+_NEGATIVE = re.compile(
+    r"combx|comment|com-|contact|footer|footnote|masthead|media|meta|outbrain|promo|related|"
+    r"scroll|shoutbox|sidebar|sponsor|shopping|tags|tool|widget|cookie|banner|nav|share|social",
+    re.I,
+)
+_BLOCKS = ["p", "pre", "td", "blockquote", "li", "h2", "h3", "dd"]
+_TAG_WEIGHTS = {
+    "article": 10, "main": 10, "section": 3, "div": 5, "pre": 3, "td": 3, "blockquote": 3,
+    "form": -3, "ol": -3, "ul": -3, "dl": -3, "dd": -3, "dt": -3, "li": -3, "address": -3,
+    "h1": -5, "h2": -5, "h3": -5, "h4": -5, "h5": -5, "h6": -5, "th": -5,
+}
+
+# below this much text the "main content" is probably a wrong guess
+_MIN_CONTENT_CHARS = 250
+
+
+def _hints(tag: Tag) -> str:
+    return " ".join([*tag.get("class", []), tag.get("id", ""), tag.get("role", "")])
+
+
+def _class_weight(tag: Tag) -> int:
+    hints = _hints(tag)
+    weight = 0
+    if _NEGATIVE.search(hints):
+        weight -= 25
+    if _POSITIVE.search(hints):
+        weight += 25
+    return weight
+
+
+def _text_length(tag: Tag) -> int:
+    return len(" ".join(tag.get_text(" ", strip=True).split()))
+
+
+def link_density(tag: Tag) -> float:
+    text = _text_length(tag)
+    if not text:
+        return 1.0
+    return sum(_text_length(a) for a in tag.find_all("a")) / text
+
+
+def _is_boilerplate(tag: Tag) -> bool:
+    if tag.name in _UNWANTED_TAGS:
+        return True
+    if tag.name in ("body", "html", "article", "main"):
+        return False
+    hints = _hints(tag)
+    if hints.strip() and _UNLIKELY.search(hints) and not _LIKELY.search(hints):
+        return True
+    return tag.get("aria-hidden") == "true" or tag.get("hidden") is not None
+
+
+def strip_boilerplate(root: Tag) -> None:
+    """
+    Remove scripts, navigation and elements whose class or id marks them as
+    page chrome. If that would leave no text at all, nothing is removed.
+    """
+    doomed: list[Tag] = []
+    doomed_ids: set[int] = set()
+    for tag in root.find_all(True):
+        if any(id(parent) in doomed_ids for parent in tag.parents):
+            continue
+        if _is_boilerplate(tag):
+            doomed.append(tag)
+            doomed_ids.add(id(tag))
+
+    total = _text_length(root)
+    if total and sum(_text_length(tag) for tag in doomed) >= total:
+        return
+    for tag in doomed:
+        tag.decompose()
+
+
+def main_content(soup: BeautifulSoup) -> Tag | None:
+    """
+    The element holding the page's main content, with boilerplate removed.
+
+    Modifies `soup`. Returns None when nothing convincing is found, in
+    which case callers should fall back to the (already cleaned) body.
+    """
+    root = soup.body or soup
+    strip_boilerplate(root)
+
+    scores: dict[int, float] = {}
+    nodes: dict[int, Tag] = {}
+
+    def credit(tag: Tag | None, amount: float) -> None:
+        if tag is None or not isinstance(tag, Tag) or tag.name in ("html", "[document]"):
+            return
+        if id(tag) not in scores:
+            nodes[id(tag)] = tag
+            scores[id(tag)] = _TAG_WEIGHTS.get(tag.name, 0) + _class_weight(tag)
+        scores[id(tag)] += amount
+
+    for block in root.find_all(_BLOCKS):
+        text = " ".join(block.get_text(" ", strip=True).split())
+        if len(text) < 25:
+            continue
+        score = 1 + text.count(",") + min(len(text) // 100, 3)
+        credit(block.parent, score)
+        credit(block.parent.parent if block.parent else None, score / 2)
+
+    if not scores:
+        return None
+    for key, tag in nodes.items():
+        scores[key] *= 1 - link_density(tag)
+    best_key = max(scores, key=scores.get)
+    best, best_score = nodes[best_key], scores[best_key]
+
+    # siblings that look like more of the same content (split articles, intros)
+    parent = best.parent
+    if parent is not None and parent is not root.parent:
+        threshold = max(10.0, best_score * 0.2)
+        keep = []
+        for sibling in parent.children:
+            if sibling is best:
+                keep.append(sibling)
+            elif isinstance(sibling, Tag):
+                if scores.get(id(sibling), 0) >= threshold:
+                    keep.append(sibling)
+                elif sibling.name == "p":
+                    length = _text_length(sibling)
+                    density = link_density(sibling)
+                    if (length > 80 and density < 0.25) or (0 < length <= 80 and density == 0 and "." in sibling.get_text()):
+                        keep.append(sibling)
+        if len(keep) > 1:
+            wrapper = soup.new_tag("div")
+            for tag in keep:
+                wrapper.append(tag.extract())
+            best = wrapper
+
+    if _text_length(best) < _MIN_CONTENT_CHARS:
+        return None
+    return best
+
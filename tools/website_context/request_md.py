@@ -1,9 +1,12 @@
 import requests
 import logging
 
+from core.singleflight import coalesce
+
 logger = logging.getLogger(__name__)
 
 
+@coalesce()
 def return_markdown(url: str) -> str:
     """Fetches the markdown content from a given URL using the Jina AI service."""
     jina_url = "https://r.jina.ai/" + url
@@ -2,12 +2,27 @@
 initalization file for the youtube_agent module.
 """
 
-from .extract_id import extract_video_id
-from .get_subs import get_subtitle_content
-from .get_info import get_video_info
+from .extract_id import extract_playlist_id, extract_video_id
+from .get_subs import get_subtitle_content, get_subtitle_content_async
+from .get_info import get_video_info, get_video_info_async
+from .batch import iter_playlist
+from .service import (
+    ExtractionTimeoutError,
+    SubtitlesUnavailableError,
+    VideoUnavailableError,
+    YouTubeError,
+)
 
 __all__ = [
+    "ExtractionTimeoutError",
+    "SubtitlesUnavailableError",
+    "VideoUnavailableError",
+    "YouTubeError",
+    "extract_playlist_id",
     "extract_video_id",
     "get_subtitle_content",
+    "get_subtitle_content_async",
     "get_video_info",
+    "get_video_info_async",
+    "iter_playlist",
 ]
@@ -0,0 +1,109 @@
+"""
+Playlist and channel batches.
+
+A playlist or channel is expanded with one flat extraction (video ids and
+titles only). The videos are then fetched concurrently, a few at a time, and
+each YTVideoInfo with its cleaned transcript is yielded as soon as it is
+ready. Videos already in the per-video cache cost nothing.
+"""
+
+import asyncio
+import time
+from typing import AsyncIterator, Sequence
+
+from pydantic import BaseModel
+
+from core import get_logger
+from core.config import YOUTUBE_BATCH_CONCURRENCY, YOUTUBE_BATCH_MAX_VIDEOS
+from mcp_server.models import YTVideoInfo
+from . import service
+from .extract_id import channel_videos_url
+from .get_info import get_video_info_async
+
+logger = get_logger(__name__)
+
+
+class VideoResult(BaseModel):
+    index: int
+    video_id: str
+    url: str
+    title: str | None = None
+    info: YTVideoInfo | None = None
+    error: str | None = None
+    elapsed: float
+
+
+async def list_videos(url: str, max_videos: int = YOUTUBE_BATCH_MAX_VIDEOS) -> list[dict]:
+    """Flat entries of the first `max_videos` videos of a playlist, channel or single video URL."""
+    return await service.run(service.extract_entries, channel_videos_url(url) or url, max_videos)
+
+
+async def _fetch_one(
+    index: int, entry: dict, limit: asyncio.Semaphore, langs: Sequence[str] | None
+) -> VideoResult:
+    video_id = entry["id"]
+    url = f"https://www.youtube.com/watch?v={video_id}"
+    async with limit:
+        started = time.monotonic()
+        try:
+            info, error = await get_video_info_async(url, langs), None
+        except Exception as e:
+            info, error = None, str(e) or type(e).__name__
+    if error:
+        logger.warning(f"Batch fetch of {url} failed: {error}")
+    return VideoResult(
+        index=index,
+        video_id=video_id,
+        url=url,
+        title=entry.get("title") or (info.title if info else None),
+        info=info,
+        error=error,
+        elapsed=time.monotonic() - started,
+    )
+
+
+async def iter_videos(
+    entries: list[dict],
+    concurrency: int = YOUTUBE_BATCH_CONCURRENCY,
+    langs: Sequence[str] | None = None,
+) -> AsyncIterator[VideoResult]:
+    """
+    Fetch the videos of `list_videos` and yield each result as soon as it finishes.
+
+    A failed video yields a result with `error` set; it never aborts the
+    rest. Closing the iterator early cancels the fetches still pending.
+    """
+    limit = asyncio.Semaphore(max(concurrency, 1))
+    tasks = [asyncio.create_task(_fetch_one(i, entry, limit, langs)) for i, entry in enumerate(entries)]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def iter_playlist(
+    url: str,
+    max_videos: int = YOUTUBE_BATCH_MAX_VIDEOS,
+    concurrency: int = YOUTUBE_BATCH_CONCURRENCY,
+    langs: Sequence[str] | None = None,
+) -> AsyncIterator[VideoResult]:
+    """`list_videos` followed by `iter_videos`."""
+    async for result in iter_videos(await list_videos(url, max_videos), concurrency, langs):
+        yield result
+
+
+if __name__ == "__main__":
+    import sys
+
+    url = sys.argv[1] if len(sys.argv) > 1 else "https://www.youtube.com/playlist?list=PL590L5WQmH8fJ54F369BLDSqIwcs-TCfs"
+
+    async def main():
+        async for result in iter_playlist(url, max_videos=5):
+            transcript = result.info.transcript if result.info else None
+            status = result.error or f"{len(transcript or '')} transcript chars"
+            print(f"[{result.index}] {result.title} ({result.elapsed:.2f}s): {status}")
+        service.shutdown()
+
+    asyncio.run(main())
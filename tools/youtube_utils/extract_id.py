@@ -1,23 +1,92 @@
+import re
 from typing import Optional
 from urllib.parse import urlparse, parse_qs
 from core import get_logger
 
 logger = get_logger(__name__)
 
+_VIDEO_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+_YOUTUBE_HOSTS = {
+    "youtube.com",
+    "www.youtube.com",
+    "m.youtube.com",
+    "music.youtube.com",
+    "youtube-nocookie.com",
+    "www.youtube-nocookie.com",
+}
+# /<prefix>/<id> paths that name a single video
+_VIDEO_PATHS = ("shorts", "embed", "live", "v", "e")
+# /<prefix>/... paths that name a channel
+_CHANNEL_PATHS = ("channel", "c", "user")
+
+
+def _valid(video_id: Optional[str]) -> Optional[str]:
+    return video_id if video_id and _VIDEO_ID.match(video_id) else None
+
 
 def extract_video_id(url: str) -> Optional[str]:
     """Extract YouTube video ID from URL"""
     try:
-        parsed_url = urlparse(url)
+        parsed_url = urlparse(url if "://" in url else "https://" + url)
+        hostname = (parsed_url.hostname or "").lower()
 
-        if parsed_url.hostname in ["www.youtube.com", "youtube.com"]:
+        if hostname in _YOUTUBE_HOSTS:
             query_params = parse_qs(parsed_url.query)
-            return query_params.get("v", [None])[0]
+            if "v" in query_params:
+                return _valid(query_params["v"][0])
+            parts = [p for p in parsed_url.path.split("/") if p]
+            if len(parts) >= 2 and parts[0] in _VIDEO_PATHS:
+                return _valid(parts[1])
 
-        elif parsed_url.hostname == "youtu.be":
-            return parsed_url.path[1:]
+        elif hostname == "youtu.be":
+            return _valid(parsed_url.path[1:].split("/")[0])
 
     except Exception as e:
         logger.error(f"Error extracting video ID: {e}")
 
     return None
+
+
+def video_key(url: str) -> str:
+    """Cache key for a video: its ID, so watch, shorts, embed and youtu.be links match."""
+    return extract_video_id(url) or url
+
+
+def extract_playlist_id(url: str) -> Optional[str]:
+    """The `list=` playlist ID of a YouTube URL, if any."""
+    try:
+        parsed_url = urlparse(url if "://" in url else "https://" + url)
+        if (parsed_url.hostname or "").lower() in _YOUTUBE_HOSTS | {"youtu.be"}:
+            return parse_qs(parsed_url.query).get("list", [None])[0]
+    except Exception as e:
+        logger.error(f"Error extracting playlist ID: {e}")
+    return None
+
+
+def channel_videos_url(url: str) -> Optional[str]:
+    """
+    The "Videos" tab of a channel's root page (`/@handle`, `/channel/...`,
+    `/c/...`, `/user/...`), or None if `url` is not one. A channel's root
+    page lists its tabs rather than its videos.
+    """
+    parsed_url = urlparse(url if "://" in url else "https://" + url)
+    if (parsed_url.hostname or "").lower() not in _YOUTUBE_HOSTS:
+        return None
+    parts = [p for p in parsed_url.path.split("/") if p]
+    if (len(parts) == 1 and parts[0].startswith("@")) or (len(parts) == 2 and parts[0] in _CHANNEL_PATHS):
+        return f"https://www.youtube.com/{'/'.join(parts)}/videos"
+    return None
+
+
+if __name__ == "__main__":
+    for url in [
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ&list=PL590L5WQmH8fJ54F369BLDSqIwcs-TCfs",
+        "https://m.youtube.com/watch?v=dQw4w9WgXcQ",
+        "https://youtu.be/dQw4w9WgXcQ?t=42",
+        "https://www.youtube.com/shorts/dQw4w9WgXcQ",
+        "https://www.youtube-nocookie.com/embed/dQw4w9WgXcQ",
+        "https://www.youtube.com/playlist?list=PL590L5WQmH8fJ54F369BLDSqIwcs-TCfs",
+        "https://www.youtube.com/@veritasium",
+        "https://www.youtube.com/@veritasium/shorts",
+    ]:
+        print(url, extract_video_id(url), extract_playlist_id(url), channel_videos_url(url))
@@ -1,76 +1,129 @@
-from models import YTVideoInfo
+import threading
+from collections import OrderedDict
+
+from mcp_server.models import YTVideoInfo
 from core import get_logger
-from get_subs import get_subtitle_content
-from transcript_generator import processed_transcript
-import yt_dlp
-from typing import Optional, Any, Dict
+from core.config import YOUTUBE_CACHE_SIZE
+from core.singleflight import coalesce
+from . import service
+from .extract_id import video_key
+from .get_subs import (
+    cached_subtitles,
+    check_subtitles,
+    check_video,
+    remembering_failures,
+    store_subtitles,
+)
+from .service import Subtitles, SubtitlesUnavailableError, YouTubeError, parse_langs
+from .transcript_generator import processed_transcript
+from typing import Optional, Any, Dict, Sequence
 
 logger = get_logger(__name__)
 
+# (video id, languages) -> info with transcript, least recently used first
+_videos: "OrderedDict[tuple[str, tuple[str, ...]], YTVideoInfo]" = OrderedDict()
+_videos_lock = threading.Lock()
+
+
+def _video_cache_key(video_url: str, langs: str | Sequence[str] | None = None) -> tuple[str, tuple[str, ...]]:
+    return video_key(video_url), parse_langs(langs)
+
+
+def _cached(video_url: str, langs: str | Sequence[str] | None) -> Optional[YTVideoInfo]:
+    key = _video_cache_key(video_url, langs)
+    with _videos_lock:
+        video = _videos.get(key)
+        if video is not None:
+            _videos.move_to_end(key)
+        return video
+
+
+def _store(video_url: str, langs: str | Sequence[str] | None, video: YTVideoInfo) -> None:
+    with _videos_lock:
+        _videos[_video_cache_key(video_url, langs)] = video
+        while len(_videos) > YOUTUBE_CACHE_SIZE:
+            _videos.popitem(last=False)
+
 
-def get_video_info(video_url: str) -> Optional[YTVideoInfo]:
-    """Get video information using yt-dlp"""
+def _build_video_info(info: Dict[str, Any], subtitles: Optional[Subtitles]) -> YTVideoInfo:
+    # yt-dlp reports unknown fields (live durations, hidden likes) as None
+    video_data = {
+        "title": info.get("title") or "Unknown",
+        "description": info.get("description") or "",
+        "duration": int(info.get("duration") or 0),
+        "uploader": info.get("uploader") or "Unknown",
+        "upload_date": info.get("upload_date") or "",
+        "view_count": info.get("view_count") or 0,
+        "like_count": info.get("like_count") or 0,
+        "tags": info.get("tags") or [],
+        "categories": info.get("categories") or [],
+        "transcript": None,
+    }
+    if subtitles is not None:
+        video_data["transcript"] = processed_transcript(subtitles.text)
+        video_data["transcript_language"] = subtitles.lang
+    return YTVideoInfo(**video_data)
+
+
+def _finish(
+    video_url: str,
+    langs: str | Sequence[str] | None,
+    info: Dict[str, Any],
+    subtitles: Optional[Subtitles] = None,
+    error: Optional[YouTubeError] = None,
+) -> YTVideoInfo:
+    video = _build_video_info(info, subtitles)
+    if error is None or isinstance(error, SubtitlesUnavailableError):
+        _store(video_url, langs, video)
+    else:
+        # transient subtitle failures (timeouts, network errors) are retried next time
+        logger.warning(f"Could not fetch subtitles for {video_url}: {error}")
+    return video
+
+
+def get_video_info(video_url: str, langs: str | Sequence[str] | None = None) -> YTVideoInfo:
+    """
+    Get video information using yt-dlp; the transcript is in the first
+    available of `langs`, or None when there is none. Raises
+    VideoUnavailableError or YouTubeError when the video cannot be extracted.
+    """
+    if (video := _cached(video_url, langs)) is not None:
+        return video
+    check_video(video_url)
+    with remembering_failures(video_url, langs):
+        info = service.run_sync(service.extract, video_url)
+
+    # the subtitle tracks come with the info; only their text is fetched
     try:
-        ydl_opts: Dict[str, Any] = {
-            "quiet": True,
-            "no_warnings": True,
-            "extractaudio": False,
-            "skip_download": True,
-        }
-
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:  # type: ignore[arg-type]
-            info = ydl.extract_info(video_url, download=False)
-
-            if not info:
-                logger.error(f"Could not extract video info for {video_url}")
-                return None
-
-            video_data = {
-                "title": info.get("title", "Unknown"),
-                "description": info.get("description", ""),
-                "duration": info.get("duration", 0),
-                "uploader": info.get("uploader", "Unknown"),
-                "upload_date": info.get("upload_date", ""),
-                "view_count": info.get("view_count", 0),
-                "like_count": info.get("like_count", 0),
-                "tags": info.get("tags", []),
-                "categories": info.get("categories", []),
-                "transcript": None,
-            }
-
-            raw_transcript = get_subtitle_content(video_url, lang="en")
-
-            known_error_messages = [
-                "Video unavailable.",
-                "Subtitles not available for the specified language.",
-                "Subtitles were requested but could not be retrieved from file.",
-                "Subtitles not available for the specified language or download failed.",
-            ]
-            known_error_prefixes = [
-                "Error downloading subtitles:",
-                "An unexpected error occurred while fetching subtitles:",
-            ]
-
-            is_actual_error = False
-            if raw_transcript in known_error_messages:
-                is_actual_error = True
-            else:
-                if raw_transcript:  # Ensure raw_transcript is not None
-                    for prefix in known_error_prefixes:
-                        if raw_transcript.startswith(prefix):
-                            is_actual_error = True
-                            break
-
-            if raw_transcript and not is_actual_error:
-                cleaned_transcript = processed_transcript(raw_transcript)
-                video_data["transcript"] = cleaned_transcript
-            else:
-                logger.info(
-                    f"No transcript available or error fetching for {video_url}: {raw_transcript}"
+        subtitles = cached_subtitles(video_url, langs)
+        if subtitles is None:
+            check_subtitles(video_url, langs)
+            with remembering_failures(video_url, langs):
+                subtitles = store_subtitles(
+                    video_url, langs, service.run_sync(service.download_subtitles, info, parse_langs(langs))
                 )
+    except YouTubeError as e:
+        return _finish(video_url, langs, info, error=e)
+    return _finish(video_url, langs, info, subtitles)
+
 
-            return YTVideoInfo(**video_data)
+@coalesce(key=_video_cache_key)
+async def get_video_info_async(video_url: str, langs: str | Sequence[str] | None = None) -> YTVideoInfo:
+    """`get_video_info` without blocking the event loop."""
+    if (video := _cached(video_url, langs)) is not None:
+        return video
+    check_video(video_url)
+    with remembering_failures(video_url, langs):
+        info = await service.run(service.extract, video_url)
 
-    except Exception as e:
-        logger.error(f"Error getting video info: {e}")
-        return None
+    try:
+        subtitles = cached_subtitles(video_url, langs)
+        if subtitles is None:
+            check_subtitles(video_url, langs)
+            with remembering_failures(video_url, langs):
+                subtitles = store_subtitles(
+                    video_url, langs, await service.run(service.download_subtitles, info, parse_langs(langs))
+                )
+    except YouTubeError as e:
+        return _finish(video_url, langs, info, error=e)
+    return _finish(video_url, langs, info, subtitles)
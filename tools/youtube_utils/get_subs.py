@@ -1,99 +1,145 @@
-import os
-import yt_dlp
-from app.core import get_logger
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, Sequence
+
+from core import get_logger
+from core.config import YOUTUBE_CACHE_SIZE, YOUTUBE_NEGATIVE_TTL_SECONDS
+from core.singleflight import coalesce
+from . import service
+from .extract_id import video_key
+from .service import (
+    Subtitles,
+    SubtitlesUnavailableError,
+    VideoUnavailableError,
+    YouTubeError,
+    parse_langs,
+)
 
 logger = get_logger(__name__)
 
-
-def get_subtitle_content(video_url: str, lang: str = "en") -> str:
-    """Downloads and extracts subtitle content for a given video URL and language."""
-    temp_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "temp_subs")
-    os.makedirs(temp_dir, exist_ok=True)
-
+# (video id, languages) -> subtitles, least recently used first. Each result
+# is also stored under the language it resolved to, so asking for that
+# language directly later is a hit.
+_subtitles: "OrderedDict[tuple[str, tuple[str, ...]], Subtitles]" = OrderedDict()
+_subtitles_lock = threading.Lock()
+
+# video id (unavailable videos) or (video id, languages) (missing subtitles)
+# -> (error type, message, expiry on the monotonic clock)
+_failures: "OrderedDict[str | tuple[str, tuple[str, ...]], tuple[type[YouTubeError], str, float]]" = OrderedDict()
+_failures_lock = threading.Lock()
+
+
+def cached_subtitles(video_url: str, langs: str | Sequence[str] | None = None) -> Subtitles | None:
+    key = (video_key(video_url), parse_langs(langs))
+    with _subtitles_lock:
+        subtitles = _subtitles.get(key)
+        if subtitles is not None:
+            _subtitles.move_to_end(key)
+        return subtitles
+
+
+def store_subtitles(video_url: str, langs: str | Sequence[str] | None, subtitles: Subtitles) -> Subtitles:
+    """Cache `subtitles` and return them."""
+    video = video_key(video_url)
+    with _subtitles_lock:
+        _subtitles[(video, parse_langs(langs))] = subtitles
+        _subtitles[(video, (subtitles.lang,))] = subtitles
+        while len(_subtitles) > YOUTUBE_CACHE_SIZE:
+            _subtitles.popitem(last=False)
+    return subtitles
+
+
+def _raise_remembered(*keys: str | tuple[str, tuple[str, ...]]) -> None:
+    now = time.monotonic()
+    with _failures_lock:
+        for key in keys:
+            failure = _failures.get(key)
+            if failure is None:
+                continue
+            error_type, message, expires = failure
+            if expires <= now:
+                del _failures[key]
+                continue
+            raise error_type(message)
+
+
+def check_video(video_url: str) -> None:
+    """Raise the VideoUnavailableError remembered for this video, if it has not expired."""
+    _raise_remembered(video_key(video_url))
+
+
+def check_subtitles(video_url: str, langs: str | Sequence[str] | None = None) -> None:
+    """`check_video`, then the SubtitlesUnavailableError remembered for these languages."""
+    video = video_key(video_url)
+    _raise_remembered(video, (video, parse_langs(langs)))
+
+
+def remember_failure(video_url: str, langs: str | Sequence[str] | None, error: Exception) -> None:
+    """Remember `error` for YOUTUBE_NEGATIVE_TTL_SECONDS if retrying cannot help."""
+    if YOUTUBE_NEGATIVE_TTL_SECONDS <= 0:
+        return
+    if isinstance(error, VideoUnavailableError):
+        key: str | tuple[str, tuple[str, ...]] = video_key(video_url)
+    elif isinstance(error, SubtitlesUnavailableError):
+        key = (video_key(video_url), parse_langs(langs))
+    else:
+        return
+    with _failures_lock:
+        _failures[key] = (type(error), str(error), time.monotonic() + YOUTUBE_NEGATIVE_TTL_SECONDS)
+        _failures.move_to_end(key)
+        while len(_failures) > YOUTUBE_CACHE_SIZE:
+            _failures.popitem(last=False)
+
+
+@contextmanager
+def remembering_failures(video_url: str, langs: str | Sequence[str] | None = None) -> Iterator[None]:
+    """Pass YouTubeErrors raised in the block through `remember_failure`."""
     try:
-        ydl_opts = {
-            "writesubtitles": True,
-            "writeautomaticsub": True,
-            "subtitleslangs": [lang],
-            "subtitlesformat": "vtt/srt/best",
-            "skip_download": True,  # Skip downloading the video itself
-            "outtmpl": os.path.join(
-                temp_dir, "%(id)s.%(ext)s"
-            ),  # Save subtitle in temp_dir
-            "quiet": True,
-            "no_warnings": True,
-        }
-
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            logger.info(
-                f"Attempting to download subtitles for {video_url} in lang {lang}"
-            )
-            info = ydl.extract_info(
-                video_url, download=True
-            )  # download=True for subtitles
-
-            if not info:
-                logger.error(f"Could not extract video info for {video_url}")
-                return "Subtitles not available for the specified language."
-
-            requested_subs = info.get("requested_subtitles")
-
-            if requested_subs and lang in requested_subs:
-                subtitle_info = requested_subs[lang]
-                subtitle_file_path = subtitle_info.get("filepath")
-
-                if subtitle_file_path and os.path.exists(subtitle_file_path):
-                    with open(subtitle_file_path, "r", encoding="utf-8") as f:
-                        subtitle_content = f.read()
-                    logger.info(
-                        f"Successfully extracted subtitles from {subtitle_file_path}"
-                    )
-                    return subtitle_content
-
-                elif subtitle_info.get("data"):
-                    logger.info(
-                        f"Extracted subtitles directly from data field for {video_url}"
-                    )
-                    return subtitle_info["data"]
-
-                else:
-                    logger.warning(
-                        f"Subtitle file path not found or file does not exist for lang '{lang}' at '{video_url}'. Path: {subtitle_file_path}"
-                    )
-                    return (
-                        "Subtitles were requested but could not be retrieved from file."
-                    )
-
-            else:
-                logger.info(
-                    f"No subtitles found or downloaded for language '{lang}' for URL '{video_url}'."
-                )
-                return "Subtitles not available for the specified language or download failed."
-
-    except yt_dlp.utils.DownloadError as e:
-        logger.error(f"yt-dlp DownloadError for subtitles: {e} for URL {video_url}")
-
-        if "video unavailable" in str(e).lower():
-            return "Video unavailable."
-
-        if (
-            "subtitles not available" in str(e).lower()
-            or "no closed captions found" in str(e).lower()
-        ):
-            return "Subtitles not available for the specified language."
-
-        return f"Error downloading subtitles: {str(e)}"
-
-    except Exception as e:
-        logger.error(f"Error getting subtitle content: {e} for URL {video_url}")
-        return f"An unexpected error occurred while fetching subtitles: {str(e)}"
-
-    finally:
-        try:
-            if os.path.exists(temp_dir):
-                for f_name in os.listdir(temp_dir):
-                    os.remove(os.path.join(temp_dir, f_name))
-                os.rmdir(temp_dir)
-                logger.info(f"Cleaned up temp directory: {temp_dir}")
-        except Exception as e_cleanup:
-            logger.error(f"Error cleaning up temp directory {temp_dir}: {e_cleanup}")
+        yield
+    except YouTubeError as e:
+        logger.info(f"YouTube request for {video_url} failed: {e}")
+        remember_failure(video_url, langs, e)
+        raise
+
+
+@coalesce(key=lambda video_url, langs=None: (video_key(video_url), parse_langs(langs)))
+def fetch_subtitles(video_url: str, langs: str | Sequence[str] | None = None) -> Subtitles:
+    """
+    Subtitles in the first available preferred language (YOUTUBE_SUBTITLE_LANGS
+    by default). One extraction resolves the whole preference list.
+
+    Raises SubtitlesUnavailableError if the video has none of them,
+    VideoUnavailableError if it cannot be watched, and YouTubeError for other
+    failures. The first two are remembered for YOUTUBE_NEGATIVE_TTL_SECONDS.
+    """
+    if (subtitles := cached_subtitles(video_url, langs)) is not None:
+        return subtitles
+    check_subtitles(video_url, langs)
+    logger.info(f"Attempting to download subtitles for {video_url} in langs {list(parse_langs(langs))}")
+    with remembering_failures(video_url, langs):
+        subtitles = service.run_sync(service.extract_subtitles, video_url, parse_langs(langs))
+    return store_subtitles(video_url, langs, subtitles)
+
+
+@coalesce(key=lambda video_url, langs=None: (video_key(video_url), parse_langs(langs)))
+async def fetch_subtitles_async(video_url: str, langs: str | Sequence[str] | None = None) -> Subtitles:
+    """`fetch_subtitles` without blocking the event loop."""
+    if (subtitles := cached_subtitles(video_url, langs)) is not None:
+        return subtitles
+    check_subtitles(video_url, langs)
+    logger.info(f"Attempting to download subtitles for {video_url} in langs {list(parse_langs(langs))}")
+    with remembering_failures(video_url, langs):
+        subtitles = await service.run(service.extract_subtitles, video_url, parse_langs(langs))
+    return store_subtitles(video_url, langs, subtitles)
+
+
+def get_subtitle_content(video_url: str, lang: str | Sequence[str] | None = None) -> str:
+    """Raw subtitle text of a video for a language preference; raises like `fetch_subtitles`."""
+    return fetch_subtitles(video_url, lang).text
+
+
+async def get_subtitle_content_async(video_url: str, lang: str | Sequence[str] | None = None) -> str:
+    """`get_subtitle_content` without blocking the event loop."""
+    return (await fetch_subtitles_async(video_url, lang)).text
@@ -0,0 +1,242 @@
+"""
+yt-dlp on a bounded pool of reusable extractors.
+
+Extractions run on a dedicated pool of YOUTUBE_POOL_SIZE threads, each of
+which builds one YoutubeDL instance on first use and keeps it, so instances
+are constructed once and never shared between concurrent calls. The pool
+bounds how many extractions run at once and keeps them off the default
+executor the rest of the API uses. Every call has a timeout; a call that is
+cancelled or times out before its extraction starts never runs, and one
+already running is cut short by yt-dlp's socket timeout.
+
+Subtitles are read from the extracted info and fetched over the same
+extractor's HTTP session, so nothing is written to disk. The info lists every
+subtitle and caption language, so a language preference list is resolved
+without extracting again.
+
+Failures surface as YouTubeError subclasses: VideoUnavailableError and
+SubtitlesUnavailableError will not go away on retry, while a plain
+YouTubeError or ExtractionTimeoutError may.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, NamedTuple, Sequence
+
+import yt_dlp
+
+from core import get_logger
+from core.config import YOUTUBE_POOL_SIZE, YOUTUBE_SUBTITLE_LANGS, YOUTUBE_TIMEOUT_SECONDS
+
+logger = get_logger(__name__)
+
+YDL_OPTIONS: dict[str, Any] = {
+    "quiet": True,
+    "no_warnings": True,
+    "skip_download": True,
+    "socket_timeout": 20,
+}
+
+# playlists and channels: list the videos without resolving each one
+FLAT_OPTIONS: dict[str, Any] = {**YDL_OPTIONS, "extract_flat": "in_playlist"}
+
+# preferred subtitle formats; the last one listed is used otherwise
+SUBTITLE_FORMATS = ("vtt", "srt")
+# language preference meaning "whatever language the video is in"
+ORIGINAL = "orig"
+
+# yt-dlp messages for videos no retry will bring back
+_UNAVAILABLE = (
+    "video unavailable",
+    "private video",
+    "this video has been removed",
+    "this video is not available",
+    "account associated with this video has been terminated",
+    "unsupported url",
+    "is not a valid url",
+    "incomplete youtube id",
+)
+
+
+class YouTubeError(RuntimeError):
+    """A yt-dlp extraction or subtitle download failed; a later attempt may succeed."""
+
+
+class VideoUnavailableError(YouTubeError):
+    """The video is private, removed, blocked or does not exist."""
+
+
+class SubtitlesUnavailableError(YouTubeError):
+    """The video has no subtitles or captions in any of the preferred languages."""
+
+
+class ExtractionTimeoutError(YouTubeError, TimeoutError):
+    """yt-dlp did not finish within the call's timeout."""
+
+
+def _youtube_error(error: yt_dlp.utils.YoutubeDLError) -> YouTubeError:
+    message = str(error).removeprefix("ERROR: ")
+    if any(pattern in message.lower() for pattern in _UNAVAILABLE):
+        return VideoUnavailableError(message)
+    return YouTubeError(message)
+
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_local = threading.local()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=YOUTUBE_POOL_SIZE, thread_name_prefix="yt-dlp")
+        return _executor
+
+
+def _ydl(flat: bool = False) -> yt_dlp.YoutubeDL:
+    """This worker thread's YoutubeDL instance (the flat-extraction one with `flat`)."""
+    name = "flat_ydl" if flat else "ydl"
+    ydl = getattr(_local, name, None)
+    if ydl is None:
+        ydl = yt_dlp.YoutubeDL(FLAT_OPTIONS if flat else YDL_OPTIONS)  # type: ignore[arg-type]
+        setattr(_local, name, ydl)
+    return ydl
+
+
+def shutdown() -> None:
+    """Drop queued extractions and stop the pool; the next call starts a new one."""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def run(fn: Callable[..., Any], *args: Any, timeout: float | None = None) -> Any:
+    """
+    Await `fn(*args)` on the pool. yt-dlp errors are raised as YouTubeError,
+    and ExtractionTimeoutError after `timeout` seconds.
+    """
+    timeout = timeout or YOUTUBE_TIMEOUT_SECONDS
+    future = _get_executor().submit(fn, *args)
+    try:
+        # cancelling the wrapper (timeout or caller cancellation) cancels a queued call
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+    except TimeoutError:
+        raise ExtractionTimeoutError(f"yt-dlp call timed out after {timeout:g}s") from None
+    except yt_dlp.utils.YoutubeDLError as e:
+        raise _youtube_error(e) from e
+
+
+def run_sync(fn: Callable[..., Any], *args: Any, timeout: float | None = None) -> Any:
+    """Blocking `run` for callers outside the event loop."""
+    timeout = timeout or YOUTUBE_TIMEOUT_SECONDS
+    future = _get_executor().submit(fn, *args)
+    try:
+        return future.result(timeout)
+    except FutureTimeoutError:
+        future.cancel()
+        raise ExtractionTimeoutError(f"yt-dlp call timed out after {timeout:g}s") from None
+    except yt_dlp.utils.YoutubeDLError as e:
+        raise _youtube_error(e) from e
+
+
+def extract(video_url: str) -> dict:
+    """Video metadata, including the available subtitle tracks (pool threads only)."""
+    info = _ydl().extract_info(video_url, download=False)
+    if not info:
+        raise YouTubeError(f"Could not extract video info for {video_url}")
+    return info
+
+
+def extract_entries(url: str, limit: int) -> list[dict]:
+    """
+    The first `limit` videos of a playlist or channel as flat entries
+    (`id`, `url`, `title`, ...); a single video yields itself (pool threads only).
+    """
+    ydl = _ydl(flat=True)
+    # this instance belongs to the calling thread, so per-call options are safe
+    ydl.params["playlistend"] = limit
+    info = ydl.extract_info(url, download=False)
+    if not info:
+        return []
+    if info.get("_type") != "playlist":
+        return [info]
+    return [
+        entry for entry in info.get("entries") or []
+        if entry and entry.get("id") and entry.get("ie_key", "Youtube") == "Youtube"
+    ][:limit]
+
+
+class Subtitles(NamedTuple):
+    lang: str
+    automatic: bool
+    text: str
+
+
+def parse_langs(langs: str | Sequence[str] | None) -> tuple[str, ...]:
+    """Language preference list from `["en", "de"]`, `"en,de"` or None (YOUTUBE_SUBTITLE_LANGS)."""
+    if langs is None:
+        langs = YOUTUBE_SUBTITLE_LANGS
+    if isinstance(langs, str):
+        langs = langs.split(",")
+    return tuple(dict.fromkeys(lang.strip() for lang in langs if lang.strip())) or ("en",)
+
+
+def _find(available: dict, lang: str, original: str | None) -> str | None:
+    if lang == ORIGINAL:
+        # automatic captions mark the spoken language with -orig
+        key = next((k for k in available if k.endswith("-orig")), None)
+        return key or (_find(available, original, None) if original else None)
+    if lang in available:
+        return lang
+    # "en" also accepts regional variants such as en-US and en-GB
+    return next((k for k in available if k.startswith(lang + "-")), None)
+
+
+def _best_format(formats: list[dict]) -> dict:
+    for ext in SUBTITLE_FORMATS:
+        for track in formats:
+            if track.get("ext") == ext:
+                return track
+    return formats[-1]
+
+
+def subtitle_track(info: dict, langs: str | Sequence[str] | None = None) -> tuple[str, bool, dict] | None:
+    """
+    `(language, automatic, format)` of the best subtitles for the preferred
+    languages. Uploaded subtitles in any preferred language win over
+    automatic captions; within each, earlier languages win.
+    """
+    langs = parse_langs(langs)
+    original = info.get("language")
+    for source, automatic in (("subtitles", False), ("automatic_captions", True)):
+        available = {k: v for k, v in (info.get(source) or {}).items() if v}
+        for lang in langs:
+            key = _find(available, lang, original)
+            if key is not None:
+                return key.removesuffix("-orig"), automatic, _best_format(available[key])
+    return None
+
+
+def download_subtitles(info: dict, langs: str | Sequence[str] | None = None) -> Subtitles:
+    """
+    Subtitles described by `info` for the preferred languages; raises
+    SubtitlesUnavailableError if there are none (pool threads only).
+    """
+    found = subtitle_track(info, langs)
+    if found is None:
+        raise SubtitlesUnavailableError(f"No subtitles or captions in {', '.join(parse_langs(langs))}")
+    lang, automatic, track = found
+    if track.get("data"):
+        return Subtitles(lang, automatic, track["data"])
+    with _ydl().urlopen(track["url"]) as response:
+        return Subtitles(lang, automatic, response.read().decode("utf-8", "replace"))
+
+
+def extract_subtitles(video_url: str, langs: str | Sequence[str] | None = None) -> Subtitles:
+    """`extract` then `download_subtitles` in one pool call (pool threads only)."""
+    return download_subtitles(extract(video_url), langs)
@@ -3,6 +3,7 @@ initalization file for the youtube_agent.transcript_generator module.
 """
 
 from .clean import clean_transcript
+from .cues import TimedTranscript, TranscriptWindow, format_timestamp, parse_timed_transcript
 from .duplicate import remove_sentence_repeats
 from .srt import clean_srt_text
 from .timestamp import clean_timestamps_and_dedupe
@@ -16,6 +17,15 @@ def processed_transcript(text: str) -> str:
     return cleaned_text
 
 
+def processed_timed_transcript(text: str) -> TimedTranscript:
+    """Clean the transcript like `processed_transcript` but keep cue timings."""
+    return parse_timed_transcript(text)
+
+
 __all__ = [
     "processed_transcript",
+    "processed_timed_transcript",
+    "TimedTranscript",
+    "TranscriptWindow",
+    "format_timestamp",
 ]
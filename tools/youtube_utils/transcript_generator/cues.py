@@ -0,0 +1,165 @@
+import re
+from array import array
+from bisect import bisect_left
+from collections import deque
+from typing import NamedTuple
+
+from .clean import (
+    _CUE_TAG_PATTERN,
+    _INLINE_TIMESTAMP_PATTERN,
+    _SPEAKER_TAG_PATTERN,
+    _VTT_HEADER_OR_METADATA_PATTERN,
+)
+
+_CUE_TIMING_PATTERN = re.compile(
+    r"^\s*(?P<start>(?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})\s*-->\s*"
+    r"(?P<end>(?:\d+:)?\d{1,2}:\d{2}[.,]\d{3})"
+)
+
+_ALIGN_PATTERN = re.compile(r"^align:[a-zA-Z]+(?:\s+position:[\d%]+)?$")
+
+# auto-generated captions repeat the previous line(s) in each rolling cue
+_RECENT_LINES = 3
+
+
+def parse_timestamp(value: str) -> float:
+    """'01:02:03.456' / '02:03,456' -> seconds."""
+    parts = value.replace(",", ".").split(":")
+    seconds = float(parts[-1])
+    for i, part in enumerate(reversed(parts[:-1])):
+        seconds += int(part) * 60 ** (i + 1)
+    return seconds
+
+
+def format_timestamp(seconds: float) -> str:
+    """Seconds -> 'm:ss' or 'h:mm:ss' for citing positions in a video."""
+    total = int(seconds)
+    hours, rest = divmod(total, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+
+class TranscriptWindow(NamedTuple):
+    start: float
+    end: float
+    text: str
+
+    @property
+    def label(self) -> str:
+        return f"[{format_timestamp(self.start)}-{format_timestamp(self.end)}]"
+
+
+class TimedTranscript:
+    """
+    Cleaned transcript text plus per-cue timing.
+
+    Cue i covers `starts[i]`..`ends[i]` seconds and its text is
+    `text[offsets[i]:offsets[i + 1]]`. Timings and offsets are compact
+    typed arrays rather than one object per cue.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.starts = array("d")
+        self.ends = array("d")
+        self.offsets = array("L")
+        self._parts: list[str] = []
+        self._length = 0
+
+    def append(self, start: float, end: float, text: str) -> None:
+        self.starts.append(start)
+        self.ends.append(end)
+        self.offsets.append(self._length)
+        piece = text + " "
+        self._parts.append(piece)
+        self._length += len(piece)
+
+    def finish(self) -> "TimedTranscript":
+        self.text = "".join(self._parts)
+        self._parts = []
+        return self
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def duration(self) -> float:
+        return self.ends[-1] if self.ends else 0.0
+
+    def cue_text(self, i: int) -> str:
+        end = self.offsets[i + 1] if i + 1 < len(self.offsets) else len(self.text)
+        return self.text[self.offsets[i] : end].strip()
+
+    def slice(self, start: float, end: float) -> TranscriptWindow:
+        """Text of the cues starting within [start, end)."""
+        first = bisect_left(self.starts, start)
+        last = bisect_left(self.starts, end)
+        if first >= last:
+            return TranscriptWindow(start, end, "")
+        text_end = self.offsets[last] if last < len(self.offsets) else len(self.text)
+        return TranscriptWindow(
+            self.starts[first],
+            self.ends[last - 1],
+            self.text[self.offsets[first] : text_end].strip(),
+        )
+
+    def windows(self, seconds: float = 60.0, overlap: float = 0.0) -> list[TranscriptWindow]:
+        """Consecutive time windows of `seconds`, optionally overlapping, skipping silent gaps."""
+        step = max(seconds - overlap, 1.0)
+        windows = []
+        i = 0
+        while i < len(self.starts):
+            t = self.starts[i]
+            windows.append(self.slice(t, t + seconds))
+            # next window opens at the first cue at or after t + step
+            i = max(bisect_left(self.starts, t + step), i + 1)
+        return windows
+
+
+def parse_timed_transcript(raw: str) -> TimedTranscript:
+    """
+    Parse VTT/SRT subtitles into a `TimedTranscript`.
+
+    Applies the same tag stripping and duplicate-line removal as
+    `clean_transcript`, but keeps each cue's start and end time.
+    """
+    transcript = TimedTranscript()
+    recent: deque[str] = deque(maxlen=_RECENT_LINES)
+    start = end = None
+    lines: list[str] = []
+
+    def flush():
+        if start is None:
+            return
+        kept = []
+        for line in lines:
+            if line in recent:
+                continue
+            recent.append(line)
+            kept.append(line)
+        if kept:
+            transcript.append(start, end, " ".join(kept))
+
+    for raw_line in raw.splitlines():
+        timing = _CUE_TIMING_PATTERN.match(raw_line)
+        if timing:
+            flush()
+            start = parse_timestamp(timing.group("start"))
+            end = parse_timestamp(timing.group("end"))
+            lines = []
+            continue
+        if start is None or _VTT_HEADER_OR_METADATA_PATTERN.match(raw_line):
+            continue
+
+        line = _SPEAKER_TAG_PATTERN.sub("", raw_line)
+        line = _INLINE_TIMESTAMP_PATTERN.sub("", line)
+        line = _CUE_TAG_PATTERN.sub("", line).strip()
+        if not line or line.isdigit() or _ALIGN_PATTERN.fullmatch(line):
+            # blank separators and SRT cue numbers
+            continue
+        lines.append(line)
+
+    flush()
+    return transcript.finish()